@@ -1,168 +1,164 @@
 from rest_framework.authtoken.models import Token
 from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from apps.surveys.models import Survey, Option, Ask, Answer
 from apps.feedback.models import Comment, Qualify
+from apps.analysis.utils import rebuild_answer_stats
+from apps.feedback.utils import rebuild_survey_ratings
+from apps.core.utils import invalidate_count
 from faker import Faker
+from datetime import timedelta
+from itertools import islice
+from uuid import uuid4
 import random
-from django.utils import timezone
 
-fake = Faker()
+
+# Opciones de las preguntas de opción múltiple
+MULTIPLE_OPTIONS = ['Python', 'JavaScript', 'Java', 'Go']
+
+# Número de textos distintos para las respuestas cortas y los comentarios
+TEXT_POOL_SIZE = 100
+
 
 class Command(BaseCommand):
-    help = 'Create data for analysis including a survey and 10 users to answer it.'
+    help = 'Create synthetic surveys, users, answers, comments and qualifications for analysis and benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Users that answer the surveys.')
+        parser.add_argument('--surveys', type=int, default=1, help='Surveys to create.')
+        parser.add_argument('--asks', type=int, default=7, help='Asks per survey.')
+        parser.add_argument('--answers-per-user', type=int, default=1, help='Surveys answered by each user, answering all their asks.')
+        parser.add_argument('--seed', type=int, help='Seed for reproducible data.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per statement.')
+        parser.add_argument('--no-feedback', action='store_true', help='Do not create comments and qualifications.')
 
     def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker()
+        if options['seed'] is not None:
+            self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+
+        # Textos reutilizados para no generar uno por fila
+        self.texts = [self.fake.text(max_nb_chars=100) for _ in range(TEXT_POOL_SIZE)]
+
         self.stdout.write('Creating data for analysis...')
 
-        # 1. Crear un usuario creador de la encuesta
-        user_create = User.objects.create(username=fake.user_name(), email=fake.email(), is_active=True)
-        user_create.set_password(fake.password())
-        user_create.save()
-        Token.objects.create(user=user_create)
-
-        # 2. Crear una encuesta
-        survey = Survey.objects.create(
-            title=fake.sentence(),
-            description=fake.text(),
-            start_date=timezone.now(),
-            end_date=timezone.now(),
-            is_public=True,
-            user=user_create,
-        )
-
-        # 3. Crear preguntas de la encuesta
-        question_1 = Ask.objects.create(
-            text='What is your favorite programming language?',
-            type='multiple',
-            survey=survey
-        )
-        question_2 = Ask.objects.create(
-            text='Do you like Django?',
-            type='boolean',
-            survey=survey
-        )
-        question_3 = Ask.objects.create(
-            text='How long have you been programming?',
-            type='short',
-            survey=survey
-        )
-        question_4 = Ask.objects.create(
-            text='What is your opinion on JavaScript?',
-            type='short',
-            survey=survey
-        )
-        question_5 = Ask.objects.create(
-            text='Have you worked with databases?',
-            type='boolean',
-            survey=survey
-        )
-        question_6 = Ask.objects.create(
-            text='What is your experience with machine learning?',
-            type='multiple',
-            survey=survey
-        )
-        question_7 = Ask.objects.create(
-            text='Do you prefer backend over frontend development?',
-            type='boolean',
-            survey=survey
-        )
-
-        # 4. Crear opciones para la primera y sexta pregunta (opciones múltiples)
-        option_1_q1 = Option.objects.create(text='Python', ask=question_1)
-        option_2_q1 = Option.objects.create(text='JavaScript', ask=question_1)
-        option_3_q1 = Option.objects.create(text='Java', ask=question_1)
-
-        option_1_q6 = Option.objects.create(text='No experience', ask=question_6)
-        option_2_q6 = Option.objects.create(text='Basic experience', ask=question_6)
-        option_3_q6 = Option.objects.create(text='Advanced experience', ask=question_6)
-
-        # 5. Crear 10 usuarios para responder la encuesta
-        users = []
-        for _ in range(10):
-            user = User.objects.create(username=fake.user_name(), email=fake.email(), is_active=True)
-            user.set_password(fake.password())
-            user.save()
-            Token.objects.create(user=user)
-            users.append(user)
-
-        # 6. Crear respuestas de los usuarios para la encuesta
-        for user in users:
-            # Responder a la primera pregunta (opciones múltiples)
-            selected_option_q1 = random.choice([option_1_q1, option_2_q1, option_3_q1])
-            Answer.objects.create(
-                content_answer=None,
-                user=user,
-                ask=question_1,
-                option=selected_option_q1
-            )
-
-            # Responder a la segunda pregunta (booleano)
-            answer_boolean_q2 = random.choice([True, False])
-            Answer.objects.create(
-                content_answer=str(answer_boolean_q2),
-                user=user,
-                ask=question_2,
-                option=None
-            )
-
-            # Responder a la tercera pregunta (respuesta corta)
-            answer_short_q3 = fake.text(max_nb_chars=100)
-            Answer.objects.create(
-                content_answer=answer_short_q3,
-                user=user,
-                ask=question_3,
-                option=None
-            )
-
-            # Responder a la cuarta pregunta (respuesta corta)
-            answer_short_q4 = fake.text(max_nb_chars=100)
-            Answer.objects.create(
-                content_answer=answer_short_q4,
-                user=user,
-                ask=question_4,
-                option=None
-            )
-
-            # Responder a la quinta pregunta (booleano)
-            answer_boolean_q5 = random.choice([True, False])
-            Answer.objects.create(
-                content_answer=str(answer_boolean_q5),
-                user=user,
-                ask=question_5,
-                option=None
-            )
-
-            # Responder a la sexta pregunta (opciones múltiples)
-            selected_option_q6 = random.choice([option_1_q6, option_2_q6, option_3_q6])
-            Answer.objects.create(
-                content_answer=None,
-                user=user,
-                ask=question_6,
-                option=selected_option_q6
-            )
-
-            # Responder a la séptima pregunta (booleano)
-            answer_boolean_q7 = random.choice([True, False])
-            Answer.objects.create(
-                content_answer=str(answer_boolean_q7),
-                user=user,
-                ask=question_7,
-                option=None
-            )
-
-        # 7. Crear un comentario y una calificación para la encuesta
-        for user in users:
-            Comment.objects.create(
-                content=fake.text(),
-                user=user,
-                survey=survey
-            )
-
-            Qualify.objects.create(
-                assessment=random.randint(1, 5),
-                user=user,
-                survey=survey
-            )
+        with transaction.atomic():
+            # 1. Crear el creador de las encuestas y los usuarios que las responden
+            prefix = uuid4().hex[:8]
+            password = make_password(self.fake.password())
+            creator = User.objects.create(username=f'creator_{prefix}', email=self.fake.email(), password=password)
+            users = self.bulk_create(User, (
+                User(username=f'user_{prefix}_{index}', email=self.fake.email(), password=password)
+                for index in range(options['users'])
+            ))
+            self.bulk_create(Token, (Token(user=user, key=Token.generate_key()) for user in [creator] + users))
+            self.stdout.write(f'Created {len(users) + 1} users.')
+
+            # 2. Crear las encuestas con sus preguntas y opciones
+            now = timezone.now()
+            surveys = self.bulk_create(Survey, (
+                Survey(
+                    title=self.fake.sentence(),
+                    description=self.rng.choice(self.texts),
+                    start_date=now,
+                    end_date=now + timedelta(days=30),
+                    is_public=True,
+                    user=creator,
+                )
+                for _ in range(options['surveys'])
+            ))
+            types = [choice for choice, _ in Ask.TYPE_CHOICES]
+            asks = self.bulk_create(Ask, (
+                Ask(survey=survey, text=self.fake.sentence(), type=types[index % len(types)])
+                for survey in surveys
+                for index in range(options['asks'])
+            ))
+            options_by_ask = {}
+            for ask in asks:
+                if ask.type == 'multiple':
+                    options_by_ask[ask.id] = [Option(ask=ask, text=text) for text in MULTIPLE_OPTIONS]
+            self.bulk_create(Option, (option for ask_options in options_by_ask.values() for option in ask_options))
+            asks_by_survey = {}
+            for ask in asks:
+                asks_by_survey.setdefault(ask.survey_id, []).append(ask)
+            self.stdout.write(f'Created {len(surveys)} surveys with {len(asks)} asks.')
+
+            # 3. Elegir las encuestas que responde cada usuario
+            answers_per_user = min(options['answers_per_user'], len(surveys))
+            answered = [(user, survey) for user in users for survey in self.rng.sample(surveys, answers_per_user)]
+
+            # 4. Crear las respuestas por bloques sin acumularlas en memoria
+            total = self.bulk_create(Answer, (
+                self.build_answer(user, ask, options_by_ask)
+                for user, survey in answered
+                for ask in asks_by_survey[survey.id]
+            ), keep=False)
+            self.stdout.write(f'Created {total} answers.')
+
+            # 5. Calcular los contadores de respuestas solo de las encuestas creadas, todas del mismo creador
+            created_surveys = Survey.objects.filter(user=creator)
+            rebuild_answer_stats(created_surveys)
+
+            # 6. Crear un comentario y una calificación por encuesta respondida
+            if not options['no_feedback']:
+                self.bulk_create(Comment, (
+                    Comment(content=self.rng.choice(self.texts), user=user, survey=survey)
+                    for user, survey in answered
+                ), keep=False)
+                self.bulk_create(Qualify, (
+                    Qualify(assessment=self.rng.randint(1, 5), user=user, survey=survey)
+                    for user, survey in answered
+                ), keep=False)
+                rebuild_survey_ratings(created_surveys)
+                self.stdout.write(f'Created {len(answered)} comments and qualifications.')
+
+        # Las inserciones masivas no emiten señales, así que se invalidan los conteos en caché
+        for model in (Survey, Comment, Qualify):
+            invalidate_count(model)
 
         self.stdout.write(self.style.SUCCESS('Data created successfully!'))
+
+    def build_answer(self, user, ask, options_by_ask):
+        """
+        Construye una respuesta aleatoria del usuario a la pregunta según su tipo.
+
+        Args:
+            user (User): Usuario que responde.
+            ask (Ask): Pregunta respondida.
+            options_by_ask (dict): Opciones de las preguntas de opción múltiple por ID de pregunta.
+
+        Returns:
+            Answer: Respuesta sin guardar.
+        """
+        if ask.type == 'multiple':
+            return Answer(user=user, ask=ask, option=self.rng.choice(options_by_ask[ask.id]))
+        if ask.type == 'boolean':
+            return Answer(user=user, ask=ask, content_answer=str(self.rng.random() < 0.5))
+        return Answer(user=user, ask=ask, content_answer=self.rng.choice(self.texts))
+
+    def bulk_create(self, model, objects, keep=True):
+        """
+        Inserta los objetos por bloques de batch_size.
+
+        Args:
+            model (Model): Modelo de los objetos.
+            objects (iterable): Objetos sin guardar.
+            keep (bool): Si es True se devuelven los objetos creados; si no, solo su número.
+
+        Returns:
+            list | int: Objetos creados o número de objetos creados.
+        """
+        objects = iter(objects)
+        created = [] if keep else 0
+        while batch := list(islice(objects, self.batch_size)):
+            model.objects.bulk_create(batch)
+            if keep:
+                created += batch
+            else:
+                created += len(batch)
+        return created
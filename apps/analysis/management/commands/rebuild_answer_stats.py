@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.surveys.models import Survey
+from apps.analysis.utils import rebuild_answer_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the answer counters of asks, options and keywords from the Answer table and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', help='ID of the survey to rebuild. All surveys are rebuilt by default.')
+        parser.add_argument('--check', action='store_true', help='Only report drift without fixing the counters.')
+
+    def handle(self, *args, **options):
+        survey = None
+        if options['survey']:
+            survey = Survey.objects.get(id=options['survey'])
+
+        self.stdout.write('Checking answer counters...' if options['check'] else 'Rebuilding answer counters...')
+
+        with transaction.atomic():
+            drift = rebuild_answer_stats(survey, fix=not options['check'])
+
+        if drift['asks'] or drift['options'] or drift['keywords']:
+            self.stdout.write(self.style.WARNING(
+                f'Drift found in {drift["asks"]} ask counters, {drift["options"]} option counters and {drift["keywords"]} keyword counters.'
+            ))
+        else:
+            self.stdout.write('No drift found.')
+
+        if not options['check']:
+            self.stdout.write(self.style.SUCCESS('Answer counters rebuilt successfully!'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('surveys', '0002_invitation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AskStats',
+            fields=[
+                ('ask', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='surveys.ask')),
+                ('total_answers', models.IntegerField(default=0)),
+                ('true_count', models.IntegerField(default=0)),
+                ('false_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OptionStats',
+            fields=[
+                ('option', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='surveys.option')),
+                ('answers_count', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
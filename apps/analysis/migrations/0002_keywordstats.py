@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0001_initial'),
+        ('surveys', '0008_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=255)),
+                ('occurrences', models.IntegerField(default=0)),
+                ('ask', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keyword_stats', to='surveys.ask')),
+            ],
+            options={
+                'unique_together': {('ask', 'word')},
+            },
+        ),
+    ]
@@ -1,3 +1,27 @@
 from django.db import models
+from apps.surveys.models import Ask, Option
 
-# Create your models here.
+
+# Definición del modelo de contadores de respuestas por pregunta
+class AskStats(models.Model):
+    ask = models.OneToOneField(Ask, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_answers = models.IntegerField(default=0)
+    true_count = models.IntegerField(default=0)
+    false_count = models.IntegerField(default=0)
+
+
+# Definición del modelo de contadores de respuestas por opción
+class OptionStats(models.Model):
+    option = models.OneToOneField(Option, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    answers_count = models.IntegerField(default=0)
+
+
+# Definición del modelo de contadores de palabras clave de las respuestas cortas por pregunta
+class KeywordStats(models.Model):
+    ask = models.ForeignKey(Ask, on_delete=models.CASCADE, related_name='keyword_stats')
+    word = models.CharField(max_length=255)
+    occurrences = models.IntegerField(default=0)
+
+
+    class Meta:
+        unique_together = ('ask', 'word') # Permite sumar los incrementos de cada palabra con ON CONFLICT
@@ -0,0 +1,34 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+from apps.surveys.models import Survey, Ask, Answer
+from apps.feedback.models import Qualify
+from apps.analysis.utils import rebuild_answer_stats
+from apps.feedback.utils import rebuild_survey_ratings
+from datetime import timedelta
+from io import StringIO
+
+
+# Tests del comando que crea datos sintéticos para el análisis
+class CreateDataAnalysisTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='TestUsername', email='test@email.com')
+        self.survey = Survey.objects.create(title='Existing survey', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        ask = Ask.objects.create(survey=self.survey, text='Do you like Django?', type='boolean')
+
+        # Respuesta y calificación sin contadores, como las que deja una inserción masiva
+        Answer.objects.bulk_create([Answer(user=self.user, ask=ask, content_answer='True')])
+        Qualify.objects.bulk_create([Qualify(user=self.user, survey=self.survey, assessment=5)])
+
+
+    def test_create_data_analysis_rebuilds_only_created_surveys(self):
+        """
+        Prueba de que el comando calcula los contadores de las encuestas que crea sin recalcular las demás.
+        """
+        call_command('create_data_analysis', users=5, surveys=2, asks=3, answers_per_user=2, seed=1, stdout=StringIO())
+        created_surveys = Survey.objects.exclude(id=self.survey.id)
+        self.assertEqual(rebuild_answer_stats(created_surveys, fix=False), {'asks': 0, 'options': 0, 'keywords': 0})
+        self.assertEqual(rebuild_survey_ratings(created_surveys, fix=False), 0)
+        self.assertEqual(rebuild_answer_stats(self.survey, fix=False), {'asks': 1, 'options': 0, 'keywords': 0})
+        self.assertEqual(rebuild_survey_ratings(self.survey, fix=False), 1)
@@ -2,13 +2,17 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey
+from apps.surveys.models import Survey, Ask, Option, Answer
+from apps.analysis.utils import rebuild_answer_stats
 from faker import Faker
 from datetime import timedelta
 import random
+import json
 
 
 fake = Faker()
@@ -40,7 +44,27 @@ class ExportAnalysisDetailsTestsCase(TestCase):
             user=self.user
         )
         self.url = reverse('export_analysis_details', args=[self.survey.id])
-    
+
+
+    def create_answers(self):
+        """
+        Crea preguntas de cada tipo con sus respuestas.
+        """
+        self.ask_multiple = Ask.objects.create(survey=self.survey, text='Favorite language?', type='multiple')
+        self.option_python = Option.objects.create(ask=self.ask_multiple, text='Python')
+        self.option_java = Option.objects.create(ask=self.ask_multiple, text='Java')
+        self.ask_boolean = Ask.objects.create(survey=self.survey, text='Do you like Django?', type='boolean')
+        self.ask_short = Ask.objects.create(survey=self.survey, text='Why?', type='short')
+        options = [self.option_python, self.option_python, self.option_java]
+        booleans = ['True', 'True', 'False']
+        shorts = ['Python is simple', 'Simple and fast', 'Fast']
+        for index in range(3):
+            user = User.objects.create(username=f'respondent{index}', email=f'respondent{index}@email.com')
+            Answer.objects.create(user=user, ask=self.ask_multiple, option=options[index])
+            Answer.objects.create(user=user, ask=self.ask_boolean, content_answer=booleans[index])
+            Answer.objects.create(user=user, ask=self.ask_short, content_answer=shorts[index])
+        rebuild_answer_stats(self.survey)
+
 
     def test_export_analysis_details_successfully(self):
         """
@@ -51,6 +75,95 @@ class ExportAnalysisDetailsTestsCase(TestCase):
         self.assertTrue('status' in response.data)
         self.assertTrue('message' in response.data)
 
+
+
+    def test_export_analysis_details_results(self):
+        """
+        Prueba de que el análisis calcula la distribución de las respuestas.
+        """
+        self.create_answers()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        analysis = response.data['data']['analysis']
+        self.assertEqual(analysis['total_respondents'], 3)
+        asks = {ask['id']: ask for ask in analysis['asks']}
+        options = {option['id']: option for option in asks[self.ask_multiple.id]['results']}
+        self.assertEqual(options[self.option_python.id]['count'], 2)
+        self.assertEqual(options[self.option_java.id]['count'], 1)
+        self.assertEqual(asks[self.ask_boolean.id]['results']['true'], 2)
+        self.assertEqual(asks[self.ask_boolean.id]['results']['false'], 1)
+        short_results = asks[self.ask_short.id]['results']
+        self.assertEqual(short_results['min_length'], 4)
+        self.assertEqual(short_results['max_length'], 16)
+        self.assertIn({'word': 'simple', 'count': 2}, short_results['top_keywords'])
+
+
+    def test_export_analysis_details_keywords_from_stats(self):
+        """
+        Prueba de que las palabras clave se leen de sus contadores sin recorrer el contenido de las respuestas.
+        """
+        self.create_answers()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query['sql'] for query in queries.captured_queries if '"content_answer" FROM' in query['sql']])
+        asks = {ask['id']: ask for ask in response.data['data']['analysis']['asks']}
+        self.assertEqual(asks[self.ask_short.id]['results']['top_keywords'][0], {'word': 'fast', 'count': 2})
+
+
+    def test_export_analysis_details_constant_queries(self):
+        """
+        Prueba de que el número de consultas no depende del número de preguntas.
+        """
+        # Carga la encuesta en caché para que ambas peticiones la obtengan de ella
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as empty_queries:
+            self.client.get(self.url)
+        self.create_answers()
+        for index in range(5):
+            ask = Ask.objects.create(survey=self.survey, text=f'Extra {index}', type='multiple')
+            Option.objects.create(ask=ask, text='Yes')
+            Option.objects.create(ask=ask, text='No')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertEqual(len(queries), len(empty_queries))
+
+
+
+    def test_export_analysis_details_stream_csv(self):
+        """
+        Prueba de exportar las respuestas de la encuesta en formato CSV.
+        """
+        self.create_answers()
+        response = self.client.get(self.url, {'export_format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'user,ask,option,content_answer')
+        self.assertEqual(len(lines), 10)
+
+
+    def test_export_analysis_details_stream_ndjson(self):
+        """
+        Prueba de exportar las respuestas de la encuesta en formato NDJSON.
+        """
+        self.create_answers()
+        response = self.client.get(self.url, {'export_format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 9)
+        self.assertIn({'user': 'respondent0', 'ask': 'Favorite language?', 'option': 'Python', 'content_answer': None}, rows)
+
+
+    def test_export_analysis_details_invalid_export_format(self):
+        """
+        Prueba de exportar las respuestas de la encuesta con un formato no válido.
+        """
+        response = self.client.get(self.url, {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('status' in response.data)
+        self.assertTrue('message' in response.data)
+
     
     def test_export_analysis_details_survey_not_found(self):
         """
@@ -0,0 +1,51 @@
+from rest_framework import status
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from apps.surveys.models import Survey
+from apps.analysis.utils import rebuild_answer_stats
+from apps.core.tests.mixins import QueryPlansTestMixin
+
+
+# Tests de los planes de ejecución de las consultas de análisis sobre tablas grandes
+class AnalysisQueryPlansTestCase(QueryPlansTestMixin, TestCase):
+    @classmethod
+    def setUpQueryPlansData(cls):
+        cls.survey = Survey.objects.filter(asks__answers__isnull=False).order_by('id').first()
+
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.survey.user)
+        self.url = reverse('export_analysis_details', args=[self.survey.id])
+
+
+    def test_export_analysis_details_query_plans(self):
+        """
+        Prueba de que el análisis de una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_export_answers_query_plans(self):
+        """
+        Prueba de que exportar las respuestas de una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'export_format': 'csv'})
+            b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_rebuild_answer_stats_query_plans(self):
+        """
+        Prueba de que recalcular los contadores de una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            rebuild_answer_stats(self.survey, fix=False)
+        self.assertNoSequentialScans(queries)
@@ -0,0 +1,492 @@
+from django.db.models import Count, Avg, Max, Min, Q, F, Case, When, Value, IntegerField, Window
+from django.db.models.functions import Length, Coalesce, RowNumber
+from django.db.models.query import QuerySet
+from apps.surveys.models import Ask, Option, Answer
+from .models import AskStats, OptionStats, KeywordStats
+from collections import Counter, defaultdict
+import csv
+import json
+import re
+
+
+# Palabras consideradas para las estadísticas de respuestas cortas
+KEYWORD_PATTERN = re.compile(r'[^\W\d_]{4,}')
+
+# Número de palabras clave a devolver por pregunta
+TOP_KEYWORDS = 10
+
+# Tamaño de bloque para recorrer las respuestas con un cursor del servidor
+ANSWERS_CHUNK_SIZE = 2000
+
+# Columnas de la exportación de respuestas
+EXPORT_FIELDS = ['user', 'ask', 'option', 'content_answer']
+
+
+class Echo:
+    """
+    Búfer que devuelve lo que se escribe en él, usado para generar filas CSV sin acumularlas en memoria.
+    """
+    def write(self, value):
+        return value
+
+
+def get_ratio(value, total):
+    """
+    Calcula el porcentaje de un valor respecto a un total.
+
+    Args:
+        value (int): Valor a calcular.
+        total (int): Total de referencia.
+
+    Returns:
+        float: Porcentaje redondeado a dos decimales.
+    """
+    return round(value * 100 / total, 2) if total else 0.0
+
+
+def get_survey_analysis(survey):
+    """
+    Calcula la distribución de las respuestas de cada pregunta de la encuesta.
+
+    Los conteos de opciones y de valores booleanos se leen de AskStats/OptionStats,
+    las palabras clave de KeywordStats y las longitudes de las respuestas cortas se
+    agregan agrupadas sobre Answer, por lo que el número de consultas es fijo sin
+    importar la cantidad de preguntas o respuestas.
+
+    Args:
+        survey (Survey): Encuesta a analizar.
+
+    Returns:
+        dict: Diccionario con el total de participantes y el análisis de cada pregunta.
+    """
+    answers = Answer.objects.filter(ask__survey=survey)
+
+    # Obtiene las preguntas de la encuesta con sus contadores de respuestas
+    asks = list(
+        Ask.objects.filter(survey=survey)
+        .order_by('id')
+        .values(
+            'id', 'text', 'type',
+            total_answers=Coalesce('stats__total_answers', 0),
+            true_count=Coalesce('stats__true_count', 0),
+            false_count=Coalesce('stats__false_count', 0),
+        )
+    )
+
+    # Obtiene los contadores de respuestas de cada opción
+    option_counts = (
+        Option.objects.filter(ask__survey=survey)
+        .order_by('id')
+        .values('id', 'ask_id', 'text', count=Coalesce('stats__answers_count', 0))
+    )
+
+    # Calcula las longitudes de las respuestas cortas
+    short_stats = (
+        answers.filter(ask__type='short', content_answer__isnull=False)
+        .values('ask_id')
+        .annotate(
+            count=Count('id'),
+            average_length=Avg(Length('content_answer')),
+            min_length=Min(Length('content_answer')),
+            max_length=Max(Length('content_answer')),
+        )
+        .order_by()
+    )
+
+    # Agrupa los resultados por pregunta
+    options_by_ask = defaultdict(list)
+    for option in option_counts:
+        options_by_ask[option['ask_id']].append(option)
+
+    shorts_by_ask = {row['ask_id']: row for row in short_stats}
+
+    # Obtiene las palabras clave más frecuentes de cada pregunta desde sus contadores
+    top_keywords = (
+        KeywordStats.objects.filter(ask__survey=survey, occurrences__gt=0)
+        .annotate(rank=Window(RowNumber(), partition_by=F('ask_id'), order_by=[F('occurrences').desc(), F('word').asc()]))
+        .filter(rank__lte=TOP_KEYWORDS)
+        .order_by('ask_id', 'rank')
+        .values_list('ask_id', 'word', 'occurrences')
+    )
+    keywords_by_ask = defaultdict(list)
+    for ask_id, word, occurrences in top_keywords:
+        keywords_by_ask[ask_id].append({'word': word, 'count': occurrences})
+
+    # Construye el análisis de cada pregunta
+    asks_analysis = []
+    for ask in asks:
+        if ask['type'] == 'multiple':
+            options = options_by_ask[ask['id']]
+            total = ask['total_answers']
+            results = [
+                {
+                    'id': option['id'],
+                    'text': option['text'],
+                    'count': option['count'],
+                    'percentage': get_ratio(option['count'], total),
+                }
+                for option in options
+            ]
+        elif ask['type'] == 'boolean':
+            total = ask['total_answers']
+            results = {
+                'true': ask['true_count'],
+                'false': ask['false_count'],
+                'true_percentage': get_ratio(ask['true_count'], total),
+                'false_percentage': get_ratio(ask['false_count'], total),
+            }
+        else:
+            stats = shorts_by_ask.get(ask['id'], {})
+            total = stats.get('count', 0)
+            results = {
+                'average_length': round(stats.get('average_length') or 0, 2),
+                'min_length': stats.get('min_length') or 0,
+                'max_length': stats.get('max_length') or 0,
+                'top_keywords': keywords_by_ask[ask['id']],
+            }
+
+        asks_analysis.append({
+            'id': ask['id'],
+            'text': ask['text'],
+            'type': ask['type'],
+            'total_answers': total,
+            'results': results,
+        })
+
+    return {
+        'total_respondents': answers.values('user').distinct().count(),
+        'asks': asks_analysis,
+    }
+
+
+def get_survey_answers_rows(survey):
+    """
+    Recorre las respuestas de la encuesta por bloques usando un cursor del servidor.
+
+    Args:
+        survey (Survey): Encuesta a exportar.
+
+    Returns:
+        iterator: Tuplas con el usuario, la pregunta, la opción y el contenido de cada respuesta.
+    """
+    return (
+        Answer.objects.filter(ask__survey=survey)
+        .order_by()
+        .values_list('user__username', 'ask__text', 'option__text', 'content_answer')
+        .iterator(chunk_size=ANSWERS_CHUNK_SIZE)
+    )
+
+
+def stream_answers_csv(survey):
+    """
+    Genera la exportación de las respuestas de la encuesta en formato CSV, fila por fila.
+
+    Args:
+        survey (Survey): Encuesta a exportar.
+
+    Yields:
+        str: Línea CSV de la cabecera o de una respuesta.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in get_survey_answers_rows(survey):
+        yield writer.writerow(row)
+
+
+def stream_answers_ndjson(survey):
+    """
+    Genera la exportación de las respuestas de la encuesta en formato NDJSON, fila por fila.
+
+    Args:
+        survey (Survey): Encuesta a exportar.
+
+    Yields:
+        str: Objeto JSON de una respuesta terminado en salto de línea.
+    """
+    for row in get_survey_answers_rows(survey):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n'
+
+
+# Formatos de exportación disponibles: (generador, tipo de contenido)
+EXPORT_FORMATS = {
+    'csv': (stream_answers_csv, 'text/csv'),
+    'ndjson': (stream_answers_ndjson, 'application/x-ndjson'),
+}
+
+
+def get_increment(field, counts):
+    """
+    Construye la expresión que suma a cada fila el incremento que le corresponde.
+
+    Args:
+        field (str): Campo que identifica la fila.
+        counts (Counter): Incremento de cada valor del campo.
+
+    Returns:
+        Case: Expresión con el incremento de cada fila.
+    """
+    return Case(
+        *[When(**{field: key}, then=Value(count)) for key, count in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def get_keywords(content_answer):
+    """
+    Obtiene las palabras clave de una respuesta corta.
+
+    Args:
+        content_answer (str): Contenido de la respuesta.
+
+    Returns:
+        list: Palabras clave en minúsculas, repetidas tantas veces como aparecen.
+    """
+    return KEYWORD_PATTERN.findall(content_answer.lower())
+
+
+def update_keyword_stats(keyword_counts):
+    """
+    Suma a los contadores de palabras clave los incrementos de cada pregunta.
+
+    Los contadores que quedan a cero se eliminan para que la tabla solo guarde
+    las palabras presentes en las respuestas.
+
+    Args:
+        keyword_counts (Counter): Incremento de cada par (ID de la pregunta, palabra).
+    """
+    keyword_counts = {key: count for key, count in keyword_counts.items() if count}
+    if not keyword_counts:
+        return
+
+    # Crea los contadores que aún no existen y les suma los incrementos con una única sentencia.
+    # Se filtra por pregunta y por palabra en lugar de por cada par para no anidar un OR por par
+    keywords = KeywordStats.objects.filter(
+        ask_id__in={ask_id for ask_id, _ in keyword_counts},
+        word__in={word for _, word in keyword_counts},
+    )
+    KeywordStats.objects.bulk_create([KeywordStats(ask_id=ask_id, word=word) for ask_id, word in keyword_counts], ignore_conflicts=True)
+    keywords.update(
+        occurrences=F('occurrences') + Case(
+            *[When(ask_id=ask_id, word=word, then=Value(count)) for (ask_id, word), count in keyword_counts.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+    if any(count < 0 for count in keyword_counts.values()):
+        keywords.filter(occurrences__lte=0).delete()
+
+
+def update_answer_stats(answers):
+    """
+    Suma las respuestas creadas a los contadores de sus preguntas y opciones.
+
+    Debe llamarse dentro de la misma transacción que crea las respuestas. Cada
+    tabla se actualiza con una única sentencia, sin importar el número de respuestas.
+
+    Args:
+        answers (list): Respuestas creadas, con su pregunta cargada.
+    """
+    total_counts = Counter()
+    true_counts = Counter()
+    false_counts = Counter()
+    option_counts = Counter()
+    keyword_counts = Counter()
+
+    # Agrupa los incrementos de cada pregunta, opción y palabra clave
+    for answer in answers:
+        total_counts[answer.ask_id] += 1
+        if answer.ask.type == 'boolean':
+            true_counts[answer.ask_id] += answer.content_answer == 'True'
+            false_counts[answer.ask_id] += answer.content_answer == 'False'
+        if answer.ask.type == 'short' and answer.content_answer:
+            for word in get_keywords(answer.content_answer):
+                keyword_counts[answer.ask_id, word] += 1
+        if answer.option_id:
+            option_counts[answer.option_id] += 1
+
+    if total_counts:
+        # Crea los contadores que aún no existen y les suma los incrementos
+        AskStats.objects.bulk_create([AskStats(ask_id=ask_id) for ask_id in total_counts], ignore_conflicts=True)
+        AskStats.objects.filter(ask_id__in=total_counts).update(
+            total_answers=F('total_answers') + get_increment('ask_id', total_counts),
+            true_count=F('true_count') + get_increment('ask_id', true_counts),
+            false_count=F('false_count') + get_increment('ask_id', false_counts),
+        )
+
+    if option_counts:
+        OptionStats.objects.bulk_create([OptionStats(option_id=option_id) for option_id in option_counts], ignore_conflicts=True)
+        OptionStats.objects.filter(option_id__in=option_counts).update(
+            answers_count=F('answers_count') + get_increment('option_id', option_counts),
+        )
+
+    update_keyword_stats(keyword_counts)
+
+
+def remove_answer_stats(answers):
+    """
+    Resta las respuestas que se van a eliminar de los contadores de sus preguntas y opciones.
+
+    Debe llamarse dentro de la misma transacción que elimina las respuestas, antes de
+    eliminarlas, porque el borrado en cascada de usuarios y opciones no pasa por
+    update_answer_stats. Las respuestas se agrupan en la base de datos, sin cargarlas,
+    salvo el contenido de las respuestas cortas, del que se restan las palabras clave.
+
+    Args:
+        answers (QuerySet): Respuestas que se eliminarán.
+    """
+    ask_counts = (
+        answers.values('ask_id')
+        .annotate(
+            total=Count('id'),
+            true=Count('id', filter=Q(ask__type='boolean', content_answer='True')),
+            false=Count('id', filter=Q(ask__type='boolean', content_answer='False')),
+        )
+        .order_by()
+        .values_list('ask_id', 'total', 'true', 'false')
+    )
+    total_counts, true_counts, false_counts = Counter(), Counter(), Counter()
+    for ask_id, total, true, false in ask_counts:
+        total_counts[ask_id] = -total
+        true_counts[ask_id] = -true
+        false_counts[ask_id] = -false
+
+    option_counts = Counter({
+        option_id: -count
+        for option_id, count in answers.filter(option__isnull=False)
+        .values('option_id')
+        .annotate(count=Count('id'))
+        .order_by()
+        .values_list('option_id', 'count')
+    })
+
+    if total_counts:
+        # Resta las respuestas eliminadas de los contadores existentes
+        AskStats.objects.filter(ask_id__in=total_counts).update(
+            total_answers=F('total_answers') + get_increment('ask_id', total_counts),
+            true_count=F('true_count') + get_increment('ask_id', true_counts),
+            false_count=F('false_count') + get_increment('ask_id', false_counts),
+        )
+
+    if option_counts:
+        OptionStats.objects.filter(option_id__in=option_counts).update(
+            answers_count=F('answers_count') + get_increment('option_id', option_counts),
+        )
+
+    # Resta las palabras clave de las respuestas cortas eliminadas
+    keyword_counts = Counter()
+    short_answers = (
+        answers.filter(ask__type='short', content_answer__isnull=False)
+        .values_list('ask_id', 'content_answer')
+        .iterator(chunk_size=ANSWERS_CHUNK_SIZE)
+    )
+    for ask_id, content_answer in short_answers:
+        for word in get_keywords(content_answer):
+            keyword_counts[ask_id, word] -= 1
+    update_keyword_stats(keyword_counts)
+
+
+def rebuild_answer_stats(survey=None, fix=True):
+    """
+    Recalcula los contadores de respuestas desde la tabla Answer y corrige las diferencias.
+
+    Args:
+        survey (Survey | QuerySet): Encuesta o queryset de encuestas a recalcular. Si es None se recalculan todas.
+        fix (bool): Si es False solo se comprueban las diferencias sin corregirlas.
+
+    Returns:
+        dict: Número de contadores de preguntas, de opciones y de palabras clave con diferencias.
+    """
+    lookup = 'survey__in' if isinstance(survey, QuerySet) else 'survey'
+    asks = Ask.objects.all() if survey is None else Ask.objects.filter(**{lookup: survey})
+    options = Option.objects.filter(ask__in=asks)
+    answers = Answer.objects.all() if survey is None else Answer.objects.filter(**{f'ask__{lookup}': survey})
+
+    # Calcula los contadores reales agrupando las respuestas, de modo que una
+    # encuesta solo lee sus respuestas mediante el índice (ask, option)
+    actual_asks = {
+        row[0]: row[1:]
+        for row in answers.values('ask_id')
+        .annotate(
+            total=Count('id'),
+            true=Count('id', filter=Q(ask__type='boolean', content_answer='True')),
+            false=Count('id', filter=Q(ask__type='boolean', content_answer='False')),
+        )
+        .order_by()
+        .values_list('ask_id', 'total', 'true', 'false')
+    }
+    stored_asks = {
+        row[0]: row[1:]
+        for row in AskStats.objects.filter(ask__in=asks).values_list('ask_id', 'total_answers', 'true_count', 'false_count')
+    }
+
+    # Las preguntas sin respuestas deben tener los contadores a cero
+    drifted_asks = [
+        AskStats(ask_id=ask_id, **dict(zip(['total_answers', 'true_count', 'false_count'], actual_asks.get(ask_id, (0, 0, 0)))))
+        for ask_id in actual_asks.keys() | stored_asks.keys()
+        if stored_asks.get(ask_id, (0, 0, 0)) != actual_asks.get(ask_id, (0, 0, 0))
+    ]
+
+    # Calcula los contadores reales de cada opción
+    actual_options = dict(
+        answers.filter(option__isnull=False)
+        .values('option_id')
+        .annotate(count=Count('id'))
+        .order_by()
+        .values_list('option_id', 'count')
+    )
+    stored_options = dict(OptionStats.objects.filter(option__in=options).values_list('option_id', 'answers_count'))
+    drifted_options = [
+        OptionStats(option_id=option_id, answers_count=actual_options.get(option_id, 0))
+        for option_id in actual_options.keys() | stored_options.keys()
+        if stored_options.get(option_id, 0) != actual_options.get(option_id, 0)
+    ]
+
+    # Cuenta las palabras clave reales de las respuestas cortas
+    actual_keywords = Counter()
+    short_answers = (
+        answers.filter(ask__type='short', content_answer__isnull=False)
+        .values_list('ask_id', 'content_answer')
+        .iterator(chunk_size=ANSWERS_CHUNK_SIZE)
+    )
+    for ask_id, content_answer in short_answers:
+        for word in get_keywords(content_answer):
+            actual_keywords[ask_id, word] += 1
+    stored_keywords = {
+        (ask_id, word): occurrences
+        for ask_id, word, occurrences in KeywordStats.objects.filter(ask__in=asks).values_list('ask_id', 'word', 'occurrences')
+    }
+    drifted_keywords = [
+        KeywordStats(ask_id=ask_id, word=word, occurrences=actual_keywords.get((ask_id, word), 0))
+        for ask_id, word in actual_keywords.keys() | stored_keywords.keys()
+        if stored_keywords.get((ask_id, word), 0) != actual_keywords.get((ask_id, word), 0)
+    ]
+
+    if fix:
+        # Sobrescribe los contadores con diferencias
+        AskStats.objects.bulk_create(
+            drifted_asks,
+            update_conflicts=True,
+            unique_fields=['ask'],
+            update_fields=['total_answers', 'true_count', 'false_count'],
+        )
+        OptionStats.objects.bulk_create(
+            drifted_options,
+            update_conflicts=True,
+            unique_fields=['option'],
+            update_fields=['answers_count'],
+        )
+        KeywordStats.objects.bulk_create(
+            drifted_keywords,
+            update_conflicts=True,
+            unique_fields=['ask', 'word'],
+            update_fields=['occurrences'],
+        )
+        KeywordStats.objects.filter(ask__in=asks, occurrences__lte=0).delete()
+
+    return {
+        'asks': len(drifted_asks),
+        'options': len(drifted_options),
+        'keywords': len(drifted_keywords),
+    }
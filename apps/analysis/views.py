@@ -1,19 +1,21 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from apps.surveys.utils import get_survey_by_id
+from django.http import StreamingHttpResponse
+from apps.surveys.utils import get_survey_access
 from apps.core.utils import verify_user_is_creator
+from apps.users.authentication import CachedTokenAuthentication
+from .utils import get_survey_analysis, EXPORT_FORMATS
 
 
 # Endpoint para exportar los detalles del análisis
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def export_analysis_details(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -26,8 +28,37 @@ def export_analysis_details(request, survey_id):
         # Respuesta erronea al usuario no ser el creador
         return Response(verification_result, status=status.HTTP_403_FORBIDDEN)
 
+    # Obtiene el formato de exportación de las respuestas
+    export_format = request.query_params.get('export_format', None)
+
+    # Verifica si se solicita la exportación de las respuestas
+    if export_format is not None:
+        # Verifica que el formato sea válido
+        if export_format not in EXPORT_FORMATS:
+            # Respuesta erronea al proporcionar un formato no válido
+            return Response({
+                'status': 'error',
+                'message': f'The export format must be one of: {", ".join(EXPORT_FORMATS)}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Respuesta en streaming con una fila por respuesta
+        stream_answers, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream_answers(survey), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="survey_{survey.id}_answers.{export_format}"'
+        return response
+
+    # Calcula el análisis de las respuestas de la encuesta
+    analysis = get_survey_analysis(survey)
+
     # Respuesta exitosa a exportar el analisis
     return Response({
         'status': 'success',
-        'message': 'Export of the analysis successfully.'
+        'message': 'Export of the analysis successfully.',
+        'data': {
+            'survey': {
+                'id': survey.id,
+                'title': survey.title
+            },
+            'analysis': analysis
+        }
     }, status=status.HTTP_200_OK)
@@ -0,0 +1,109 @@
+from rest_framework.test import APIClient
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.core.cache import cache
+from django.core.management import call_command
+from io import StringIO
+import re
+
+
+# Prefijo de EXPLAIN y líneas del plan de ejecución que recorren una tabla completa
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN',
+    'sqlite': 'EXPLAIN QUERY PLAN',
+}
+SEQUENTIAL_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # En SQLite se omiten "subquery" y "qualify", los alias de Django para las subconsultas
+    # materializadas y para las que filtran por funciones de ventana
+    'sqlite': re.compile(r'\bSCAN (?!(?:subquery|qualify|qualify_mask)\b)(\w+)(?: USING (?:COVERING )?INDEX \w+)?$', re.MULTILINE),
+}
+
+# Líneas del plan de ejecución que ordenan las filas en lugar de leerlas en el orden de un índice
+SORT_PATTERNS = {
+    'postgresql': re.compile(r'Sort Key'),
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)'),
+}
+
+
+def get_query_plan(query):
+    """
+    Obtiene el plan de ejecución de una consulta mediante EXPLAIN.
+
+    Args:
+        query (QuerySet | str): Queryset o sentencia SELECT con sus parámetros ya incluidos.
+
+    Returns:
+        str: Plan de ejecución, una línea por nodo.
+    """
+    if isinstance(query, QuerySet):
+        return query.explain()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'{EXPLAIN_PREFIXES[connection.vendor]} {query}')
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def get_sequential_scans(query):
+    """
+    Obtiene las tablas que el plan de ejecución de una consulta recorre completas.
+
+    Ejecuta EXPLAIN sobre la consulta. En PostgreSQL busca los nodos "Seq Scan" y
+    en SQLite las líneas "SCAN <tabla>", con o sin índice, que no acotan las filas leídas.
+
+    Args:
+        query (QuerySet | str): Queryset o sentencia SELECT con sus parámetros ya incluidos.
+
+    Returns:
+        set: Nombres (o alias) de las tablas recorridas completas.
+    """
+    pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return set()
+
+    return set(pattern.findall(get_query_plan(query)))
+
+
+class QueryPlansTestMixin:
+    """
+    Base de los tests de planes de ejecución de las consultas sobre tablas grandes.
+
+    Crea una vez por clase el conjunto de datos de create_data_analysis, permite
+    completarlo en setUpQueryPlansData y actualiza las estadísticas del planificador.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        call_command('create_data_analysis', users=400, surveys=200, asks=5, answers_per_user=5, seed=1, stdout=StringIO())
+        cls.setUpQueryPlansData()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+    @classmethod
+    def setUpQueryPlansData(cls):
+        """
+        Completa los datos de la clase antes de actualizar las estadísticas del planificador.
+        """
+
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+
+    def assertNoSequentialScans(self, queries, limited=()):
+        """
+        Verifica que ninguna consulta SELECT recorra una tabla completa.
+
+        Las tablas de limited se pueden recorrer en el orden de un índice cuando la
+        consulta se corta con LIMIT, como en la paginación por número de página,
+        siempre que no se ordenen todas sus filas.
+        """
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            scans = get_sequential_scans(sql)
+            if ' LIMIT ' in sql and scans & set(limited):
+                self.assertIsNone(SORT_PATTERNS[connection.vendor].search(get_query_plan(sql)), sql)
+                scans -= set(limited)
+            self.assertEqual(scans, set(), sql)
@@ -1,6 +1,206 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+from hashlib import md5
+from time import time_ns
+from uuid import UUID
+import os
+
+
+def uuid7():
+    """
+    Genera un UUID versión 7, ordenado por el momento de su creación.
+
+    Los 48 bits más significativos son los milisegundos desde la época Unix y el
+    resto es aleatorio (RFC 9562), por lo que los IDs nuevos se insertan al final
+    de los índices B-tree en lugar de repartirse por todas sus páginas.
+
+    Returns:
+        UUID: UUID versión 7.
+    """
+    timestamp = time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76 # Versión 7
+    value |= ((random_bits >> 62) & 0xFFF) << 64
+    value |= 0b10 << 62 # Variante RFC 9562
+    value |= random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    return UUID(int=value)
+
+
+def get_version(key):
+    """
+    Obtiene la versión guardada en caché bajo una clave, creándola si no existe.
+
+    Las versiones forman parte de las claves de otros valores en caché, de modo
+    que cambiar la versión invalida todos esos valores a la vez.
+
+    Args:
+        key (str): Clave de la versión.
+
+    Returns:
+        int: Versión actual.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """
+    Cambia la versión guardada en caché bajo una clave.
+
+    Args:
+        key (str): Clave de la versión.
+    """
+    cache.set(key, time_ns(), None)
+
+
+def get_count_version(model):
+    """
+    Obtiene la versión de los conteos en caché de un modelo.
+
+    Args:
+        model (Model): Modelo de los conteos.
+
+    Returns:
+        int: Versión actual de los conteos del modelo.
+    """
+    return get_version(f'count_version:{model._meta.label_lower}')
+
+
+def invalidate_count(model):
+    """
+    Invalida todos los conteos en caché de un modelo cambiando su versión.
+
+    Args:
+        model (Model): Modelo cuyos registros se crearon o eliminaron.
+    """
+    bump_version(f'count_version:{model._meta.label_lower}')
+
+
+def get_estimated_count(queryset):
+    """
+    Obtiene el número estimado de registros de la tabla según el planificador de PostgreSQL.
+
+    Args:
+        queryset (QuerySet): Queryset sin filtros de la tabla a estimar.
+
+    Returns:
+        int: Número estimado de registros, None si la tabla no tiene estadísticas.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def get_count(queryset):
+    """
+    Obtiene el número de registros de un queryset según COUNT_CACHE_MODE.
+
+    - 'exact': ejecuta COUNT(*) en cada llamada.
+    - 'cached': guarda el COUNT(*) en caché durante COUNT_CACHE_TTL segundos; se
+      invalida al crear o eliminar registros del modelo (ver invalidate_count).
+    - 'estimate': en PostgreSQL usa la estimación del planificador (pg_class.reltuples)
+      para querysets sin filtros de tablas con al menos COUNT_ESTIMATE_THRESHOLD
+      registros; en otro caso se comporta como 'cached'.
+
+    Args:
+        queryset (QuerySet): Queryset a contar.
+
+    Returns:
+        int: Número de registros.
+    """
+    mode = settings.COUNT_CACHE_MODE
+    if mode == 'exact':
+        return queryset.count()
+
+    if mode == 'estimate' and connection.vendor == 'postgresql' and not queryset.query.where:
+        estimate = get_estimated_count(queryset)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+
+    # Obtiene el conteo en caché de la consulta para la versión actual del modelo
+    version = get_count_version(queryset.model)
+    query_hash = md5(str(queryset.query).encode()).hexdigest()
+    key = f'count:{queryset.model._meta.label_lower}:{version}:{query_hash}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TTL)
+    return count
+
+
+def insert_ignore_conflicts(model, objects, unique_fields, returning):
+    """
+    Inserta los objetos omitiendo los que ya existen y devuelve los campos de las filas insertadas.
+
+    Usa INSERT ... ON CONFLICT DO NOTHING RETURNING (PostgreSQL y SQLite 3.35 o
+    superior), de modo que, a diferencia de bulk_create con ignore_conflicts, se
+    sabe qué filas insertó esta llamada aunque otra petición inserte las mismas a la vez.
+
+    Args:
+        model (Model): Modelo de los objetos.
+        objects (list): Objetos sin guardar.
+        unique_fields (list): Campos de la restricción única que identifica los conflictos.
+        returning (list): Campos a devolver de cada fila insertada.
+
+    Returns:
+        list: Tuplas con los campos de returning de las filas insertadas.
+    """
+    # Omite las claves primarias que genera la base de datos
+    fields = [field for field in model._meta.concrete_fields if not field.db_returning]
+    returning_fields = [model._meta.get_field(name) for name in returning]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    conflict = ', '.join(quote(model._meta.get_field(name).column) for name in unique_fields)
+    returning_columns = ', '.join(quote(field.column) for field in returning_fields)
+    placeholder = '(%s)' % ', '.join(['%s'] * len(fields))
+
+    inserted = []
+    batch_size = connection.ops.bulk_batch_size(fields, objects) or len(objects)
+    with connection.cursor() as cursor:
+        for start in range(0, len(objects), batch_size):
+            batch = objects[start:start + batch_size]
+            params = [field.get_db_prep_save(field.pre_save(obj, True), connection) for obj in batch for field in fields]
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES {", ".join([placeholder] * len(batch))} '
+                f'ON CONFLICT ({conflict}) DO NOTHING RETURNING {returning_columns}',
+                params,
+            )
+            inserted += [
+                tuple(field.to_python(value) for field, value in zip(returning_fields, row))
+                for row in cursor.fetchall()
+            ]
+    return inserted
+
+
+class CountCachedPaginator(Paginator):
+    """
+    Paginador que obtiene el total de registros mediante get_count.
+    """
+    @cached_property
+    def count(self):
+        """
+        Obtiene el número total de registros.
+
+        Returns:
+            int: Número total de registros.
+        """
+        if isinstance(self.object_list, QuerySet):
+            return get_count(self.object_list)
+        return super().count
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -8,9 +208,11 @@ class CustomPageNumberPagination(PageNumberPagination):
     Clase personalizada para la paginación de los endpoints.
 
     Atributos:
+        django_paginator_class (Paginator): Paginador que obtiene el total con get_count.
         page_size_query_param (str): Nombre del parámetro de consulta para el tamaño de la página.
         max_page_size (int): Tamaño máximo de la página.
     """
+    django_paginator_class = CountCachedPaginator
     page_size_query_param = 'page_size'
     max_page_size = 100
 
@@ -36,6 +238,81 @@ class CustomPageNumberPagination(PageNumberPagination):
         })
 
 
+class CustomCursorPagination(CursorPagination):
+    """
+    Clase personalizada para la paginación por cursor de los endpoints.
+
+    Pagina por el ID en lugar de usar OFFSET y no cuenta el total de registros,
+    por lo que el coste de cada página es el mismo a cualquier profundidad.
+
+    Atributos:
+        ordering (str): Campo por el que se ordenan y paginan los registros.
+        page_size_query_param (str): Nombre del parámetro de consulta para el tamaño de la página.
+        max_page_size (int): Tamaño máximo de la página.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+    def get_paginated_response(self, data):
+        """
+        Genera una respuesta paginada con los datos proporcionados.
+
+        Args:
+            data (list): Lista de datos a paginar.
+
+        Returns:
+            Response: Respuesta paginada con los datos.
+        """
+        return Response({
+            'links': {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link()
+            },
+            'page_size': self.page_size,
+            'results': data
+        })
+
+
+def get_paginator(request, pagination_class=CustomPageNumberPagination):
+    """
+    Función para obtener la paginación de un endpoint.
+
+    La paginación por cursor se usa si la solicitud incluye pagination=cursor
+    o un cursor; en otro caso se usa la paginación del endpoint.
+
+    Args:
+        request (Request): Solicitud a paginar.
+        pagination_class (class): Paginación por defecto del endpoint.
+
+    Returns:
+        BasePagination: Instancia de la paginación.
+    """
+    if request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params:
+        return CustomCursorPagination()
+    return pagination_class()
+
+
+def get_page_info(request, response_data):
+    """
+    Función para construir la información de la página de una respuesta paginada.
+
+    Args:
+        request (Request): Solicitud paginada.
+        response_data (Response): Respuesta generada por la paginación.
+
+    Returns:
+        dict: Diccionario con el total (si la paginación lo calcula), el tamaño de la página y los enlaces.
+    """
+    page_info = {}
+    if 'count' in response_data.data:
+        page_info['count'] = response_data.data['count']
+    page_info['page_size'] = int(request.query_params.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE']))
+    page_info['links'] = response_data.data['links']
+    return page_info
+
+
 def validate_serializer(serializer):
     """
     Función para comprobar la validación del serializador.
@@ -69,8 +346,8 @@ def verify_user_is_creator(element, request_user, message):
     Returns:
         dict: Diccionario con el estado de la verificación y el mensaje de error, si lo hay.
     """
-    # Verifica que el usuario no sea creador
-    if element.user != request_user:
+    # Verifica que el usuario no sea creador comparando los IDs, sin cargar el creador
+    if element.user_id != request_user.id:
         # Respuesta erronea al usuario no ser el creador
         return {
             'status': 'error',
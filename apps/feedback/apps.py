@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class FeedbackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.feedback'
+
+
+    def ready(self):
+        # Registra las señales de la aplicación
+        from . import signals
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.surveys.models import Survey
+from apps.feedback.utils import rebuild_survey_ratings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the rating summaries of surveys from the Qualify table and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--survey', help='ID of the survey to rebuild. All surveys are rebuilt by default.')
+        parser.add_argument('--check', action='store_true', help='Only report drift without fixing the summaries.')
+
+    def handle(self, *args, **options):
+        survey = None
+        if options['survey']:
+            survey = Survey.objects.get(id=options['survey'])
+
+        self.stdout.write('Checking rating summaries...' if options['check'] else 'Rebuilding rating summaries...')
+
+        with transaction.atomic():
+            drift = rebuild_survey_ratings(survey, fix=not options['check'])
+
+        if drift:
+            self.stdout.write(self.style.WARNING(f'Drift found in {drift} rating summaries.'))
+        else:
+            self.stdout.write('No drift found.')
+
+        if not options['check']:
+            self.stdout.write(self.style.SUCCESS('Rating summaries rebuilt successfully!'))
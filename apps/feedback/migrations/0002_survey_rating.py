@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum, Q
+
+
+def create_survey_ratings(apps, schema_editor):
+    """
+    Calcula el resumen de calificaciones de las encuestas que ya tienen calificaciones.
+    """
+    Qualify = apps.get_model('feedback', 'Qualify')
+    SurveyRating = apps.get_model('feedback', 'SurveyRating')
+    ratings = (
+        Qualify.objects.values('survey_id')
+        .annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('assessment'),
+            **{f'star_{star}': Count('id', filter=Q(assessment=star)) for star in range(1, 6)},
+        )
+        .order_by()
+    )
+    SurveyRating.objects.bulk_create([SurveyRating(**rating) for rating in ratings], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+        ('surveys', '0006_invitation_unique_survey_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyRating',
+            fields=[
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='surveys.survey')),
+                ('rating_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('star_1', models.IntegerField(default=0)),
+                ('star_2', models.IntegerField(default=0)),
+                ('star_3', models.IntegerField(default=0)),
+                ('star_4', models.IntegerField(default=0)),
+                ('star_5', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_survey_ratings, migrations.RunPython.noop),
+    ]
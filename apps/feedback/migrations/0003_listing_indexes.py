@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_survey_rating'),
+        ('surveys', '0006_invitation_unique_survey_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['survey', 'id'], name='feedback_co_survey__6ada7b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='qualify',
+            index=models.Index(fields=['survey', 'id'], name='feedback_qu_survey__c2b238_idx'),
+        ),
+    ]
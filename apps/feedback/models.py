@@ -11,6 +11,12 @@ class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
 
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['survey', 'id']), # Acelera el listado paginado de comentarios de una encuesta
+        ]
+
+
 # Definición del modelo de calificación
 class Qualify(models.Model):
     ASSESSMENT_CHOICES = [
@@ -27,3 +33,18 @@ class Qualify(models.Model):
 
     class Meta:
         unique_together = ('survey', 'user')
+        indexes = [
+            models.Index(fields=['survey', 'id']), # Acelera el listado paginado de calificaciones de una encuesta
+        ]
+
+
+# Definición del modelo de resumen de calificaciones por encuesta
+class SurveyRating(models.Model):
+    survey = models.OneToOneField(Survey, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    star_1 = models.IntegerField(default=0)
+    star_2 = models.IntegerField(default=0)
+    star_3 = models.IntegerField(default=0)
+    star_4 = models.IntegerField(default=0)
+    star_5 = models.IntegerField(default=0)
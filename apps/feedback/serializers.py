@@ -1,6 +1,6 @@
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
 from .models import Comment, Qualify
+from .utils import insert_qualify
 from apps.users.serializers import UserResponseSerializer
 
 
@@ -108,41 +108,24 @@ class QualifyValidationSerializer(serializers.ModelSerializer):
         read_only_fields = ['user']
     
 
-    def validate(self, data):
-        """
-        Valida que el usuario no haya calificado ya la encuesta.
-
-        Args:
-            data (dict): Datos a validar.
-
-        Returns:
-            dict: Datos validados.
-
-        Raises:
-            ValidationError: Si el usuario ya ha calificado la encuesta.
-        """
-        user = self.context['request'].user
-        survey = data.get('survey')
-        if Qualify.objects.filter(survey=survey, user=user).exists():
-            raise ValidationError({
-                'qualify': 'The user has already rated this survey.'
-            })    
-        return data
-    
-
     def create(self, validated_data):
         """
-        Crea la calificación.
+        Crea la calificación si el usuario aún no ha calificado la encuesta.
 
         Args:
             validated_data (dict): Datos validados para crear la calificación.
 
         Returns:
             Qualify: Calificación creada.
+
+        Raises:
+            serializers.ValidationError: Si el usuario ya calificó la encuesta.
         """
         user = self.context['request'].user
-        validated_data['user'] = user
-        return super().create(validated_data)
+        qualify = insert_qualify(validated_data['survey'].id, user, validated_data['assessment'])
+        if qualify is None:
+            raise serializers.ValidationError({'qualify': ['The user has already rated this survey.']})
+        return qualify
 
 
     def update(self, instance, validated_data):
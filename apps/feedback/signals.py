@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.core.utils import invalidate_count
+from .models import Comment, Qualify
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Qualify)
+def feedback_saved(sender, instance, created, **kwargs):
+    """
+    Invalida los conteos en caché de comentarios o calificaciones al crear un registro.
+    """
+    if created:
+        invalidate_count(sender)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Qualify)
+def feedback_deleted(sender, instance, **kwargs):
+    """
+    Invalida los conteos en caché de comentarios o calificaciones al eliminar un registro.
+    """
+    invalidate_count(sender)
@@ -1,13 +1,18 @@
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.surveys.models import Survey
+from apps.feedback.models import Qualify, SurveyRating
 from faker import Faker
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
 import random
 
 
@@ -55,6 +60,34 @@ class AddQualifySurveyTestsCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_add_qualify_survey_already_rated(self):
+        """
+        Prueba de que calificar de nuevo una encuesta es rechazado y no cambia la calificación ni el resumen.
+        """
+        response = self.client.post(self.url, {'assessment': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.url, {'assessment': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors']['qualify'], ['The user has already rated this survey.'])
+        self.assertEqual(Qualify.objects.get(survey=self.survey, user=self.user).assessment, 2)
+        rating = SurveyRating.objects.get(survey=self.survey)
+        self.assertEqual((rating.rating_count, rating.rating_sum, rating.star_2, rating.star_5), (1, 2, 1, 0))
+
+
+    def test_add_qualify_survey_single_statement(self):
+        """
+        Prueba de que la calificación se guarda con un único INSERT sin leer antes si existe.
+        """
+        SurveyRating.objects.create(survey=self.survey)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statements = [query['sql'] for query in context.captured_queries if 'feedback_' in query['sql']]
+        self.assertEqual(len([sql for sql in statements if '"feedback_qualify"' in sql]), 1)
+        self.assertTrue(statements[0].startswith('INSERT INTO "feedback_qualify"'))
+        self.assertEqual(len([sql for sql in statements if '"feedback_surveyrating"' in sql]), 1)
+
+
     def test_add_qualify_survey_not_found(self):
         """
         Prueba de agregar una calificación a una encuesta que no se encuentra.
@@ -97,3 +130,51 @@ class AddQualifySurveyTestsCase(TestCase):
         self.client.force_authenticate(user=None)
         response = self.client.post(self.url, self.data, format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# Tests de calificaciones concurrentes a una encuesta
+@skipUnless(connection.vendor == 'postgresql', 'Concurrent writes need a database with row locks.')
+class AddQualifySurveyConcurrencyTestsCase(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='TestUsername',
+            email='test@email.com',
+            password='TestPassword'
+        )
+        self.users = [
+            User.objects.create_user(username=f'rater_{index}', email=fake.email(), password=fake.password())
+            for index in range(4)
+        ]
+        self.survey = Survey.objects.create(
+            title=fake.sentence(nb_words=6),
+            end_date=timezone.now() + timedelta(days=1),
+            is_public=True,
+            user=self.user
+        )
+        self.url = reverse('add_qualify_survey', args=[self.survey.id])
+
+
+    def post_qualify(self, user, assessment):
+        try:
+            client = APIClient()
+            client.force_authenticate(user=user)
+            return client.post(self.url, {'assessment': assessment}, format='json').status_code
+        finally:
+            connections.close_all()
+
+
+    def test_add_qualify_survey_concurrent_clicks(self):
+        """
+        Prueba de que las calificaciones concurrentes no fallan y el resumen coincide con las calificaciones.
+        """
+        requests = [(user, random.randint(1, 5)) for user in self.users for _ in range(5)]
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            status_codes = list(executor.map(lambda request: self.post_qualify(*request), requests))
+        self.assertNotIn(status.HTTP_500_INTERNAL_SERVER_ERROR, status_codes)
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), len(self.users))
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), len(requests) - len(self.users))
+        self.assertEqual(Qualify.objects.filter(survey=self.survey).count(), len(self.users))
+        rating = SurveyRating.objects.get(survey=self.survey)
+        assessments = list(Qualify.objects.filter(survey=self.survey).values_list('assessment', flat=True))
+        self.assertEqual(rating.rating_count, len(assessments))
+        self.assertEqual(rating.rating_sum, sum(assessments))
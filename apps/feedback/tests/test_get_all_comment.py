@@ -2,10 +2,13 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.surveys.models import Survey
+from apps.feedback.models import Comment
 from faker import Faker
 from datetime import timedelta
 import random
@@ -53,6 +56,51 @@ class GetAllSurveysTestsCase(TestCase):
         self.assertTrue('data' in response.data)
     
 
+    def test_get_all_comment_survey_cursor_pagination(self):
+        """
+        Prueba de recorrer los comentarios de una encuesta con la paginación por cursor.
+        """
+        Comment.objects.bulk_create([
+            Comment(content=f'Comment number {index}', survey=self.survey, user=self.user)
+            for index in range(7)
+        ])
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        comment_ids = []
+        while True:
+            page_info = response.data['data']['page_info']
+            self.assertFalse('count' in page_info)
+            comment_ids += [comment['id'] for comment in response.data['data']['comments']]
+            if not page_info['links']['next']:
+                break
+            response = self.client.get(page_info['links']['next'])
+        self.assertEqual(comment_ids, sorted(Comment.objects.filter(survey=self.survey).values_list('id', flat=True)))
+
+
+    def test_get_all_comment_survey_fixed_queries_per_page(self):
+        """
+        Prueba de que el número de consultas por página no depende de page_size.
+        """
+        users = [
+            User.objects.create(username=f'user_{index}', email=f'user_{index}@email.com')
+            for index in range(30)
+        ]
+        Comment.objects.bulk_create([
+            Comment(content=f'Comment number {index}', survey=self.survey, user=user)
+            for index, user in enumerate(users)
+        ])
+        self.client.get(self.url, {'page_size': 1})
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(len(response.data['data']['comments']), 1)
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get(self.url, {'page_size': 30})
+        comments = response.data['data']['comments']
+        self.assertEqual(len(comments), 30)
+        self.assertEqual(len(large_page.captured_queries), len(small_page.captured_queries))
+        self.assertEqual({item['user']['username'] for item in comments}, {user.username for user in users})
+
+
     def test_get_all_comment_survey_without_autorization(self):
         """
         Prueba de obtener todos los comentarios de una encuesta sin autorización.
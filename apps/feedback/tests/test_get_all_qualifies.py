@@ -2,10 +2,13 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.surveys.models import Survey
+from apps.feedback.models import Qualify
 from faker import Faker
 from datetime import timedelta
 import random
@@ -53,6 +56,30 @@ class GetAllQualifiesSurveyTestsCase(TestCase):
         self.assertTrue('data' in response.data)
     
 
+    def test_get_all_qualifies_survey_fixed_queries_per_page(self):
+        """
+        Prueba de que el número de consultas por página no depende de page_size.
+        """
+        users = [
+            User.objects.create(username=f'user_{index}', email=f'user_{index}@email.com')
+            for index in range(30)
+        ]
+        Qualify.objects.bulk_create([
+            Qualify(assessment=random.randint(1, 5), survey=self.survey, user=user)
+            for user in users
+        ])
+        self.client.get(self.url, {'page_size': 1})
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(len(response.data['data']['qualifies']), 1)
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get(self.url, {'page_size': 30})
+        qualifies = response.data['data']['qualifies']
+        self.assertEqual(len(qualifies), 30)
+        self.assertEqual(len(large_page.captured_queries), len(small_page.captured_queries))
+        self.assertEqual({item['user']['username'] for item in qualifies}, {user.username for user in users})
+
+
     def test_get_all_qualifies_survey_without_autorization(self):
         """
         Prueba de obtener todas las calificaciones de una encuesta sin autorización.
@@ -0,0 +1,135 @@
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from apps.surveys.models import Survey
+from apps.feedback.models import Qualify, SurveyRating
+from apps.feedback.utils import rebuild_survey_ratings
+from faker import Faker
+from datetime import timedelta
+import random
+
+
+fake = Faker()
+
+
+# Tests para obtener el resumen de calificaciones de una encuesta
+class GetQualifySummarySurveyTestsCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='TestUsername',
+            email='test@email.com',
+            password='TestPassword'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.user_not_create = User.objects.create_user(
+            username=fake.user_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+        self.survey = Survey.objects.create(
+            title=fake.sentence(nb_words=6),
+            description=fake.text(max_nb_chars=200),
+            end_date=timezone.now() + timedelta(days=random.randint(1, 30)),
+            is_public=True,
+            user=self.user
+        )
+        self.url = reverse('get_qualify_summary_survey', args=[self.survey.id])
+
+
+    def qualify(self, user, assessment):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(reverse('add_qualify_survey', args=[self.survey.id]), {'assessment': assessment}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=self.user)
+        return Qualify.objects.get(survey=self.survey, user=user)
+
+
+    def test_get_qualify_summary_survey_successful(self):
+        """
+        Prueba de obtener el resumen de calificaciones que mantienen los endpoints de calificación.
+        """
+        self.qualify(self.user, 5)
+        qualify = self.qualify(self.user_not_create, 2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = response.data['data']['summary']
+        self.assertEqual(summary['rating_count'], 2)
+        self.assertEqual(summary['rating_sum'], 7)
+        self.assertEqual(summary['average'], 3.5)
+        self.assertEqual(summary['histogram'], {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+
+        self.client.force_authenticate(user=self.user_not_create)
+        self.client.put(reverse('update_qualify_survey', args=[self.survey.id, qualify.id]), {'assessment': 4}, format='json')
+        summary = self.client.get(self.url).data['data']['summary']
+        self.assertEqual(summary['rating_sum'], 9)
+        self.assertEqual(summary['histogram'], {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1})
+
+        self.client.delete(reverse('delete_qualify_survey', args=[self.survey.id, qualify.id]))
+        summary = self.client.get(self.url).data['data']['summary']
+        self.assertEqual(summary['rating_count'], 1)
+        self.assertEqual(summary['rating_sum'], 5)
+        self.assertEqual(summary['histogram'], {'1': 0, '2': 0, '3': 0, '4': 0, '5': 1})
+
+
+    def test_get_qualify_summary_survey_single_query(self):
+        """
+        Prueba de que el resumen se lee sin agregar las calificaciones.
+        """
+        self.qualify(self.user, 3)
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['summary']['rating_count'], 1)
+
+
+    def test_get_qualify_summary_survey_without_ratings(self):
+        """
+        Prueba de obtener el resumen de una encuesta sin calificaciones.
+        """
+        summary = self.client.get(self.url).data['data']['summary']
+        self.assertEqual(summary['rating_count'], 0)
+        self.assertIsNone(summary['average'])
+
+
+    def test_delete_user_removes_ratings(self):
+        """
+        Prueba de que eliminar un usuario resta sus calificaciones del resumen.
+        """
+        self.qualify(self.user, 5)
+        self.qualify(self.user_not_create, 1)
+        Token.objects.create(user=self.user_not_create)
+        self.client.force_authenticate(user=self.user_not_create)
+        response = self.client.delete(reverse('delete_user'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rating = SurveyRating.objects.get(survey=self.survey)
+        self.assertEqual((rating.rating_count, rating.rating_sum, rating.star_1), (1, 5, 0))
+
+
+    def test_rebuild_survey_ratings(self):
+        """
+        Prueba de que la reconciliación corrige las diferencias del resumen.
+        """
+        self.qualify(self.user, 4)
+        Qualify.objects.create(survey=self.survey, user=self.user_not_create, assessment=2)
+        self.assertEqual(rebuild_survey_ratings(fix=False), 1)
+        self.assertEqual(rebuild_survey_ratings(), 1)
+        self.assertEqual(rebuild_survey_ratings(), 0)
+        rating = SurveyRating.objects.get(survey=self.survey)
+        self.assertEqual((rating.rating_count, rating.rating_sum, rating.star_2, rating.star_4), (2, 6, 1, 1))
+
+
+    def test_get_qualify_summary_survey_without_autorization(self):
+        """
+        Prueba de obtener el resumen de calificaciones de una encuesta privada sin autorización.
+        """
+        self.survey.is_public = False
+        self.survey.save()
+        self.client.force_authenticate(user=self.user_not_create)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
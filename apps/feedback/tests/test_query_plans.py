@@ -0,0 +1,77 @@
+from rest_framework import status
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from apps.surveys.models import Survey
+from apps.feedback.models import Comment, Qualify
+from apps.core.tests.mixins import QueryPlansTestMixin
+
+
+# Tests de los planes de ejecución de las consultas de comentarios y calificaciones sobre tablas grandes
+class FeedbackQueryPlansTestCase(QueryPlansTestMixin, TestCase):
+    @classmethod
+    def setUpQueryPlansData(cls):
+        cls.survey = Survey.objects.filter(comments__isnull=False).order_by('id').first()
+        cls.comment = Comment.objects.filter(survey=cls.survey).first()
+        cls.qualify = Qualify.objects.filter(survey=cls.survey).first()
+
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.comment.user)
+
+
+    def test_get_all_comment_survey_query_plans(self):
+        """
+        Prueba de que listar los comentarios de una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_all_comment_survey', args=[self.survey.id]), {'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_get_all_qualifies_survey_query_plans(self):
+        """
+        Prueba de que listar las calificaciones de una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_all_qualifies_survey', args=[self.survey.id]), {'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_get_qualify_summary_survey_query_plans(self):
+        """
+        Prueba de que obtener el resumen de calificaciones no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_qualify_summary_survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_add_qualify_survey_query_plans(self):
+        """
+        Prueba de que calificar de nuevo una encuesta no recorre tablas completas.
+        """
+        self.client.force_authenticate(user=self.qualify.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('add_qualify_survey', args=[self.survey.id]), {'assessment': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_update_comment_survey_query_plans(self):
+        """
+        Prueba de que actualizar un comentario no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                reverse('update_comment_survey', args=[self.survey.id, self.comment.id]),
+                {'content': 'An updated comment content'},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
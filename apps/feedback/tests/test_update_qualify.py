@@ -9,6 +9,7 @@ from apps.surveys.models import Survey
 from apps.feedback.models import Qualify
 from faker import Faker
 from datetime import timedelta
+from unittest.mock import patch
 import random
 
 
@@ -83,6 +84,19 @@ class UpdateQualifySurveyTestsCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_update_qualify_survey_deleted_concurrently(self):
+        """
+        Prueba de actualizar una calificación que otra petición elimina después de obtenerla.
+        """
+        with patch('apps.feedback.views.get_qualify_by_id', return_value=self.qualify):
+            Qualify.objects.filter(id=self.qualify.id).delete()
+            response = self.client.put(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue('status' in response.data)
+        self.assertTrue('message' in response.data)
+        self.assertFalse(Qualify.objects.filter(id=self.qualify.id).exists())
+
+
     def test_update_qualify_survey_is_private_user_is_not_create(self):
         """
         Prueba de actualizar una calificación de una encuesta que es privada y el usuario no es su creador.
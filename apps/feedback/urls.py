@@ -10,6 +10,7 @@ urlpatterns = [
     path('feedbacks/survey/<str:survey_id>/comment/<int:comment_id>/delete', views.delete_comment_survey, name='delete_comment_survey'),
     path('feedbacks/survey/<str:survey_id>/qualify/add', views.add_qualify_survey, name='add_qualify_survey'),
     path('feedbacks/survey/<str:survey_id>/qualify/all', views.get_all_qualifies_survey, name='get_all_qualifies_survey'),
+    path('feedbacks/survey/<str:survey_id>/qualify/summary', views.get_qualify_summary_survey, name='get_qualify_summary_survey'),
     path('feedbacks/survey/<str:survey_id>/qualify/<int:qualify_id>/update', views.update_qualify_survey, name='update_qualify_survey'),
     path('feedbacks/survey/<str:survey_id>/qualify/<int:qualify_id>/delete', views.delete_qualify_survey, name='delete_qualify_survey'),
 ]
\ No newline at end of file
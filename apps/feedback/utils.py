@@ -1,4 +1,57 @@
-from .models import Comment, Qualify
+from django.db import transaction
+from django.db.models import Count, Sum, Q, F
+from django.db.models.query import QuerySet
+from apps.core.utils import insert_ignore_conflicts
+from .models import Comment, Qualify, SurveyRating
+
+
+# Valores posibles de una calificación
+STARS = [value for value, _ in Qualify.ASSESSMENT_CHOICES]
+
+# Columnas del usuario que serializa UserResponseSerializer
+USER_FIELDS = ['user__id', 'user__username', 'user__email', 'user__date_joined']
+
+
+def get_comments_queryset(survey):
+    """
+    Función para obtener el queryset del listado de comentarios de una encuesta.
+
+    Carga el usuario de cada comentario en la misma consulta y solo las columnas
+    que serializa CommentResponseSerializer, de modo que una página cuesta una consulta.
+
+    Args:
+        survey (Survey): Encuesta de los comentarios.
+
+    Returns:
+        QuerySet: Comentarios de la encuesta ordenados por ID.
+    """
+    return (
+        Comment.objects.filter(survey=survey.id)
+        .select_related('user')
+        .only('id', 'content', 'created_at', 'survey_id', *USER_FIELDS)
+        .order_by('id')
+    )
+
+
+def get_qualifies_queryset(survey):
+    """
+    Función para obtener el queryset del listado de calificaciones de una encuesta.
+
+    Carga el usuario de cada calificación en la misma consulta y solo las columnas
+    que serializa QualifyResponseSerializer, de modo que una página cuesta una consulta.
+
+    Args:
+        survey (Survey): Encuesta de las calificaciones.
+
+    Returns:
+        QuerySet: Calificaciones de la encuesta ordenadas por ID.
+    """
+    return (
+        Qualify.objects.filter(survey=survey.id)
+        .select_related('user')
+        .only('id', 'assessment', 'survey_id', *USER_FIELDS)
+        .order_by('id')
+    )
 
 
 def get_comment_by_id(comment_id):
@@ -42,3 +95,166 @@ def get_qualify_by_id(qualify_id):
             'status': 'error',
             'message': 'Qualify not found.'
         }
+
+
+def insert_qualify(survey_id, user, assessment):
+    """
+    Crea la calificación del usuario a la encuesta si aún no la ha calificado.
+
+    La calificación se inserta con una única sentencia INSERT ... ON CONFLICT DO NOTHING
+    sobre la restricción única (survey, user), sin leer antes si existe, por lo que las
+    peticiones concurrentes del mismo usuario no fallan con IntegrityError: solo la que
+    inserta la fila la suma al resumen de la encuesta.
+
+    Args:
+        survey_id (UUID): ID de la encuesta calificada.
+        user (User): Usuario que califica.
+        assessment (int): Valor de la calificación.
+
+    Returns:
+        Qualify: Calificación creada, o None si el usuario ya había calificado la encuesta.
+    """
+    qualify = Qualify(survey_id=survey_id, user=user, assessment=assessment)
+    with transaction.atomic():
+        inserted = insert_ignore_conflicts(Qualify, [qualify], unique_fields=['survey', 'user'], returning=['id'])
+        if not inserted:
+            return None
+        update_survey_rating(survey_id, added=assessment)
+
+    # Marca la instancia como guardada con el ID generado
+    qualify.id = inserted[0][0]
+    qualify._state.adding = False
+    return qualify
+
+
+def lock_qualify_assessment(qualify_id):
+    """
+    Bloquea la calificación hasta el fin de la transacción y devuelve su valor actual.
+
+    Las actualizaciones y eliminaciones de una misma calificación se serializan con
+    este bloqueo, de modo que el valor leído es el que se resta del resumen.
+
+    Args:
+        qualify_id (int): ID de la calificación.
+
+    Returns:
+        int: Valor actual de la calificación, o None si ya fue eliminada.
+    """
+    return Qualify.objects.select_for_update().filter(id=qualify_id).values_list('assessment', flat=True).first()
+
+
+def update_survey_rating(survey_id, added=None, removed=None):
+    """
+    Suma o resta una calificación al resumen de calificaciones de la encuesta.
+
+    Debe llamarse dentro de la misma transacción que guarda la calificación. El
+    resumen se actualiza con una única sentencia usando expresiones F, por lo que
+    las peticiones concurrentes no pierden incrementos.
+
+    Args:
+        survey_id (UUID): ID de la encuesta calificada.
+        added (int): Valor de la calificación agregada.
+        removed (int): Valor de la calificación eliminada o reemplazada.
+    """
+    changes = {}
+
+    # Agrupa los incrementos de cada contador
+    if added is not None:
+        changes['rating_count'] = changes.get('rating_count', 0) + 1
+        changes['rating_sum'] = changes.get('rating_sum', 0) + added
+        changes[f'star_{added}'] = changes.get(f'star_{added}', 0) + 1
+    if removed is not None:
+        changes['rating_count'] = changes.get('rating_count', 0) - 1
+        changes['rating_sum'] = changes.get('rating_sum', 0) - removed
+        changes[f'star_{removed}'] = changes.get(f'star_{removed}', 0) - 1
+
+    changes = {field: F(field) + delta for field, delta in changes.items() if delta}
+    if changes:
+        # Suma los incrementos con una sola sentencia y solo crea el resumen la primera vez
+        if not SurveyRating.objects.filter(survey_id=survey_id).update(**changes):
+            SurveyRating.objects.bulk_create([SurveyRating(survey_id=survey_id)], ignore_conflicts=True)
+            SurveyRating.objects.filter(survey_id=survey_id).update(**changes)
+
+
+def remove_user_ratings(user):
+    """
+    Resta las calificaciones del usuario de los resúmenes de sus encuestas.
+
+    Debe llamarse dentro de la misma transacción que elimina al usuario, antes de
+    eliminarlo, porque el borrado en cascada no pasa por los endpoints de calificación.
+
+    Args:
+        user (User): Usuario cuyas calificaciones se eliminarán.
+    """
+    # Bloquea las calificaciones del usuario para que no cambien antes de eliminarlas
+    for survey_id, assessment in Qualify.objects.select_for_update().filter(user=user).values_list('survey_id', 'assessment'):
+        update_survey_rating(survey_id, removed=assessment)
+
+
+def get_survey_rating_summary(survey):
+    """
+    Función para obtener el resumen de calificaciones de una encuesta.
+
+    Args:
+        survey (Survey): Encuesta de la que se obtiene el resumen.
+
+    Returns:
+        dict: Número de calificaciones, suma, promedio e histograma por estrellas.
+    """
+    rating = SurveyRating.objects.filter(survey=survey).first() or SurveyRating(survey=survey)
+    return {
+        'rating_count': rating.rating_count,
+        'rating_sum': rating.rating_sum,
+        'average': round(rating.rating_sum / rating.rating_count, 2) if rating.rating_count else None,
+        'histogram': {str(star): getattr(rating, f'star_{star}') for star in STARS},
+    }
+
+
+def rebuild_survey_ratings(survey=None, fix=True):
+    """
+    Recalcula los resúmenes de calificaciones desde la tabla Qualify y corrige las diferencias.
+
+    Args:
+        survey (Survey | QuerySet): Encuesta o queryset de encuestas a recalcular. Si es None se recalculan todas.
+        fix (bool): Si es False solo se comprueban las diferencias sin corregirlas.
+
+    Returns:
+        int: Número de resúmenes con diferencias.
+    """
+    lookup = 'survey__in' if isinstance(survey, QuerySet) else 'survey'
+    qualifies = Qualify.objects.all() if survey is None else Qualify.objects.filter(**{lookup: survey})
+    ratings = SurveyRating.objects.all() if survey is None else SurveyRating.objects.filter(**{lookup: survey})
+    fields = ['rating_count', 'rating_sum'] + [f'star_{star}' for star in STARS]
+
+    # Calcula los resúmenes reales de cada encuesta
+    actual = {
+        row[0]: row[1:]
+        for row in qualifies.values('survey_id')
+        .annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('assessment'),
+            **{f'star_{star}': Count('id', filter=Q(assessment=star)) for star in STARS},
+        )
+        .order_by()
+        .values_list('survey_id', *fields)
+    }
+    stored = {row[0]: row[1:] for row in ratings.values_list('survey_id', *fields)}
+
+    # Las encuestas sin calificaciones deben tener el resumen a cero
+    empty = (0,) * len(fields)
+    drifted = [
+        SurveyRating(survey_id=survey_id, **dict(zip(fields, actual.get(survey_id, empty))))
+        for survey_id in actual.keys() | stored.keys()
+        if actual.get(survey_id, empty) != stored.get(survey_id, empty)
+    ]
+
+    if fix:
+        # Sobrescribe los resúmenes con diferencias
+        SurveyRating.objects.bulk_create(
+            drifted,
+            update_conflicts=True,
+            unique_fields=['survey'],
+            update_fields=fields,
+        )
+
+    return len(drifted)
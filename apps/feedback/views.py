@@ -1,23 +1,23 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from apps.core.utils import CustomPageNumberPagination, validate_serializer, verify_user_is_creator
-from apps.surveys.utils import get_survey_by_id, check_user_invited, check_survey_is_public
-from config.settings.base import REST_FRAMEWORK
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from apps.core.utils import get_paginator, get_page_info, validate_serializer, verify_user_is_creator
+from apps.surveys.utils import get_survey_access, check_user_invited, check_survey_is_public
+from apps.users.authentication import CachedTokenAuthentication
 from .serializers import CommentValidationSerializer, CommentResponseSerializer, QualifyValidationSerializer, QualifyResponseSerializer
-from .models import Comment, Qualify
-from .utils import get_comment_by_id, get_qualify_by_id
+from .utils import get_comment_by_id, get_qualify_by_id, get_comments_queryset, get_qualifies_queryset, lock_qualify_assessment, update_survey_rating, get_survey_rating_summary
 
 
 # Endpoint para agregar un comentario a una encuesta
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def add_comment_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -58,11 +58,11 @@ def add_comment_survey(request, survey_id):
 
 #Endpoint para obtener todos los comentatios de una encuesta
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_comments_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -78,10 +78,10 @@ def get_all_comments_survey(request, survey_id):
             return Response(user_not_invited, status=status.HTTP_403_FORBIDDEN)
         
     # Obtiene todos los comentarios de la encuesta
-    comments = Comment.objects.filter(survey=survey.id).order_by('id')
+    comments = get_comments_queryset(survey)
 
     # Crea la paginación de los datos obtenidos
-    paginator = CustomPageNumberPagination()
+    paginator = get_paginator(request)
     paginated_queryset = paginator.paginate_queryset(comments, request)
 
     # Serializa los datos de los comentarios
@@ -95,11 +95,7 @@ def get_all_comments_survey(request, survey_id):
         'status': 'success',
         'message': 'Comments successfully obtained.',
         'data': {
-            'page_info': {
-                'count': response_data.data['count'],
-                'page_size': int(request.query_params.get('page_size', REST_FRAMEWORK['PAGE_SIZE'])),
-                'links': response_data.data['links']
-            },
+            'page_info': get_page_info(request, response_data),
             'comments': response_data.data['results']
         }
     }, status=status.HTTP_200_OK)
@@ -107,11 +103,11 @@ def get_all_comments_survey(request, survey_id):
 
 # Endpoint para actualizar un comentario de una encuesta
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def update_comment_survey(request, survey_id, comment_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -168,11 +164,11 @@ def update_comment_survey(request, survey_id, comment_id):
 
 # Endpoint para eliminar un comentario de una encuesta
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_comment_survey(request, survey_id, comment_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -213,11 +209,11 @@ def delete_comment_survey(request, survey_id, comment_id):
 
 # Endpoint para agregar una calificación a una encuesta
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def add_qualify_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -246,8 +242,16 @@ def add_qualify_survey(request, survey_id):
         # Respuesta de error en la validación del serializer
         return Response(validation_error, status=status.HTTP_400_BAD_REQUEST)
     
-    # Guarda la calificación
-    qualify_validation_serializer.save()
+    try:
+        # Guarda la calificación con una única sentencia que no inserta nada si el usuario ya calificó
+        qualify_validation_serializer.save()
+    except ValidationError as e:
+        # Respuesta erronea al usuario ya haber calificado la encuesta
+        return Response({
+            'status': 'error',
+            'message': 'Errors in data validation.',
+            'errors': e.detail
+        }, status=status.HTTP_400_BAD_REQUEST)
     
     # Respuesta exitosa a agregar una calificación
     return Response({
@@ -258,11 +262,11 @@ def add_qualify_survey(request, survey_id):
 
 #Endpoint para obtener todas las calificaciones de una encuesta
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_qualifies_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -278,10 +282,10 @@ def get_all_qualifies_survey(request, survey_id):
             return Response(user_not_invited, status=status.HTTP_403_FORBIDDEN)
         
     # Obtiene todas las calificaciones de la encuesta
-    qualifies = Qualify.objects.filter(survey=survey.id).order_by('id')
+    qualifies = get_qualifies_queryset(survey)
 
     # Crea la paginación de los datos obtenidos
-    paginator = CustomPageNumberPagination()
+    paginator = get_paginator(request)
     paginated_queryset = paginator.paginate_queryset(qualifies, request)
 
     # Serializa los datos de las calificaciones
@@ -295,23 +299,50 @@ def get_all_qualifies_survey(request, survey_id):
         'status': 'success',
         'message': 'Qualifies successfully obtained.',
         'data': {
-            'page_info': {
-                'count': response_data.data['count'],
-                'page_size': int(request.query_params.get('page_size', REST_FRAMEWORK['PAGE_SIZE'])),
-                'links': response_data.data['links']
-            },
+            'page_info': get_page_info(request, response_data),
             'qualifies': response_data.data['results']
         }
     }, status=status.HTTP_200_OK)
 
 
+# Endpoint para obtener el resumen de calificaciones de una encuesta
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def get_qualify_summary_survey(request, survey_id):
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
+
+    # Comprueba si la función devolvió un diccionario de error
+    if isinstance(survey, dict) and survey.get('status') == 'error':
+        # Respuesta erronea al no encontrar la encuesta
+        return Response(survey, status=status.HTTP_404_NOT_FOUND)
+
+    # Verifica si la encuesta es pública y el usuario el creador
+    if not check_survey_is_public(survey) and verify_user_is_creator(survey, request.user, message='You do not have permission to rate this survey.'):
+        # Verifica si el usuario esta invitado
+        user_not_invited = check_user_invited(survey, request.user.email)
+        if isinstance(user_not_invited, dict) and user_not_invited.get('status') == 'error':
+            # Respuesta erronea al usuario no cumplir la verificación
+            return Response(user_not_invited, status=status.HTTP_403_FORBIDDEN)
+
+    # Respuesta exitosa al obtener el resumen de calificaciones
+    return Response({
+        'status': 'success',
+        'message': 'Qualify summary successfully obtained.',
+        'data': {
+            'summary': get_survey_rating_summary(survey)
+        }
+    }, status=status.HTTP_200_OK)
+
+
 # Endpoint para actualizar una calificación de una encuesta
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def update_qualify_survey(request, survey_id, qualify_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -356,8 +387,17 @@ def update_qualify_survey(request, survey_id, qualify_id):
         # Respuesta de error en la validación del serializer
         return Response(validation_error, status=status.HTTP_400_BAD_REQUEST)
 
-    # Actualiza el comentario de la encuesta
-    qualify_validation_serializer.save()
+    # Actualiza la calificación y reemplaza su valor en el resumen de la encuesta
+    with transaction.atomic():
+        previous_assessment = lock_qualify_assessment(qualify.id)
+        if previous_assessment is None:
+            # Respuesta erronea al eliminarse la calificación mientras se actualizaba
+            return Response({
+                'status': 'error',
+                'message': 'Qualify not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        qualify = qualify_validation_serializer.save()
+        update_survey_rating(qualify.survey_id, added=qualify.assessment, removed=previous_assessment)
 
     # Respuesta exitosa al actualizar el comentario
     return Response({
@@ -368,11 +408,11 @@ def update_qualify_survey(request, survey_id, qualify_id):
 
 # Endpoint para eliminar una calificación de una encuesta
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_qualify_survey(request, survey_id, qualify_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -401,8 +441,12 @@ def delete_qualify_survey(request, survey_id, qualify_id):
         # Respuesta erronea al usuario no ser el creador
         return Response(verification_result, status=status.HTTP_403_FORBIDDEN)
     
-    # Elimina la califiación de la encuesta
-    qualify.delete()
+    # Elimina la califiación de la encuesta y la resta de su resumen
+    with transaction.atomic():
+        previous_assessment = lock_qualify_assessment(qualify.id)
+        if previous_assessment is not None:
+            qualify.delete()
+            update_survey_rating(qualify.survey_id, removed=previous_assessment)
 
     # Respuesta exitosa al eliminar la calificación
     return Response({
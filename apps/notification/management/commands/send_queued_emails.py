@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from apps.notification.utils import process_queued_emails, retry_failed_emails
+from time import sleep
+
+
+class Command(BaseCommand):
+    help = 'Send the queued emails using a thread pool, retrying failed deliveries with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of threads sending emails.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of emails claimed per batch.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--retry-failed', action='store_true', help='Queue again the emails that exhausted their attempts.')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty instead of waiting for new emails.')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(f'{retry_failed_emails()} failed emails queued again.')
+
+        self.stdout.write('Sending queued emails...')
+        while True:
+            sent, failed = process_queued_emails(options['batch_size'], options['workers'])
+            if sent or failed:
+                self.stdout.write(f'{sent} emails sent, {failed} emails failed.')
+                continue
+            if options['once']:
+                break
+            sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Email queue processed!'))
@@ -0,0 +1,28 @@
+from django.db import models
+from django.utils import timezone
+
+
+# Definición del modelo de correos electrónicos en cola
+class QueuedEmail(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    subject = models.CharField(max_length=255, null=False, blank=False)
+    message = models.TextField(null=False, blank=False)
+    sender = models.CharField(max_length=254, null=True, blank=True)
+    recipient_list = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']), # Acelera la búsqueda de correos pendientes
+        ]
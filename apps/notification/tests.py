@@ -1,6 +1,10 @@
 from django.conf import settings
-from .utils import EmailNotification
-from unittest.mock import patch
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.notification.models import QueuedEmail
+from apps.notification.utils import EmailNotification, enqueue_notifications, process_queued_emails, retry_failed_emails
+from unittest.mock import patch, MagicMock
 import unittest
 
 
@@ -43,5 +47,89 @@ class EmailNotificationTestCase(unittest.TestCase):
         )
 
 
+
+# Tests para la cola de correos electrónicos
+class QueuedEmailTestCase(TestCase):
+    def setUp(self):
+        self.notification = EmailNotification("Test Subject", "This is a test message.", ["recipient@example.com"])
+
+
+    def test_enqueue_email(self):
+        """
+        Prueba de agregar un correo electrónico a la cola sin enviarlo.
+        """
+        queued_email = self.notification.enqueue()
+        self.assertEqual(queued_email.status, 'pending')
+        self.assertEqual(queued_email.recipient_list, ["recipient@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+
+
+    def test_process_queued_emails_successful(self):
+        """
+        Prueba de enviar los correos electrónicos en cola.
+        """
+        queued_email = self.notification.enqueue()
+        sent, failed = process_queued_emails()
+        self.assertEqual((sent, failed), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Test Subject")
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'sent')
+        self.assertIsNotNone(queued_email.sent_at)
+
+
+    @patch('apps.notification.utils.get_connection', side_effect=ConnectionError('SMTP unavailable'))
+    def test_process_queued_emails_retry_with_backoff(self, mock_get_connection):
+        """
+        Prueba de reintentar más tarde un correo electrónico cuyo envío falla.
+        """
+        queued_email = self.notification.enqueue()
+        sent, failed = process_queued_emails()
+        self.assertEqual((sent, failed), (0, 1))
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'pending')
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertEqual(queued_email.last_error, 'SMTP unavailable')
+        self.assertGreater(queued_email.next_attempt_at, timezone.now())
+        self.assertEqual(process_queued_emails(), (0, 0))
+
+
+    @override_settings(EMAIL_QUEUE_MAX_ATTEMPTS=1)
+    @patch('apps.notification.utils.get_connection', side_effect=ConnectionError('SMTP unavailable'))
+    def test_process_queued_emails_max_attempts(self, mock_get_connection):
+        """
+        Prueba de marcar como fallido un correo electrónico que agota sus intentos y volver a ponerlo en cola.
+        """
+        queued_email = self.notification.enqueue()
+        process_queued_emails()
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'failed')
+        self.assertEqual(retry_failed_emails(), 1)
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, 'pending')
+
+
+    @patch('apps.notification.utils.get_connection')
+    def test_process_queued_emails_single_connection(self, mock_get_connection):
+        """
+        Prueba de enviar varios correos por una sola conexión registrando el resultado de cada uno.
+        """
+        def send_messages(messages):
+            if messages[0].to == ['bad@example.com']:
+                raise ValueError('Recipient refused')
+            return 1
+        connection = MagicMock()
+        connection.send_messages.side_effect = send_messages
+        mock_get_connection.return_value = connection
+        recipients = ['one@example.com', 'bad@example.com', 'two@example.com']
+        queued_emails = enqueue_notifications([EmailNotification("Subject", "Message", [recipient]) for recipient in recipients])
+        sent, failed = process_queued_emails(workers=1)
+        self.assertEqual((sent, failed), (2, 1))
+        self.assertEqual(mock_get_connection.call_count, 1)
+        self.assertEqual(connection.send_messages.call_count, 3)
+        statuses = {email.recipient_list[0]: email.status for email in QueuedEmail.objects.filter(id__in=[email.id for email in queued_emails])}
+        self.assertEqual(statuses, {'one@example.com': 'sent', 'bad@example.com': 'pending', 'two@example.com': 'sent'})
+
+
 if __name__ == '__main__':
     unittest.main()
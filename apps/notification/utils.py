@@ -1,5 +1,10 @@
-from django.core.mail import send_mail
+from django.core.mail import send_mail, get_connection, EmailMessage
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from .models import QueuedEmail
 
 
 class EmailNotification:
@@ -32,3 +37,160 @@ class EmailNotification:
             self.recipient_list,
             fail_silently=fail_silently,
         )
+
+
+    def to_queued_email(self):
+        """
+        Construye el registro de la cola de correos del mensaje sin guardarlo.
+
+        Returns:
+            QueuedEmail: Correo electrónico en cola sin guardar.
+        """
+        return QueuedEmail(
+            subject=self.subject,
+            message=self.message,
+            sender=self.sender,
+            recipient_list=self.recipient_list,
+        )
+
+
+    def enqueue(self):
+        """
+        Guarda el mensaje en la cola de correos para que lo envíe el comando send_queued_emails.
+
+        Returns:
+            QueuedEmail: Correo electrónico en cola.
+        """
+        queued_email = self.to_queued_email()
+        queued_email.save()
+        return queued_email
+
+
+def enqueue_notifications(notifications):
+    """
+    Guarda varios mensajes en la cola de correos con una inserción masiva.
+
+    Args:
+        notifications (list): Notificaciones a guardar.
+
+    Returns:
+        list: Correos electrónicos en cola, en el mismo orden que las notificaciones.
+    """
+    return QueuedEmail.objects.bulk_create(
+        [notification.to_queued_email() for notification in notifications],
+        batch_size=settings.EMAIL_QUEUE_BATCH_SIZE,
+    )
+
+
+def claim_queued_emails(batch_size):
+    """
+    Reserva un lote de correos pendientes para enviarlos.
+
+    Los correos reservados pasan al estado 'sending' durante EMAIL_QUEUE_LEASE_SECONDS;
+    si el proceso que los reservó no termina en ese tiempo, vuelven a estar disponibles.
+
+    Args:
+        batch_size (int): Número máximo de correos a reservar.
+
+    Returns:
+        list: Correos electrónicos reservados.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        QueuedEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            status='sending',
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS),
+        )
+    return emails
+
+
+def deliver_queued_emails(emails):
+    """
+    Envía un bloque de correos en cola reutilizando una única conexión al servidor de correo.
+
+    Args:
+        emails (list): Correos electrónicos a enviar.
+
+    Returns:
+        list: Mensaje del error de cada correo si su envío falla, None si se envía correctamente.
+    """
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as e:
+        return [str(e) or e.__class__.__name__] * len(emails)
+
+    errors = []
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.message, email.sender, email.recipient_list, connection=connection)
+            try:
+                connection.send_messages([message])
+                errors.append(None)
+            except Exception as e:
+                errors.append(str(e) or e.__class__.__name__)
+    finally:
+        connection.close()
+    return errors
+
+
+def process_queued_emails(batch_size=100, workers=4):
+    """
+    Envía un lote de correos en cola usando un grupo de hilos y registra el resultado.
+
+    El lote se reparte en un bloque por hilo y cada bloque se envía por una sola conexión.
+
+    Los envíos fallidos se reintentan con un retraso exponencial hasta
+    EMAIL_QUEUE_MAX_ATTEMPTS intentos; después quedan en estado 'failed'.
+
+    Args:
+        batch_size (int): Número máximo de correos a enviar.
+        workers (int): Número de hilos que envían los correos.
+
+    Returns:
+        tuple: Número de correos enviados y número de correos fallidos.
+    """
+    emails = claim_queued_emails(batch_size)
+    if not emails:
+        return 0, 0
+
+    # Reparte los correos en un bloque por hilo y los envía en paralelo
+    chunks = [emails[index::workers] for index in range(min(workers, len(emails)))]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        results = list(executor.map(deliver_queued_emails, chunks))
+    emails = [email for chunk in chunks for email in chunk]
+    errors = [error for result in results for error in result]
+
+    # Registra el resultado de cada envío
+    now = timezone.now()
+    sent = 0
+    for email, error in zip(emails, errors):
+        email.attempts += 1
+        email.last_error = error
+        if error is None:
+            email.status = 'sent'
+            email.sent_at = now
+            sent += 1
+        elif email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            email.status = 'failed'
+        else:
+            email.status = 'pending'
+            email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1))
+
+    QueuedEmail.objects.bulk_update(emails, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+    return sent, len(emails) - sent
+
+
+def retry_failed_emails():
+    """
+    Vuelve a poner en cola los correos que agotaron sus intentos.
+
+    Returns:
+        int: Número de correos que vuelven a estar pendientes.
+    """
+    return QueuedEmail.objects.filter(status='failed').update(status='pending', attempts=0, next_attempt_at=timezone.now())
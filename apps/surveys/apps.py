@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SurveysConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.surveys'
+
+
+    def ready(self):
+        # Registra las señales de la aplicación
+        from . import signals
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.surveys.models import Survey
+from datetime import timedelta
+from statistics import median
+from time import perf_counter
+
+
+class Command(BaseCommand):
+    help = 'Measure the get_all_surveys response time as the Survey table grows. All the data is rolled back at the end.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='Comma separated Survey table sizes to measure.')
+        parser.add_argument('--requests', type=int, default=20, help='Requests measured per table size.')
+        parser.add_argument('--page-size', type=int, default=10, help='Page size requested.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Surveys inserted per statement.')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        url = reverse('get_all_surveys')
+        client = APIClient()
+
+        self.stdout.write('Measuring get_all_surveys...')
+        with transaction.atomic():
+            user = User.objects.create(username='benchmark_get_all_surveys', email='benchmark@example.com')
+            client.force_authenticate(user=user)
+            end_date = timezone.now() + timedelta(days=30)
+
+            for size in sizes:
+                # Crece la tabla de encuestas hasta el tamaño indicado
+                missing = size - Survey.objects.count()
+                while missing > 0:
+                    batch = min(missing, options['batch_size'])
+                    Survey.objects.bulk_create([
+                        Survey(title=f'Benchmark survey {index}', end_date=end_date, is_public=True, user=user)
+                        for index in range(batch)
+                    ])
+                    missing -= batch
+
+                # Mide el tiempo de respuesta de la primera y la última página
+                for page in ('first', 'last'):
+                    timings = []
+                    for _ in range(options['requests']):
+                        start = perf_counter()
+                        response = client.get(url, {'page_size': options['page_size'], 'page': 1 if page == 'first' else 'last'})
+                        timings.append((perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.status_code
+                    self.stdout.write(f'{size:>10} surveys, {page:>5} page: median {median(timings):8.2f} ms, max {max(timings):8.2f} ms')
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished!'))
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction, DatabaseError
+from apps.surveys.models import Answer
+from apps.core.utils import uuid7
+from time import perf_counter
+from uuid import uuid4
+
+
+# Generadores de IDs a comparar
+GENERATORS = {
+    'uuid4': uuid4,
+    'uuid7': uuid7,
+}
+
+# Consulta del tamaño en bytes de los índices de una tabla
+INDEX_SIZE_QUERIES = {
+    'postgresql': 'SELECT pg_indexes_size(%s)',
+    'sqlite': 'SELECT SUM(pgsize) FROM dbstat WHERE tbl_name = %s AND name != tbl_name',
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare insert throughput and primary key index size of uuid4 and uuid7 keys. The benchmark tables are dropped at the end.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000000, help='Rows inserted per generator.')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows inserted per statement.')
+        parser.add_argument('--generators', default=','.join(GENERATORS), help='Comma separated generators to measure.')
+
+    def handle(self, *args, **options):
+        # Usa el mismo tipo de columna que la clave primaria de Answer
+        field = Answer._meta.pk
+        column_type = field.db_type(connection)
+        quote = connection.ops.quote_name
+
+        self.stdout.write(f'Inserting {options["rows"]} rows per generator...')
+        for name in options['generators'].split(','):
+            generate = GENERATORS[name]
+            table = f'benchmark_uuid_keys_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+                cursor.execute(f'CREATE TABLE {quote(table)} (id {column_type} NOT NULL PRIMARY KEY, position integer NOT NULL)')
+                try:
+                    pages = self.get_page_count(cursor)
+
+                    # Inserta las filas por bloques, una transacción por bloque
+                    insert = f'INSERT INTO {quote(table)} (id, position) VALUES (%s, %s)'
+                    start = perf_counter()
+                    for offset in range(0, options['rows'], options['batch_size']):
+                        batch = range(offset, min(offset + options['batch_size'], options['rows']))
+                        with transaction.atomic():
+                            cursor.executemany(insert, [(field.get_db_prep_value(generate(), connection), position) for position in batch])
+                    elapsed = perf_counter() - start
+
+                    # Obtiene el tamaño del índice de la clave primaria
+                    try:
+                        cursor.execute(INDEX_SIZE_QUERIES[connection.vendor], [table])
+                        size = f'primary key index {cursor.fetchone()[0] / 1024 / 1024:.2f} MB'
+                    except (KeyError, DatabaseError):
+                        # SQLite sin la tabla virtual dbstat: se mide el crecimiento de la base de datos
+                        growth = (self.get_page_count(cursor) - pages) * self.get_page_size(cursor)
+                        size = f'table and index {growth / 1024 / 1024:.2f} MB'
+
+                    self.stdout.write(f'{name}: {options["rows"] / elapsed:12.0f} rows/s, {elapsed:8.2f} s, {size}')
+                finally:
+                    cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished!'))
+
+    def get_page_count(self, cursor):
+        """
+        Obtiene el número de páginas en uso de la base de datos SQLite, o 0 en otros motores.
+        """
+        if connection.vendor != 'sqlite':
+            return 0
+        cursor.execute('PRAGMA page_count')
+        page_count = cursor.fetchone()[0]
+        cursor.execute('PRAGMA freelist_count')
+        return page_count - cursor.fetchone()[0]
+
+    def get_page_size(self, cursor):
+        """
+        Obtiene el tamaño en bytes de las páginas de la base de datos SQLite, o 0 en otros motores.
+        """
+        if connection.vendor != 'sqlite':
+            return 0
+        cursor.execute('PRAGMA page_size')
+        return cursor.fetchone()[0]
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.surveys.models import Survey
+from apps.surveys.utils import stream_survey_export
+
+
+class Command(BaseCommand):
+    help = 'Export a survey with its asks, options and optionally its answers as NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('survey', help='ID of the survey to export.')
+        parser.add_argument('output', help='Path of the export file.')
+        parser.add_argument('--answers', action='store_true', help='Include the answers of the survey.')
+        parser.add_argument('--gzip', action='store_true', help='Compress the export with gzip.')
+
+    def handle(self, *args, **options):
+        survey = Survey.objects.get(id=options['survey'])
+
+        self.stdout.write(f'Exporting survey "{survey.title}"...')
+
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_survey_export(survey, include_answers=options['answers'], compress=options['gzip']):
+                output.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Survey exported to {options["output"]} successfully!'))
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from apps.surveys.utils import read_survey_import, import_survey_records
+
+
+class Command(BaseCommand):
+    help = 'Import a survey from an NDJSON export, plain or compressed with gzip.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Path of the export file.')
+        parser.add_argument('--user', required=True, help='Username of the owner of the imported survey.')
+
+    def handle(self, *args, **options):
+        user = User.objects.get(username=options['user'])
+
+        self.stdout.write(f'Importing survey from {options["input"]}...')
+
+        with open(options['input'], 'rb') as input_file:
+            result = import_survey_records(read_survey_import(input_file), user)
+
+        self.stdout.write(f'Imported {result["asks"]} asks, {result["options"]} options and {result["answers"]} answers.')
+        if result['skipped_answers']:
+            self.stdout.write(self.style.WARNING(f'Skipped {result["skipped_answers"]} answers of unknown users.'))
+
+        self.stdout.write(self.style.SUCCESS(f'Survey {result["survey"].id} imported successfully!'))
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0001_initial'),
+        ('surveys', '0002_invitation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invitation',
+            name='queued_email',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invitations', to='notification.queuedemail'),
+        ),
+    ]
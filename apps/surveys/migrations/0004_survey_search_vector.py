@@ -0,0 +1,143 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Índice GIN y triggers que mantienen search_vector en PostgreSQL
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX surveys_survey_search_vector_idx ON surveys_survey USING gin (search_vector)
+    """,
+    """
+    CREATE FUNCTION surveys_survey_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce((SELECT username FROM auth_user WHERE id = NEW.user_id), '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER surveys_survey_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON surveys_survey
+    FOR EACH ROW EXECUTE FUNCTION surveys_survey_search_vector_update()
+    """,
+    """
+    CREATE FUNCTION auth_user_survey_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE surveys_survey SET search_vector = NULL WHERE user_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER auth_user_survey_search_vector_trigger
+    AFTER UPDATE OF username ON auth_user
+    FOR EACH ROW WHEN (OLD.username IS DISTINCT FROM NEW.username)
+    EXECUTE FUNCTION auth_user_survey_search_vector_update()
+    """,
+    # Calcula el vector de las encuestas existentes mediante el trigger
+    """
+    UPDATE surveys_survey SET search_vector = NULL
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP TRIGGER IF EXISTS auth_user_survey_search_vector_trigger ON auth_user',
+    'DROP FUNCTION IF EXISTS auth_user_survey_search_vector_update()',
+    'DROP TRIGGER IF EXISTS surveys_survey_search_vector_trigger ON surveys_survey',
+    'DROP FUNCTION IF EXISTS surveys_survey_search_vector_update()',
+    'DROP INDEX IF EXISTS surveys_survey_search_vector_idx',
+]
+
+# Tabla FTS5 y triggers que la mantienen en SQLite
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE surveys_survey_fts USING fts5(
+        survey_id UNINDEXED, title, description, username,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER surveys_survey_fts_insert AFTER INSERT ON surveys_survey BEGIN
+        INSERT INTO surveys_survey_fts (survey_id, title, description, username)
+        VALUES (NEW.id, NEW.title, coalesce(NEW.description, ''), (SELECT username FROM auth_user WHERE id = NEW.user_id));
+    END
+    """,
+    """
+    CREATE TRIGGER surveys_survey_fts_update AFTER UPDATE OF title, description, user_id ON surveys_survey BEGIN
+        UPDATE surveys_survey_fts
+        SET title = NEW.title,
+            description = coalesce(NEW.description, ''),
+            username = (SELECT username FROM auth_user WHERE id = NEW.user_id)
+        WHERE survey_id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER surveys_survey_fts_delete AFTER DELETE ON surveys_survey BEGIN
+        DELETE FROM surveys_survey_fts WHERE survey_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER auth_user_survey_fts_update AFTER UPDATE OF username ON auth_user
+    WHEN OLD.username IS NOT NEW.username BEGIN
+        UPDATE surveys_survey_fts SET username = NEW.username
+        WHERE survey_id IN (SELECT id FROM surveys_survey WHERE user_id = NEW.id);
+    END
+    """,
+    # Indexa las encuestas existentes
+    """
+    INSERT INTO surveys_survey_fts (survey_id, title, description, username)
+    SELECT survey.id, survey.title, coalesce(survey.description, ''), owner.username
+    FROM surveys_survey AS survey JOIN auth_user AS owner ON owner.id = survey.user_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS auth_user_survey_fts_update',
+    'DROP TRIGGER IF EXISTS surveys_survey_fts_delete',
+    'DROP TRIGGER IF EXISTS surveys_survey_fts_update',
+    'DROP TRIGGER IF EXISTS surveys_survey_fts_insert',
+    'DROP TABLE IF EXISTS surveys_survey_fts',
+]
+
+
+def run_statements(statements):
+    """
+    Construye la operación que ejecuta las sentencias del motor de base de datos en uso.
+
+    Args:
+        statements (dict): Sentencias a ejecutar por motor de base de datos.
+
+    Returns:
+        function: Función para RunPython.
+    """
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    # Los triggers leen y observan auth_user, por lo que las migraciones de auth que
+    # rehacen la tabla en SQLite deben aplicarse antes de crearlos
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('surveys', '0003_invitation_queued_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_statements({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_statements({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:05
+
+from django.db import migrations
+
+
+# Extensión pg_trgm e índices GIN de trigramas sobre las expresiones que genera icontains en PostgreSQL
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX surveys_survey_title_trgm_idx ON surveys_survey USING gin (UPPER(title::text) gin_trgm_ops)',
+    'CREATE INDEX auth_user_username_trgm_idx ON auth_user USING gin (UPPER(username::text) gin_trgm_ops)',
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS auth_user_username_trgm_idx',
+    'DROP INDEX IF EXISTS surveys_survey_title_trgm_idx',
+]
+
+
+def run_statements(statements):
+    """
+    Construye la operación que ejecuta las sentencias del motor de base de datos en uso.
+
+    Args:
+        statements (dict): Sentencias a ejecutar por motor de base de datos.
+
+    Returns:
+        function: Función para RunPython.
+    """
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0004_survey_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'postgresql': POSTGRESQL_FORWARD}),
+            run_statements({'postgresql': POSTGRESQL_BACKWARD}),
+        ),
+    ]
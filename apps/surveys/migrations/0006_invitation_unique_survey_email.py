@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:23
+
+from django.db import migrations
+from django.db.models import Min, Count
+
+
+def remove_duplicate_invitations(apps, schema_editor):
+    """
+    Elimina las invitaciones repetidas, conservando la primera de cada encuesta y correo.
+    """
+    Invitation = apps.get_model('surveys', 'Invitation')
+    duplicates = (
+        Invitation.objects.values('survey_id', 'email')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for duplicate in list(duplicates):
+        Invitation.objects.filter(survey_id=duplicate['survey_id'], email=duplicate['email']).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0005_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_invitations, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='invitation',
+            unique_together={('survey', 'email')},
+        ),
+    ]
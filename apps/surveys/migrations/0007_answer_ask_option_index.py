@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0006_invitation_unique_survey_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['ask', 'option'], name='surveys_ans_ask_id_a370c5_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:57
+
+import apps.core.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_answer_ask_option_index'),
+    ]
+
+    # El default de los IDs se calcula en Python y no forma parte del esquema, así
+    # que solo cambia el estado. Un AlterField real reconstruiría las tablas en
+    # SQLite y eliminaría los triggers de búsqueda de surveys_survey.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='answer',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.utils.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='ask',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.utils.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='option',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.utils.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='survey',
+                    name='id',
+                    field=models.UUIDField(default=apps.core.utils.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0008_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveySearchIndex',
+            fields=[
+                ('survey', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='surveys.survey')),
+                ('document', models.TextField(db_column='surveys_survey_fts')),
+            ],
+            options={
+                'db_table': 'surveys_survey_fts',
+                'managed': False,
+            },
+        ),
+    ]
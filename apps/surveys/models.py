@@ -1,18 +1,45 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
-from uuid import uuid4
+from django.contrib.postgres.search import SearchVectorField
+from apps.notification.models import QueuedEmail
+from apps.core.utils import uuid7
 
 
 # Definición del modelo de encuestas
 class Survey(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=255, null=False, blank=False)
     description = models.TextField(null=True, blank=True)
     start_date = models.DateTimeField(default=timezone.now, null=False, blank=False)
     end_date = models.DateTimeField(null=False, blank=False)
     is_public = models.BooleanField(default=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='surveys')
+    search_vector = SearchVectorField(null=True, editable=False) # Lo calcula un trigger de PostgreSQL
+
+
+# Definición de la búsqueda de texto completo de FTS5 (SQLite)
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+# Definición de la tabla FTS5 de búsqueda de encuestas en SQLite, creada y mantenida por triggers
+class SurveySearchIndex(models.Model):
+    survey = models.OneToOneField(Survey, on_delete=models.DO_NOTHING, primary_key=True, db_constraint=False, related_name='search_index')
+    document = models.TextField(db_column='surveys_survey_fts') # Columna oculta de FTS5 con el nombre de la tabla, recibe MATCH y bm25
+
+
+    class Meta:
+        managed = False
+        db_table = 'surveys_survey_fts'
+
+
+SurveySearchIndex._meta.get_field('document').register_lookup(FullTextMatch)
 
 
 # Definición del modelo de pregunta de la encuesta
@@ -22,7 +49,7 @@ class Ask(models.Model):
         ('short', 'Short Answer'),
         ('boolean', 'True/False'),
     ]
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     text = models.CharField(max_length=255, null=False, blank=False)
     type = models.CharField(max_length=10, choices=TYPE_CHOICES, null=False, blank=False)
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='asks')
@@ -30,14 +57,14 @@ class Ask(models.Model):
 
 # Definición del modelo de opciones de respuesta de la encuesta
 class Option(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     text = models.CharField(max_length=255, null=False, blank=False)
     ask = models.ForeignKey(Ask, on_delete=models.CASCADE, related_name='options')
 
 
 # Definición del modelo de respuesta
 class Answer(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     content_answer = models.CharField(max_length=255, null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='answers')
     ask = models.ForeignKey(Ask, on_delete=models.CASCADE, related_name='answers')
@@ -46,6 +73,9 @@ class Answer(models.Model):
 
     class Meta:
         unique_together = ('user', 'ask') # Asegura que el mismo usuario no responda dos veces
+        indexes = [
+            models.Index(fields=['ask', 'option']), # Acelera los conteos de respuestas por pregunta y opción
+        ]
 
 
 # Definición del modelo de invitación
@@ -53,3 +83,8 @@ class Invitation(models.Model):
     survey = models.ForeignKey(Survey, on_delete=models.CASCADE)
     email = models.EmailField()
     invited_at = models.DateTimeField(auto_now_add=True)
+    queued_email = models.ForeignKey(QueuedEmail, on_delete=models.SET_NULL, related_name='invitations', blank=True, null=True)
+
+
+    class Meta:
+        unique_together = ('survey', 'email') # Asegura que el mismo correo no se invite dos veces a la misma encuesta
@@ -1,13 +1,18 @@
 from rest_framework import serializers
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from .models import Survey, Option, Ask, Answer
 from apps.users.serializers import UserResponseSerializer
+from apps.analysis.utils import remove_answer_stats
 
 
 class OptionSerializer(serializers.ModelSerializer):
     """
     Serializador para las opciones de las preguntas.
     """
+    id = serializers.UUIDField(required=False) # Identifica la opción a modificar al actualizar la encuesta
+
     class Meta:
         """
         Metadatos del serializador.
@@ -24,6 +29,7 @@ class AksSerializer(serializers.ModelSerializer):
     """
     Serializador para las preguntas de las encuestas.
     """
+    id = serializers.UUIDField(required=False) # Identifica la pregunta a modificar al actualizar la encuesta
     options = OptionSerializer(many=True, required=False)
 
     class Meta:
@@ -107,6 +113,10 @@ class SurveyValidationSerializer(serializers.ModelSerializer):
         """
         Verifica que las preguntas cumplan con las reglas.
 
+        Al actualizar, las reglas se aplican a la pregunta resultante: su tipo actual si
+        no se envía y sus opciones actuales junto con las enviadas, salvo las que
+        delete_missing elimina. El tipo de una pregunta con respuestas no se puede cambiar.
+
         Args:
             asks (list): Lista de preguntas a validar.
 
@@ -116,24 +126,87 @@ class SurveyValidationSerializer(serializers.ModelSerializer):
         Raises:
             serializers.ValidationError: Si alguna pregunta no cumple con las reglas.
         """
+        current_asks, current_options = {}, {}
+        if self.instance is not None:
+            # Al actualizar, obtiene las preguntas y opciones actuales y verifica que los IDs enviados les pertenezcan
+            current_asks = {
+                ask['id']: ask
+                for ask in Ask.objects.filter(survey=self.instance).values(
+                    'id', 'type', has_answers=Exists(Answer.objects.filter(ask=OuterRef('pk')))
+                )
+            }
+            current_options = dict(Option.objects.filter(ask__survey=self.instance).values_list('id', 'ask_id'))
+            self.validate_asks_ids(asks, current_asks, current_options)
+
+        delete_missing = self.context.get('delete_missing', False)
         for ask in asks:
+            current = current_asks.get(ask.get('id'))
+            options = ask.get('options')
+            ask_type = ask.get('type')
+            options_count = len(options or [])
+
+            if current is not None:
+                # El tipo de una pregunta con respuestas no puede cambiar
+                if ask_type is not None and ask_type != current['type'] and current['has_answers']:
+                    raise serializers.ValidationError('The type of a question with answers cannot be changed.')
+
+                # Combina las opciones actuales de la pregunta con las enviadas
+                ask_type = ask_type or current['type']
+                kept_options = {option_id for option_id, ask_id in current_options.items() if ask_id == current['id']}
+                if options is not None:
+                    kept_options = set() if delete_missing else kept_options - {option.get('id') for option in options}
+                options_count += len(kept_options)
+
             # Validación para preguntas de opción múltiple
-            if ask.get('type') == 'multiple':
-                options = ask.get('options', [])
-                if len(options) < 2:
+            if ask_type == 'multiple':
+                if options_count < 2:
                     raise serializers.ValidationError("Multiple choice questions must have at least two options.")
 
             # Validación para preguntas de corta o verdadero/falso
-            elif ask.get('type') in ['short', 'boolean']:
-                if 'options' in ask and ask['options']:
+            elif ask_type in ['short', 'boolean']:
+                if options_count:
                     raise serializers.ValidationError('Short or true/false questions should not have options.')
         
         return asks
 
 
+    def validate_asks_ids(self, asks, current_asks, current_options):
+        """
+        Verifica que las preguntas y opciones con ID pertenezcan a la encuesta y que las nuevas estén completas.
+
+        Args:
+            asks (list): Lista de preguntas a validar.
+            current_asks (dict): Preguntas actuales de la encuesta por ID.
+            current_options (dict): ID de la pregunta de cada opción actual de la encuesta.
+
+        Raises:
+            serializers.ValidationError: Si algún ID no pertenece a la encuesta o a su pregunta,
+                o si a una pregunta u opción nueva le faltan datos.
+        """
+        for ask in asks:
+            ask_id = ask.get('id')
+            if ask_id is None:
+                if not ask.get('text') or not ask.get('type'):
+                    raise serializers.ValidationError('New questions require text and type.')
+            elif ask_id not in current_asks:
+                raise serializers.ValidationError(f'Question {ask_id} does not belong to this survey.')
+
+            for option in ask.get('options', []):
+                option_id = option.get('id')
+                if option_id is None:
+                    if not option.get('text'):
+                        raise serializers.ValidationError('New options require text.')
+                elif ask_id is None or current_options.get(option_id) != ask_id:
+                    raise serializers.ValidationError(f'Option {option_id} does not belong to question {ask_id}.')
+
+
     def create(self, validated_data):
         """
-        Crea la encuesta.
+        Crea la encuesta con sus preguntas y opciones.
+
+        Las preguntas y las opciones se insertan con una inserción masiva cada una
+        dentro de una transacción; sus IDs (UUID) se generan antes de insertarlas,
+        por lo que el número de consultas no depende del número de preguntas u opciones.
 
         Args:
             validated_data (dict): Datos validados para crear la encuesta.
@@ -148,16 +221,25 @@ class SurveyValidationSerializer(serializers.ModelSerializer):
         # Extrae las preguntas anidadas del diccionario de datos validados
         asks_data = validated_data.pop('asks', [])
 
-        # Crea la instancia de Survey con los datos validados (sin incluir 'asks')
-        survey = super().create(validated_data)
+        with transaction.atomic():
+            # Crea la instancia de Survey con los datos validados (sin incluir 'asks')
+            survey = super().create(validated_data)
+
+            # Construye las preguntas y las opciones de cada pregunta
+            asks = []
+            options = []
+            for ask_data in asks_data:
+                options_data = ask_data.pop('options', [])  # Extrae las opciones anidadas
+                ask_data.pop('id', None)  # Los IDs solo identifican filas existentes al actualizar
+                ask = Ask(survey=survey, **ask_data)
+                asks.append(ask)
+                for option_data in options_data:
+                    option_data.pop('id', None)
+                    options.append(Option(ask=ask, **option_data))
 
-        # Itera sobre cada pregunta (ask) proporcionada en la solicitud
-        for ask_data in asks_data:
-            options_data = ask_data.pop('options', [])  # Extrae las opciones anidadas
-            ask = Ask.objects.create(survey=survey, **ask_data)  # Crea cada pregunta
-            # Crea cada opción asociada a la pregunta actual
-            for option_data in options_data:
-                Option.objects.create(ask=ask, **option_data) # Crea cada opción
+            # Inserta todas las preguntas y después todas las opciones
+            Ask.objects.bulk_create(asks)
+            Option.objects.bulk_create(options)
 
         return survey
 
@@ -166,6 +248,11 @@ class SurveyValidationSerializer(serializers.ModelSerializer):
         """
         Actualiza la encuesta.
 
+        Las preguntas y opciones con ID se modifican, las que no tienen ID se crean y,
+        si el contexto incluye delete_missing=True, se eliminan las que no se enviaron.
+        Los cambios se calculan comparando con las filas actuales, que se leen una
+        sola vez, y se aplican con operaciones masivas dentro de una transacción.
+
         Args:
             instance (Survey): Instancia de la encuesta a actualizar.
             validated_data (dict): Datos validados para actualizar la encuesta.
@@ -174,62 +261,93 @@ class SurveyValidationSerializer(serializers.ModelSerializer):
             Survey: Encuesta actualizada.
         """
         # Extrae los datos de las preguntas (asks) del diccionario de datos validados
-        asks_data = validated_data.pop('asks', [])
-        
-        # Actualiza la instancia de la encuesta con los datos validados (sin incluir 'asks')
-        instance = super().update(instance, validated_data)
+        asks_data = validated_data.pop('asks', None)
+
+        with transaction.atomic():
+            # Actualiza la instancia de la encuesta con los datos validados (sin incluir 'asks')
+            instance = super().update(instance, validated_data)
+
+            # Aplica los cambios de las preguntas y opciones si se enviaron
+            if asks_data is not None:
+                self.update_asks(instance, asks_data, self.context.get('delete_missing', False))
 
-        # Itera sobre cada pregunta proporcionada en la solicitud
-        for ask_data in asks_data:
-            # Extrae las opciones anidadas del diccionario de datos de la pregunta
-            options_data = ask_data.pop('options', [])
-            
-            # Obtiene el ID de la pregunta si existe
-            ask_id = ask_data.get('id')
-            
-            # Si la pregunta ya existe (tiene un ID)
-            if ask_id:
-                # Recupera la pregunta existente de la base de datos
-                ask = Ask.objects.get(id=ask_id, survey=instance)
-                
-                # Actualiza los atributos de la pregunta existente
-                for key, value in ask_data.items():
-                    setattr(ask, key, value)
-                
-                # Guarda los cambios de la pregunta
-                ask.save()
-                
-                # Itera sobre cada opción asociada a la pregunta actual
-                for option_data in options_data:
-                    # Obtiene el ID de la opción si existe
-                    option_id = option_data.get('id')
-                    
-                    # Si la opción ya existe (tiene un ID)
-                    if option_id:
-                        # Recupera la opción existente de la base de datos
-                        option = Option.objects.get(id=option_id, ask=ask)
-                        
-                        # Actualiza el texto de la opción existente
-                        option.text = option_data.get('text', option.text)
-                        
-                        # Guarda los cambios de la opción
-                        option.save()
-                    else:
-                        # Crea una nueva opción asociada a la pregunta actual
-                        Option.objects.create(ask=ask, **option_data)
-            else:
-                # Si la pregunta no existe, crea una nueva pregunta
-                ask = Ask.objects.create(survey=instance, **ask_data)
-                
-                # Itera sobre cada opción asociada a la nueva pregunta
-                for option_data in options_data:
-                    # Crea una nueva opción asociada a la nueva pregunta
-                    Option.objects.create(ask=ask, **option_data)
-        
         # Retorna la instancia actualizada de la encuesta
         return instance
 
 
+    def update_asks(self, survey, asks_data, delete_missing):
+        """
+        Aplica a la encuesta las diferencias entre sus preguntas y opciones actuales y las enviadas.
+
+        Args:
+            survey (Survey): Encuesta a actualizar.
+            asks_data (list): Datos validados de las preguntas.
+            delete_missing (bool): Si es True elimina las preguntas y opciones que no se enviaron.
+        """
+        # Obtiene las preguntas y opciones actuales de la encuesta
+        current_asks = {ask.id: ask for ask in Ask.objects.filter(survey=survey)}
+        current_options = {option.id: option for option in Option.objects.filter(ask__survey=survey)}
+
+        asks_to_create, asks_to_update = [], []
+        options_to_create, options_to_update = [], []
+        kept_asks, kept_options = set(), set()
+        replaced_asks = set()
+
+        for ask_data in asks_data:
+            # Extrae las opciones anidadas y el ID de la pregunta
+            options_data = ask_data.pop('options', None)
+            ask_id = ask_data.pop('id', None)
+
+            if ask_id is None:
+                # Construye la nueva pregunta
+                ask = Ask(survey=survey, **ask_data)
+                asks_to_create.append(ask)
+            else:
+                # Modifica la pregunta existente solo si cambió algún campo
+                ask = current_asks[ask_id]
+                kept_asks.add(ask_id)
+                changed = {key: value for key, value in ask_data.items() if getattr(ask, key) != value}
+                if changed:
+                    for key, value in changed.items():
+                        setattr(ask, key, value)
+                    asks_to_update.append(ask)
+
+            if options_data is None:
+                continue
+            replaced_asks.add(ask.id)
+
+            for option_data in options_data:
+                option_id = option_data.pop('id', None)
+                if option_id is None:
+                    # Construye la nueva opción
+                    options_to_create.append(Option(ask=ask, **option_data))
+                else:
+                    # Modifica la opción existente solo si cambió el texto
+                    option = current_options[option_id]
+                    kept_options.add(option_id)
+                    if option_data.get('text', option.text) != option.text:
+                        option.text = option_data['text']
+                        options_to_update.append(option)
+
+        # Aplica los cambios con operaciones masivas
+        Ask.objects.bulk_update(asks_to_update, ['text', 'type'])
+        Ask.objects.bulk_create(asks_to_create)
+        Option.objects.bulk_update(options_to_update, ['text'])
+        Option.objects.bulk_create(options_to_create)
+
+        if delete_missing:
+            # Elimina las preguntas no enviadas y las opciones no enviadas de las preguntas que incluyeron opciones
+            Ask.objects.filter(id__in=current_asks.keys() - kept_asks).delete()
+            options_to_delete = [
+                option.id for option in current_options.values()
+                if option.ask_id in replaced_asks and option.id not in kept_options
+            ]
+            if options_to_delete:
+                # Resta de los contadores de sus preguntas las respuestas que se eliminan en cascada con las opciones
+                remove_answer_stats(Answer.objects.filter(option__in=options_to_delete))
+                Option.objects.filter(id__in=options_to_delete).delete()
+
+
 class SurveyResponseSerializer(serializers.ModelSerializer):
     """
     Serializador para la respuesta de datos de encuesta.
@@ -250,21 +368,51 @@ class SurveyResponseSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'start_date', 'end_date', 'is_public', 'user', 'asks', 'options']
 
 
-class AnswerValidationSerializer(serializers.ModelSerializer):
+class AnswerListValidationSerializer(serializers.ListSerializer):
+    """
+    Serializador para la validación de la lista de respuestas de una encuesta.
+    """
+    def validate(self, data):
+        """
+        Verifica que no se responda la misma pregunta más de una vez.
+
+        Args:
+            data (list): Respuestas validadas.
+
+        Returns:
+            list: Respuestas validadas.
+
+        Raises:
+            serializers.ValidationError: Si una pregunta se responde más de una vez.
+        """
+        ask_ids = [answer['ask'].id for answer in data]
+        if len(ask_ids) != len(set(ask_ids)):
+            raise serializers.ValidationError("Each question can only be answered once.")
+        return data
+
+
+class AnswerValidationSerializer(serializers.Serializer):
     """
-    Serializador para la validación y creación de respuestas.
+    Serializador para la validación de respuestas.
+
+    Las preguntas y opciones se resuelven desde el contexto, que debe contener
+    la encuesta ('survey'), sus preguntas con las opciones precargadas ('asks')
+    y las preguntas que el usuario ya respondió ('answered'), por lo que la
+    validación no realiza consultas.
     """
+    content_answer = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
+    ask = serializers.UUIDField()
+    option = serializers.UUIDField(required=False, allow_null=True)
+
     class Meta:
         """
         Metadatos del serializador.
 
         Attributes:
-            model (Answer): Modelo de respuesta.
-            fields (list): Campos del serializador.
+            list_serializer_class (ListSerializer): Serializador usado al validar varias respuestas.
         """
-        model = Answer
-        fields = ['content_answer', 'user', 'ask', 'option']
-    
+        list_serializer_class = AnswerListValidationSerializer
+
 
     def validate(self, data):
         """
@@ -274,23 +422,53 @@ class AnswerValidationSerializer(serializers.ModelSerializer):
             data (dict): Datos a validar.
 
         Returns:
-            dict: Datos validados.
+            dict: Datos validados con la pregunta y la opción como instancias.
 
         Raises:
             serializers.ValidationError: Si alguna validación falla.
         """
         # Verificar que la encuesta está activa (start_date <= now <= end_date)
-        ask = data.get('ask')
-        if ask:
-            survey = ask.survey
-            now = timezone.now()
-            if not (survey.start_date <= now <= survey.end_date):
-                raise serializers.ValidationError("The survey is not active.")
-        
+        survey = self.context['survey']
+        now = timezone.now()
+        if not (survey.start_date <= now <= survey.end_date):
+            raise serializers.ValidationError("The survey is not active.")
+
+        return self.validate_answer(data)
+
+
+    def validate_answer(self, data):
+        """
+        Valida la respuesta según su pregunta y el tipo de la pregunta.
+
+        Args:
+            data (dict): Datos a validar.
+
+        Returns:
+            dict: Datos validados con la pregunta y la opción como instancias.
+
+        Raises:
+            serializers.ValidationError: Si alguna validación falla.
+        """
+        # Verificar que la pregunta pertenece a la encuesta
+        ask = self.context['asks'].get(data['ask'])
+        if ask is None:
+            raise serializers.ValidationError({'ask': "The question does not belong to this survey."})
+
+        # Verificar que el usuario no haya respondido la pregunta
+        if ask.id in self.context['answered']:
+            raise serializers.ValidationError({'ask': "The user has already answered this question."})
+
+        # Verificar que la opción pertenece a la pregunta
+        option = None
+        option_id = data.get('option')
+        if option_id:
+            option = next((option for option in ask.options.all() if option.id == option_id), None)
+            if option is None:
+                raise serializers.ValidationError({'option': "The option does not belong to this question."})
+
         # Validar las opciones de respuesta según el tipo de pregunta
         ask_type = ask.type
         content_answer = data.get('content_answer')
-        option = data.get('option')
 
         if ask_type == 'multiple':
             if not option:
@@ -300,10 +478,43 @@ class AnswerValidationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(f"{ask_type.capitalize()} questions should not have options.")
             if ask_type == 'boolean' and content_answer not in ['True', 'False']:
                 raise serializers.ValidationError("Boolean questions require a True or False answer.")
-        
+
+        data['ask'] = ask
+        data['option'] = option
         return data
 
 
+class AnswerImportSerializer(AnswerValidationSerializer):
+    """
+    Serializador para la validación de las respuestas de una encuesta importada.
+
+    Aplica las mismas reglas que AnswerValidationSerializer salvo el periodo activo
+    de la encuesta, ya que se importan respuestas de encuestas ya finalizadas, y
+    admite varias respuestas a la misma pregunta de distintos usuarios.
+    """
+    class Meta:
+        """
+        Metadatos del serializador.
+
+        Attributes:
+            list_serializer_class (ListSerializer): Serializador usado al validar varias respuestas.
+        """
+        list_serializer_class = serializers.ListSerializer
+
+
+    def validate(self, data):
+        """
+        Valida los datos de la respuesta importada.
+
+        Args:
+            data (dict): Datos a validar.
+
+        Returns:
+            dict: Datos validados con la pregunta y la opción como instancias.
+        """
+        return self.validate_answer(data)
+
+
 class AnswerResponseSerializer(serializers.ModelSerializer):
     """
     Serializador para la respuesta de datos de respuesta.
@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.core.utils import invalidate_count, bump_version
+from .models import Survey, Invitation
+from .utils import invalidate_survey_cache, cache_invitations, invalidate_invitation, get_survey_version_key, get_user_version_key
+
+
+def invalidate_survey(survey_id):
+    """
+    Elimina la encuesta de la caché y cambia su versión.
+
+    Se ejecuta después del commit para que una petición concurrente no vuelva a
+    guardar en caché los datos anteriores a la transacción.
+
+    Args:
+        survey_id (UUID): ID de la encuesta.
+    """
+    invalidate_survey_cache(survey_id)
+    bump_version(get_survey_version_key(survey_id))
+
+
+@receiver(post_save, sender=Survey)
+def survey_saved(sender, instance, created, **kwargs):
+    """
+    Elimina la encuesta de la caché y cambia su versión al guardarla, después del commit, e invalida los conteos en caché al crearla.
+    """
+    survey_id = instance.id
+    transaction.on_commit(lambda: invalidate_survey(survey_id))
+    if created:
+        invalidate_count(sender)
+
+
+@receiver(post_delete, sender=Survey)
+def survey_deleted(sender, instance, **kwargs):
+    """
+    Elimina la encuesta de la caché y cambia su versión, después del commit, e invalida los conteos en caché al eliminar una encuesta.
+    """
+    # Guarda el ID antes del commit, ya que al eliminar la encuesta Django lo pone a None
+    survey_id = instance.id
+    transaction.on_commit(lambda: invalidate_survey(survey_id))
+    invalidate_count(sender)
+
+
+@receiver(post_save, sender=Invitation)
+def invitation_saved(sender, instance, **kwargs):
+    """
+    Guarda en caché que el correo está invitado a la encuesta al guardar la invitación, después del commit.
+    """
+    survey_id, email = instance.survey_id, instance.email
+    transaction.on_commit(lambda: cache_invitations(survey_id, [email]))
+
+
+@receiver(post_delete, sender=Invitation)
+def invitation_deleted(sender, instance, **kwargs):
+    """
+    Elimina la invitación de la caché al eliminarla, también al eliminar su encuesta, después del commit.
+    """
+    survey_id, email = instance.survey_id, instance.email
+    transaction.on_commit(lambda: invalidate_invitation(survey_id, email))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Cambia la versión de los datos públicos del usuario al modificarlo.
+
+    Se ignora la actualización de last_login que se hace en cada inicio de sesión.
+    """
+    if update_fields is None or set(update_fields) - {'last_login'}:
+        bump_version(get_user_version_key(instance.id))
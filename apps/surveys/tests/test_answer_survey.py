@@ -2,10 +2,14 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey, Ask, Option
+from apps.surveys.models import Survey, Ask, Option, Answer
+from apps.analysis.models import AskStats, OptionStats, KeywordStats
+from apps.analysis.utils import rebuild_answer_stats
 from faker import Faker
 from datetime import timedelta
 import random
@@ -68,6 +72,96 @@ class AnswerSurveyTestCase(TestCase):
         self.assertTrue('data' in response.data)
 
 
+    def test_answer_survey_updates_answer_stats(self):
+        """
+        Prueba de que responder una encuesta actualiza los contadores de respuestas.
+        """
+        ask_boolean = Ask.objects.create(survey=self.survey, text='¿Te gusta Django?', type='boolean')
+        self.data['answers'].append({'content_answer': 'True', 'ask': ask_boolean.id})
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(OptionStats.objects.get(option=self.option_python).answers_count, 1)
+        self.assertEqual(AskStats.objects.get(ask=self.ask).total_answers, 1)
+        self.assertEqual(AskStats.objects.get(ask=ask_boolean).true_count, 1)
+        self.assertEqual(rebuild_answer_stats(self.survey, fix=False), {'asks': 0, 'options': 0, 'keywords': 0})
+
+
+    def test_answer_survey_updates_keyword_stats(self):
+        """
+        Prueba de que responder una pregunta corta suma sus palabras clave a los contadores.
+        """
+        ask_short = Ask.objects.create(survey=self.survey, text='¿Por qué?', type='short')
+        self.data['answers'].append({'content_answer': 'Simple, simple and fast', 'ask': ask_short.id})
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            dict(KeywordStats.objects.filter(ask=ask_short).values_list('word', 'occurrences')),
+            {'simple': 2, 'fast': 1}
+        )
+        self.assertEqual(rebuild_answer_stats(self.survey, fix=False), {'asks': 0, 'options': 0, 'keywords': 0})
+
+
+    def test_answer_survey_invalid_answer_keeps_no_answers(self):
+        """
+        Prueba de que una respuesta inválida no deja guardadas las respuestas anteriores.
+        """
+        self.data['answers'].append({'ask': self.ask.id})
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Answer.objects.filter(ask=self.ask).exists())
+        self.assertFalse(AskStats.objects.filter(ask=self.ask).exists())
+
+
+    def test_answer_survey_constant_queries(self):
+        """
+        Prueba de que el número de consultas no depende del número de respuestas.
+        """
+        with CaptureQueriesContext(connection) as single_queries:
+            self.client.post(self.url, self.data, format='json')
+        survey = Survey.objects.create(
+            title=fake.sentence(nb_words=6),
+            end_date=timezone.now() + timedelta(days=1),
+            is_public=True,
+            user=self.user
+        )
+        answers = []
+        for index in range(20):
+            ask = Ask.objects.create(survey=survey, text=f'Ask {index}', type='multiple')
+            option = Option.objects.create(ask=ask, text='Yes')
+            Option.objects.create(ask=ask, text='No')
+            answers.append({'ask': ask.id, 'option': option.id})
+        with CaptureQueriesContext(connection) as many_queries:
+            response = self.client.post(reverse('answer_survey', args=[survey.id]), {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(many_queries), len(single_queries))
+
+
+    def test_answer_survey_already_answered(self):
+        """
+        Prueba de responder dos veces la misma pregunta de una encuesta.
+        """
+        self.client.post(self.url, self.data, format='json')
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('errors' in response.data)
+        self.assertEqual(Answer.objects.filter(ask=self.ask).count(), 1)
+
+
+    def test_answer_survey_ask_from_other_survey(self):
+        """
+        Prueba de responder una pregunta que no pertenece a la encuesta.
+        """
+        survey = Survey.objects.create(
+            title=fake.sentence(nb_words=6),
+            end_date=timezone.now() + timedelta(days=1),
+            is_public=True,
+            user=self.user
+        )
+        response = self.client.post(reverse('answer_survey', args=[survey.id]), self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('errors' in response.data)
+
+
     def test_answer_survey_invalid_data(self):
         """
         Prueba de responder una encuesta con datos inválidos.
@@ -143,6 +237,19 @@ class AnswerSurveyTestCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_answer_survey_is_private_cached_access(self):
+        """
+        Prueba de que con la encuesta y la invitación en caché se rechaza sin consultar la base de datos.
+        """
+        self.survey.is_public = False
+        self.survey.save()
+        self.client.force_authenticate(user=self.user_not_create)
+        self.client.post(self.url, self.data, format='json')
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
     def test_answer_survey_without_token(self):
         """
         Prueba de responder una encuesta sin token.
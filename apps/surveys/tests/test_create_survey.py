@@ -4,9 +4,14 @@ from rest_framework.authtoken.models import Token
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from apps.surveys.models import Survey, Ask, Option
 from faker import Faker
 from datetime import datetime, timedelta
+from uuid import UUID
 import random
+import time
 
 
 fake = Faker()
@@ -59,6 +64,47 @@ class SurveyCreateTestscase(TestCase):
         self.assertTrue('data' in response.data)
         
 
+    def test_create_survey_constant_queries(self):
+        """
+        Prueba de que el número de consultas no depende del número de preguntas y opciones.
+        """
+        def build_asks(total_asks, total_options):
+            return [
+                {
+                    'text': f'Ask {ask_index}',
+                    'type': 'multiple',
+                    'options': [{'text': f'Option {option_index}'} for option_index in range(total_options)]
+                }
+                for ask_index in range(total_asks)
+            ]
+
+        with CaptureQueriesContext(connection) as small_queries:
+            response = self.client.post(self.url, {**self.data, 'asks': build_asks(1, 2)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with CaptureQueriesContext(connection) as large_queries:
+            response = self.client.post(self.url, {**self.data, 'asks': build_asks(50, 5)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertEqual(len(response.data['data']['survey']['asks']), 50)
+        self.assertEqual(Ask.objects.count(), 51)
+        self.assertEqual(Option.objects.count(), 252)
+
+
+    def test_create_survey_time_ordered_ids(self):
+        """
+        Prueba de que los IDs de las encuestas y sus preguntas siguen el orden de creación.
+        """
+        survey_ids = []
+        for _ in range(3):
+            response = self.client.post(self.url, {**self.data, 'asks': [{'text': 'Ask', 'type': 'short'}]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            survey_ids.append(UUID(str(response.data['data']['survey']['id'])))
+            time.sleep(0.002)
+        self.assertTrue(all(survey_id.version == 7 for survey_id in survey_ids))
+        self.assertEqual(list(Survey.objects.order_by('id').values_list('id', flat=True)), survey_ids)
+        self.assertEqual(list(Ask.objects.order_by('id').values_list('survey_id', flat=True)), survey_ids)
+
+
     def test_create_survey_without_title(self):
         """
         Prueba de crear una encuesta sin un título.
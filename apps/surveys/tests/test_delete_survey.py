@@ -3,9 +3,11 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
 from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey
+from apps.surveys.models import Survey, Ask, Option
 from faker import Faker
 from datetime import timedelta
 import random
@@ -52,6 +54,22 @@ class DeleteSurveyTestsCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_delete_survey_constant_queries(self):
+        """
+        Prueba de que el número de consultas al eliminar una encuesta no depende del número de preguntas u opciones.
+        """
+        query_counts = []
+        for count in [1, 20]:
+            survey = Survey.objects.create(title=fake.sentence(nb_words=6), end_date=timezone.now() + timedelta(days=1), user=self.user)
+            asks = Ask.objects.bulk_create([Ask(survey=survey, text=f'Ask {index}', type='multiple') for index in range(count)])
+            Option.objects.bulk_create([Option(ask=ask, text=f'Option {index}') for ask in asks for index in range(2)])
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(reverse('delete_survey', args=[survey.id]), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
     def test_delete_survey_not_found(self):
         """
         Prueba de eliminar una encuesta que no existe
@@ -1,11 +1,15 @@
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey
+from apps.surveys.models import Survey, Ask, Option
+from apps.surveys.serializers import SurveyResponseSerializer
+from unittest.mock import patch
 from faker import Faker
 from datetime import timedelta
 import random
@@ -47,6 +51,103 @@ class GetAllSurveysTestsCase(TestCase):
         self.assertTrue('data' in response.data)
 
 
+    @override_settings(COUNT_CACHE_MODE='exact')
+    def test_get_all_survey_fixed_queries_per_page(self):
+        """
+        Prueba de que el número de consultas por página no depende de page_size.
+        """
+        surveys = [self.survey] + [
+            Survey.objects.create(
+                title=f'Listing survey {index}',
+                end_date=timezone.now() + timedelta(days=1),
+                is_public=True,
+                user=self.user
+            )
+            for index in range(29)
+        ]
+        for survey in surveys:
+            for ask_index in range(2):
+                ask = Ask.objects.create(survey=survey, text=f'Ask {ask_index}', type='multiple')
+                Option.objects.create(ask=ask, text='Yes')
+                Option.objects.create(ask=ask, text='No')
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(len(response.data['data']['surveys']), 1)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'page_size': 100})
+        surveys = response.data['data']['surveys']
+        self.assertEqual(sum(len(ask['options']) for survey in surveys for ask in survey['asks']), 120)
+
+
+    def test_get_all_survey_serializes_only_requested_page(self):
+        """
+        Prueba de que solo se serializan las encuestas de la página solicitada.
+        """
+        Survey.objects.bulk_create([
+            Survey(title=f'Survey {index}', end_date=timezone.now() + timedelta(days=1), user=self.user)
+            for index in range(50)
+        ])
+        with patch('apps.surveys.views.SurveyResponseSerializer', wraps=SurveyResponseSerializer) as serializer:
+            response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(serializer.call_count, 1)
+        self.assertEqual(len(serializer.call_args.args[0]), 5)
+
+
+    def test_get_all_survey_cached_count(self):
+        """
+        Prueba de que el total de encuestas se guarda en caché hasta que se crea o elimina una encuesta.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['page_info']['count'], 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(response.data['data']['page_info']['count'], 1)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        survey = Survey.objects.create(title='New survey', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['page_info']['count'], 2)
+        survey.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['page_info']['count'], 1)
+
+
+    @override_settings(COUNT_CACHE_MODE='exact')
+    def test_get_all_survey_exact_count(self):
+        """
+        Prueba de que el modo exacto cuenta las encuestas en cada petición.
+        """
+        self.client.get(self.url)
+        Survey.objects.bulk_create([
+            Survey(title=f'Survey {index}', end_date=timezone.now() + timedelta(days=1), user=self.user)
+            for index in range(3)
+        ])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['data']['page_info']['count'], 4)
+
+
+    def test_get_all_survey_cursor_pagination(self):
+        """
+        Prueba de recorrer todas las encuestas con la paginación por cursor.
+        """
+        Survey.objects.bulk_create([
+            Survey(title=f'Survey {index}', end_date=timezone.now() + timedelta(days=1), user=self.user)
+            for index in range(11)
+        ])
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        survey_ids = []
+        while True:
+            page_info = response.data['data']['page_info']
+            self.assertFalse('count' in page_info)
+            self.assertEqual(page_info['page_size'], 5)
+            survey_ids += [str(survey['id']) for survey in response.data['data']['surveys']]
+            if not page_info['links']['next']:
+                break
+            response = self.client.get(page_info['links']['next'])
+        self.assertEqual(survey_ids, sorted(str(survey_id) for survey_id in Survey.objects.values_list('id', flat=True)))
+
+
     def test_get_all_survey_without_token(self):
         """
         Prueba de obtener todas las encuesta sin token.
@@ -2,10 +2,14 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.surveys.models import Survey
+from apps.surveys.utils import get_survey_cache_key
 from faker import Faker
 from datetime import timedelta
 import random
@@ -90,6 +94,106 @@ class GetSurveyIdTestsCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_get_survey_id_cached(self):
+        """
+        Prueba de que la encuesta se obtiene de la caché después de la primera consulta.
+        """
+        self.client.get(self.url, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('FROM "surveys_survey"' in query['sql'] for query in queries.captured_queries))
+
+
+    def test_get_survey_id_caches_access_fields_only(self):
+        """
+        Prueba de que solo se guardan en caché el ID, el creador y la visibilidad de la encuesta.
+        """
+        self.client.get(self.url, format='json')
+        cached = cache.get(get_survey_cache_key(self.survey.id))
+        self.assertEqual(tuple(cached), (self.survey.id, self.survey.is_public, self.user.id))
+
+
+    def test_get_survey_id_cache_invalidated_on_save(self):
+        """
+        Prueba de que al guardar la encuesta se elimina de la caché.
+        """
+        self.client.force_authenticate(user=self.user_not_create)
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.survey.is_public = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.survey.save()
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+    def test_get_survey_id_cache_invalidated_after_commit(self):
+        """
+        Prueba de que la encuesta se elimina de la caché después del commit y no antes.
+        """
+        self.client.get(self.url, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.survey.save()
+            self.assertIsNotNone(cache.get(get_survey_cache_key(self.survey.id)))
+        self.assertIsNone(cache.get(get_survey_cache_key(self.survey.id)))
+
+
+    def test_get_survey_id_cache_invalidated_on_delete(self):
+        """
+        Prueba de que al eliminar la encuesta se elimina de la caché.
+        """
+        self.client.get(self.url, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.survey.delete()
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_get_survey_id_not_modified(self):
+        """
+        Prueba de que con el ETag de la versión actual se responde 304 sin consultar la base de datos.
+        """
+        response = self.client.get(self.url, format='json')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+
+    def test_get_survey_id_etag_changes_with_asks_and_options(self):
+        """
+        Prueba de que el ETag y los datos cambian al modificar las preguntas u opciones de la encuesta.
+        """
+        update_url = reverse('update_survey', args=[self.survey.id])
+        etag = self.client.get(self.url, format='json')['ETag']
+        asks = [{'text': 'New ask', 'type': 'multiple', 'options': [{'text': 'First'}, {'text': 'Second'}]}]
+        self.client.put(update_url, {'asks': asks}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['survey']['asks']), 1)
+        etag = response['ETag']
+        ask = response.data['data']['survey']['asks'][0]
+        option = ask['options'][0]
+        self.client.put(update_url, {'asks': [{'id': ask['id'], 'options': [{'id': option['id'], 'text': 'New option'}]}]}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('New option', [option['text'] for option in response.data['data']['survey']['asks'][0]['options']])
+
+
+    def test_get_survey_id_etag_changes_with_creator(self):
+        """
+        Prueba de que el ETag y los datos cambian al modificar el creador de la encuesta.
+        """
+        etag = self.client.get(self.url, format='json')['ETag']
+        self.user.username = 'RenamedUsername'
+        self.user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['survey']['user']['username'], 'RenamedUsername')
+
+
     def test_get_survey_id_without_token(self):
         """
         Prueba de obtener una encuesta con su id sin token.
@@ -5,7 +5,9 @@ from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey, Ask, Option
+from apps.surveys.models import Survey, Ask, Option, Invitation
+from apps.surveys.utils import check_user_invited
+from apps.notification.models import QueuedEmail
 from faker import Faker
 from datetime import timedelta
 import random
@@ -57,6 +59,71 @@ class InviteAnswerSurveyTestCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_invite_answer_survey_queues_one_email_per_address(self):
+        """
+        Prueba de que cada invitación queda enlazada a su correo en cola.
+        """
+        self.data['emails'].append("invitee1@example.com")
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        invitations = Invitation.objects.filter(survey=self.survey).select_related('queued_email')
+        self.assertEqual(invitations.count(), 3)
+        for invitation in invitations:
+            self.assertEqual(invitation.queued_email.recipient_list, [invitation.email])
+            self.assertEqual(invitation.queued_email.status, 'pending')
+
+
+    def test_invite_answer_survey_skips_already_invited(self):
+        """
+        Prueba de que volver a invitar un correo no crea otra invitación ni otro correo en cola.
+        """
+        self.client.post(self.url, self.data, format='json')
+        response = self.client.post(self.url, {'emails': ['invitee1@example.com', 'invitee4@example.com']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Invitation.objects.filter(survey=self.survey).count(), 4)
+        self.assertEqual(QueuedEmail.objects.count(), 4)
+
+
+    def test_invite_answer_survey_check_invited(self):
+        """
+        Prueba de que invitar guarda la invitación en caché y la comprobación no consulta la base de datos.
+        """
+        self.assertIsNotNone(check_user_invited(self.survey, 'invitee1@example.com'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, self.data, format='json')
+        with self.assertNumQueries(0):
+            self.assertIsNone(check_user_invited(self.survey, 'invitee1@example.com'))
+        self.assertIsNotNone(check_user_invited(self.survey, 'other@example.com'))
+
+
+    def test_invite_answer_survey_check_invited_after_delete_survey(self):
+        """
+        Prueba de que eliminar la encuesta elimina de la caché sus invitaciones.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, self.data, format='json')
+        survey = Survey(id=self.survey.id)
+        self.assertIsNone(check_user_invited(survey, 'invitee1@example.com'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.survey.delete()
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(check_user_invited(survey, 'invitee1@example.com'))
+
+
+    def test_invite_answer_survey_existing_invitation_without_email(self):
+        """
+        Prueba de que una invitación creada por otra petición no vuelve a encolar su correo.
+        """
+        Invitation.objects.create(survey=self.survey, email='invitee1@example.com')
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Invitation.objects.filter(survey=self.survey).count(), 3)
+        self.assertEqual(
+            sorted(email for recipients in QueuedEmail.objects.values_list('recipient_list', flat=True) for email in recipients),
+            ['invitee2@example.com', 'invitee3@example.com']
+        )
+
+
     def test_inviteanswer_survey_invalid_data(self):
         """
         Prueba de invitar a responder una encuesta con datos inválidos.
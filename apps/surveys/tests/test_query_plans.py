@@ -0,0 +1,124 @@
+from rest_framework import status
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from apps.surveys.models import Survey, Invitation
+from apps.core.tests.mixins import QueryPlansTestMixin
+
+
+# Tests de los planes de ejecución de las consultas de encuestas sobre tablas grandes
+class SurveysQueryPlansTestCase(QueryPlansTestMixin, TestCase):
+    @classmethod
+    def setUpQueryPlansData(cls):
+        Invitation.objects.bulk_create([
+            Invitation(survey=survey, email=f'invitee_{index}_{survey.id}@example.com')
+            for survey in Survey.objects.all()
+            for index in range(5)
+        ])
+        cls.survey = Survey.objects.filter(asks__answers__isnull=False).order_by('id').first()
+
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.survey.user)
+
+
+    def test_get_survey_id_query_plans(self):
+        """
+        Prueba de que obtener una encuesta no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_survey_id', args=[self.survey.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_get_all_surveys_query_plans(self):
+        """
+        Prueba de que una página de encuestas por cursor no recorre tablas completas.
+        """
+        response = self.client.get(reverse('get_all_surveys'), {'pagination': 'cursor', 'page_size': 10})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data['data']['page_info']['links']['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_get_all_surveys_page_number_query_plans(self):
+        """
+        Prueba de que una página de encuestas por número de página, con el conteo en caché, lee las encuestas
+        en el orden del índice de la clave primaria y no recorre otras tablas completas.
+        """
+        self.client.get(reverse('get_all_surveys'), {'page_size': 10})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_all_surveys'), {'page': 2, 'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries, limited={'surveys_survey'})
+
+
+    def test_search_surveys_query_plans(self):
+        """
+        Prueba de que buscar encuestas no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('search_surveys'), {'query': self.survey.title.split()[0], 'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_answer_survey_query_plans(self):
+        """
+        Prueba de que responder una encuesta no recorre tablas completas.
+        """
+        ask = self.survey.asks.filter(type='multiple').first()
+        self.client.force_authenticate(user=User.objects.create(username='new_respondent', email='respondent@example.com'))
+        data = {'answers': [{'ask': ask.id, 'option': ask.options.first().id}]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('answer_survey', args=[self.survey.id]), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_invite_answer_survey_query_plans(self):
+        """
+        Prueba de que invitar a responder una encuesta no recorre tablas completas.
+        """
+        data = {'emails': ['new_invitee@example.com', f'invitee_0_{self.survey.id}@example.com']}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('invite_answer_survey', args=[self.survey.id]), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_export_survey_query_plans(self):
+        """
+        Prueba de que exportar una encuesta con sus respuestas no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('export_survey', args=[self.survey.id]), {'answers': 'true'})
+            b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_update_survey_query_plans(self):
+        """
+        Prueba de que actualizar una encuesta no recorre tablas completas.
+        """
+        data = {'title': 'Updated survey title'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(reverse('update_survey', args=[self.survey.id]), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
+
+
+    def test_delete_survey_query_plans(self):
+        """
+        Prueba de que eliminar una encuesta con sus respuestas e invitaciones no recorre tablas completas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('delete_survey', args=[self.survey.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoSequentialScans(queries)
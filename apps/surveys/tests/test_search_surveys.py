@@ -1,13 +1,17 @@
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.db import connection
+from django.contrib.postgres.search import SearchQuery
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey
+from apps.surveys.models import Survey, Ask, Option
+from apps.surveys.utils import search_surveys_queryset
 from faker import Faker
 from datetime import timedelta
+from unittest import skipUnless
 import random
 import urllib.parse
 
@@ -48,8 +52,115 @@ class SearchSurveysTestsCase(TestCase):
         self.assertTrue('status' in response.data)
         self.assertTrue('message' in response.data)
         self.assertTrue('data' in response.data)
+
+
+    @override_settings(COUNT_CACHE_MODE='exact')
+    def test_search_surveys_fixed_queries_per_page(self):
+        """
+        Prueba de que el número de consultas por página no depende de page_size.
+        """
+        for index in range(30):
+            survey = Survey.objects.create(
+                title=f'Listing survey {index}',
+                end_date=timezone.now() + timedelta(days=1),
+                is_public=True,
+                user=self.user
+            )
+            for ask_index in range(2):
+                ask = Ask.objects.create(survey=survey, text=f'Ask {ask_index}', type='multiple')
+                Option.objects.create(ask=ask, text='Yes')
+                Option.objects.create(ask=ask, text='No')
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('search_surveys'), {'query': 'Listing', 'page_size': 1})
+        self.assertEqual(len(response.data['data']['surveys']), 1)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('search_surveys'), {'query': 'Listing', 'page_size': 100})
+        self.assertEqual(len(response.data['data']['surveys'][0]['asks'][0]['options']), 2)
     
 
+    def test_search_surveys_ranked_by_relevance(self):
+        """
+        Prueba de que la búsqueda coincide por prefijo en título, descripción y creador y ordena por relevancia.
+        """
+        in_title = Survey.objects.create(title='Customer satisfaction', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        in_description = Survey.objects.create(
+            title='Quarterly review',
+            description='Questions about satisfaction',
+            end_date=timezone.now() + timedelta(days=1),
+            user=self.user
+        )
+        Survey.objects.create(title='Unrelated', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        response = self.client.get(reverse('search_surveys'), {'query': 'satisf'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        survey_ids = [str(survey['id']) for survey in response.data['data']['surveys']]
+        self.assertEqual(survey_ids, [str(in_title.id), str(in_description.id)])
+        response = self.client.get(reverse('search_surveys'), {'query': 'testuser'})
+        self.assertEqual(response.data['data']['page_info']['count'], 4)
+
+
+    def test_search_surveys_index_follows_changes(self):
+        """
+        Prueba de que el índice de búsqueda se actualiza al editar o eliminar una encuesta y al renombrar al creador.
+        """
+        self.survey.title = 'Renamed survey'
+        self.survey.save()
+        response = self.client.get(reverse('search_surveys'), {'query': 'renamed'})
+        self.assertEqual(response.data['data']['page_info']['count'], 1)
+        self.user.username = 'OtherName'
+        self.user.save()
+        response = self.client.get(reverse('search_surveys'), {'query': 'othername'})
+        self.assertEqual(response.data['data']['page_info']['count'], 1)
+        self.survey.delete()
+        response = self.client.get(reverse('search_surveys'), {'query': 'renamed'})
+        self.assertEqual(response.data['data']['page_info']['count'], 0)
+
+
+    def test_search_surveys_special_characters(self):
+        """
+        Prueba de que los operadores del motor de búsqueda en la consulta no producen errores.
+        """
+        response = self.client.get(reverse('search_surveys'), {'query': '"AND OR* (NEAR'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_search_surveys_without_words_uses_icontains(self):
+        """
+        Prueba de que una búsqueda sin palabras coincide por subcadena en lugar de devolver todas las encuestas.
+        """
+        in_title = Survey.objects.create(title='Survey ???', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        response = self.client.get(reverse('search_surveys'), {'query': '???'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(survey['id']) for survey in response.data['data']['surveys']], [str(in_title.id)])
+
+
+    def test_search_surveys_trigram_mode(self):
+        """
+        Prueba de que el modo trigram coincide con subcadenas del título o del nombre del creador.
+        """
+        in_title = Survey.objects.create(title='Customer satisfaction', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        Survey.objects.create(
+            title='Quarterly review',
+            description='Questions about satisfaction',
+            end_date=timezone.now() + timedelta(days=1),
+            user=self.user
+        )
+        response = self.client.get(reverse('search_surveys'), {'query': 'tisfac', 'mode': 'trigram'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(survey['id']) for survey in response.data['data']['surveys']], [str(in_title.id)])
+        response = self.client.get(reverse('search_surveys'), {'query': 'stuser', 'mode': 'trigram'})
+        self.assertEqual(response.data['data']['page_info']['count'], 3)
+
+
+    def test_search_surveys_invalid_mode(self):
+        """
+        Prueba de buscar encuestas con un modo de búsqueda no válido.
+        """
+        response = self.client.get(reverse('search_surveys'), {'query': 'survey', 'mode': 'regex'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('status' in response.data)
+        self.assertTrue('message' in response.data)
+
+
     def test_search_surveys_without_parameter(self):
         """
         Prueba de buscar encuestas sin el párametro query
@@ -68,3 +179,43 @@ class SearchSurveysTestsCase(TestCase):
         self.client.force_authenticate(user=None)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# Tests del índice de texto completo de PostgreSQL
+@skipUnless(connection.vendor == 'postgresql', 'The search_vector column, its triggers and its GIN index only exist in PostgreSQL.')
+class SearchSurveysPostgreSQLTestsCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='TestUsername', email='test@email.com')
+        self.survey = Survey.objects.create(
+            title='Customer satisfaction',
+            description='Questions about the service',
+            end_date=timezone.now() + timedelta(days=1),
+            user=self.user
+        )
+
+
+    def test_search_vector_follows_changes(self):
+        """
+        Prueba de que los triggers calculan search_vector al crear y editar la encuesta y al renombrar al creador.
+        """
+        matches = lambda query: Survey.objects.filter(search_vector=SearchQuery(f'{query}:*', search_type='raw', config='simple'))
+        self.assertEqual(list(matches('satisf')), [self.survey])
+        self.assertEqual(list(matches('testuser')), [self.survey])
+        self.survey.title = 'Renamed survey'
+        self.survey.save()
+        self.assertEqual(list(matches('renamed')), [self.survey])
+        self.user.username = 'OtherName'
+        self.user.save()
+        self.assertEqual(list(matches('othername')), [self.survey])
+        self.assertFalse(matches('testuser').exists())
+
+
+    def test_search_uses_gin_index(self):
+        """
+        Prueba de que la búsqueda de texto completo se resuelve con el índice GIN de search_vector.
+        """
+        with connection.cursor() as cursor:
+            # Con pocas filas el planificador prefiere recorrer la tabla, por lo que se desactiva esa opción
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search_surveys_queryset('satisf', 'fulltext').explain()
+        self.assertIn('surveys_survey_search_vector_idx', plan)
@@ -0,0 +1,212 @@
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from apps.surveys.models import Survey, Ask, Option, Answer
+from apps.analysis.models import OptionStats
+from faker import Faker
+from datetime import timedelta
+import gzip
+import json
+import os
+import random
+import tempfile
+
+
+fake = Faker()
+
+
+# Tests para exportar e importar encuestas
+class TransferSurveyTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='TestUsername',
+            email='test@email.com',
+            password='TestPassword'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.user_not_create = User.objects.create_user(
+            username=fake.user_name(),
+            email=fake.email(),
+            password=fake.password()
+        )
+        self.survey = Survey.objects.create(
+            title=fake.sentence(nb_words=6),
+            description=fake.text(max_nb_chars=200),
+            end_date=timezone.now() + timedelta(days=random.randint(1, 30)),
+            is_public=True,
+            user=self.user
+        )
+        self.ask = Ask.objects.create(survey=self.survey, text='Favourite colour?', type='multiple')
+        self.option = Option.objects.create(ask=self.ask, text='Blue')
+        Option.objects.create(ask=self.ask, text='Red')
+        self.text_ask = Ask.objects.create(survey=self.survey, text='Why?', type='short')
+        Answer.objects.create(ask=self.ask, option=self.option, user=self.user_not_create)
+        Answer.objects.create(ask=self.text_ask, content_answer='Because', user=self.user_not_create)
+        self.export_url = reverse('export_survey', args=[self.survey.id])
+        self.import_url = reverse('import_survey')
+
+
+    def export(self, **params):
+        response = self.client.get(self.export_url, params)
+        return b''.join(response.streaming_content)
+
+
+    def import_file(self, content):
+        return self.client.post(self.import_url, {'file': SimpleUploadedFile('survey.ndjson', content)}, format='multipart')
+
+
+    def test_export_survey_successful(self):
+        """
+        Prueba de exportar una encuesta con un registro por línea.
+        """
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(records[0]['record'], 'survey')
+        self.assertEqual(records[0]['title'], self.survey.title)
+        self.assertEqual([record['record'] for record in records[1:]].count('ask'), 2)
+        self.assertEqual([record['record'] for record in records[1:]].count('option'), 2)
+        self.assertFalse(any(record['record'] == 'answer' for record in records))
+
+
+    def import_command(self, records):
+        with tempfile.NamedTemporaryFile(suffix='.ndjson') as input_file:
+            input_file.write('\n'.join(json.dumps(record) for record in records).encode())
+            input_file.flush()
+            call_command('import_survey', input_file.name, user=self.user.username, stdout=open(os.devnull, 'w'))
+
+
+    def test_export_import_survey_round_trip(self):
+        """
+        Prueba de importar la exportación de una encuesta sin sus respuestas.
+        """
+        content = self.export(answers='true')
+        response = self.import_file(content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['imported'], {'asks': 2, 'options': 2, 'answers': 0, 'skipped_answers': 2})
+        survey = Survey.objects.get(id=response.data['data']['survey']['id'])
+        self.assertNotEqual(survey.id, self.survey.id)
+        self.assertEqual(survey.title, self.survey.title)
+        self.assertEqual(survey.user, self.user)
+        self.assertFalse(Answer.objects.filter(ask__survey=survey).exists())
+
+
+    def test_import_survey_command_with_answers(self):
+        """
+        Prueba de importar con el comando import_survey una encuesta con sus respuestas.
+        """
+        self.import_command(json.loads(line) for line in self.export(answers='true').splitlines())
+        survey = Survey.objects.exclude(id=self.survey.id).get()
+        self.assertEqual(survey.user, self.user)
+        self.assertEqual(Answer.objects.filter(ask__survey=survey).count(), 2)
+        option = Option.objects.get(ask__survey=survey, text='Blue')
+        self.assertEqual(Answer.objects.get(option=option).user, self.user_not_create)
+        self.assertEqual(OptionStats.objects.get(option=option).answers_count, 1)
+
+
+    def test_import_survey_command_invalid_answers(self):
+        """
+        Prueba de que el comando import_survey rechaza respuestas que no cumplen las reglas de su pregunta.
+        """
+        boolean_ask = Ask.objects.create(survey=self.survey, text='Agree?', type='boolean')
+        records = [json.loads(line) for line in self.export(answers='true').splitlines()]
+        text_ask_id = str(self.text_ask.id)
+        ask_id = str(self.ask.id)
+        invalid_answers = [
+            {'record': 'answer', 'ask': text_ask_id, 'option': str(self.option.id), 'user': self.user.username, 'content_answer': None},
+            {'record': 'answer', 'ask': ask_id, 'option': None, 'user': self.user.username, 'content_answer': 'banana'},
+            {'record': 'answer', 'ask': str(boolean_ask.id), 'option': None, 'user': self.user.username, 'content_answer': 'banana'},
+            {'record': 'answer', 'ask': text_ask_id, 'option': None, 'user': self.user.username, 'content_answer': 'x' * 256},
+        ]
+        for answer in invalid_answers:
+            with self.assertRaises(ValueError):
+                self.import_command(records + [answer])
+        self.assertEqual(Survey.objects.count(), 1)
+
+
+    def test_export_import_survey_gzip(self):
+        """
+        Prueba de importar la exportación comprimida con gzip de una encuesta.
+        """
+        response = self.client.get(self.export_url, {'compress': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        content = b''.join(response.streaming_content)
+        self.assertEqual(json.loads(gzip.decompress(content).splitlines()[0])['record'], 'survey')
+        response = self.import_file(content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['data']['survey']['asks']), 2)
+
+
+    def test_import_survey_corrupted_gzip(self):
+        """
+        Prueba de importar una exportación gzip truncada o dañada sin crear ninguna encuesta.
+        """
+        content = gzip.compress(self.export())
+        corrupted = content[:10] + bytes(byte ^ 0xFF for byte in content[10:-8]) + content[-8:]
+        for invalid in [content[:len(content) // 2], corrupted]:
+            response = self.import_file(invalid)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertTrue('errors' in response.data)
+        self.assertEqual(Survey.objects.count(), 1)
+
+
+    def test_import_survey_skips_unknown_users(self):
+        """
+        Prueba de que se omiten las respuestas de usuarios que no existen.
+        """
+        records = [json.loads(line) for line in self.export(answers='true').splitlines()]
+        self.user_not_create.delete()
+        self.import_command(records)
+        survey = Survey.objects.exclude(id=self.survey.id).get()
+        self.assertFalse(Answer.objects.filter(ask__survey=survey).exists())
+
+
+    def test_import_survey_invalid_records(self):
+        """
+        Prueba de importar encuestas, preguntas y opciones que no superan la validación.
+        """
+        records = [json.loads(line) for line in self.export().splitlines()]
+        ask_record = next(record for record in records if record['record'] == 'ask' and record['type'] == 'multiple')
+        invalid_records = [
+            [{**records[0], 'title': 'x' * 256}] + records[1:],
+            [{**record, 'type': 'text'} if record is ask_record else record for record in records],
+            [record for record in records if record['record'] != 'option' or record['text'] != 'Red'],
+            records + [{'record': 'option', 'id': 'extra', 'ask': str(self.text_ask.id), 'text': 'Extra'}],
+        ]
+        for invalid in invalid_records:
+            response = self.import_file('\n'.join(json.dumps(record) for record in invalid).encode())
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Survey.objects.count(), 1)
+
+
+    def test_import_survey_invalid_file(self):
+        """
+        Prueba de importar un archivo no válido sin crear ninguna encuesta.
+        """
+        records = [json.loads(line) for line in self.export().splitlines()]
+        records.append({'record': 'option', 'id': 'unknown', 'ask': 'unknown', 'text': 'Orphan'})
+        content = '\n'.join(json.dumps(record) for record in records).encode()
+        response = self.import_file(content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('errors' in response.data)
+        response = self.import_file(b'not json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Survey.objects.count(), 1)
+
+
+    def test_export_survey_not_creator(self):
+        """
+        Prueba de exportar una encuesta sin ser el creador.
+        """
+        self.client.force_authenticate(user=self.user_not_create)
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -5,7 +5,11 @@ from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
-from apps.surveys.models import Survey
+from apps.surveys.models import Survey, Ask, Option, Answer
+from apps.analysis.models import AskStats, OptionStats
+from apps.analysis.utils import rebuild_answer_stats
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from faker import Faker
 from datetime import datetime, timedelta
 import random
@@ -59,6 +63,18 @@ class UpdateSurveyTestsCase(TestCase):
         self.assertTrue('data' in response.data)
 
     
+    def test_update_survey_reads_fresh_row(self):
+        """
+        Prueba de que la actualización parte de la encuesta guardada y no de la caché.
+        """
+        self.client.get(reverse('get_survey_id', args=[self.survey.id]), format='json')
+        Survey.objects.filter(id=self.survey.id).update(title='Title changed elsewhere')
+        response = self.client.put(self.url, {'description': fake.text(max_nb_chars=200)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.survey.refresh_from_db()
+        self.assertEqual(self.survey.title, 'Title changed elsewhere')
+
+
     def test_update_survey_id_not_found(self):
         """
         Prueba de actualizar una encuesta con su id que no se encuentra.
@@ -162,6 +178,158 @@ class UpdateSurveyTestsCase(TestCase):
         self.assertTrue('errors' in response.data)
     
 
+    def create_asks(self, total):
+        """
+        Crea preguntas de opción múltiple con dos opciones en la encuesta.
+        """
+        asks = []
+        for index in range(total):
+            ask = Ask.objects.create(survey=self.survey, text=f'Ask {index}', type='multiple')
+            Option.objects.create(ask=ask, text='Yes')
+            Option.objects.create(ask=ask, text='No')
+            asks.append(ask)
+        return asks
+
+
+    def build_asks_data(self, asks, suffix):
+        """
+        Construye los datos de actualización de las preguntas con sus opciones.
+        """
+        return [
+            {
+                'id': str(ask.id),
+                'text': f'{ask.text} {suffix}',
+                'type': 'multiple',
+                'options': [{'id': str(option.id), 'text': f'{option.text} {suffix}'} for option in ask.options.all()]
+            }
+            for ask in asks
+        ]
+
+
+    def test_update_survey_modifies_existing_asks_and_options(self):
+        """
+        Prueba de que las preguntas y opciones con ID se modifican en lugar de duplicarse.
+        """
+        ask = self.create_asks(1)[0]
+        asks_data = self.build_asks_data([ask], 'edited')
+        asks_data[0]['options'].append({'text': 'Maybe'})
+        response = self.client.put(self.url, {'asks': asks_data}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Ask.objects.filter(survey=self.survey).count(), 1)
+        ask.refresh_from_db()
+        self.assertEqual(ask.text, 'Ask 0 edited')
+        self.assertEqual(sorted(ask.options.values_list('text', flat=True)), ['Maybe', 'No edited', 'Yes edited'])
+        self.assertEqual(len(response.data['data']['survey']['asks'][0]['options']), 3)
+
+
+    def test_update_survey_delete_missing(self):
+        """
+        Prueba de que con delete_missing se eliminan las preguntas y opciones no enviadas, y sin él se conservan.
+        """
+        first_ask, second_ask = self.create_asks(2)
+        asks_data = self.build_asks_data([first_ask], 'edited')
+        asks_data[0]['options'] = asks_data[0]['options'][:1] + [{'text': 'Maybe'}]
+        response = self.client.put(self.url, {'asks': asks_data}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Ask.objects.filter(survey=self.survey).count(), 2)
+        self.assertEqual(first_ask.options.count(), 3)
+        response = self.client.put(f'{self.url}?delete_missing=true', {'asks': asks_data[:1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(Ask.objects.filter(survey=self.survey)), [first_ask])
+        self.assertEqual(first_ask.options.count(), 2)
+
+
+    def test_update_survey_delete_missing_updates_answer_stats(self):
+        """
+        Prueba de que eliminar opciones con delete_missing resta sus respuestas de los contadores de la pregunta.
+        """
+        ask = self.create_asks(1)[0]
+        kept_option, deleted_option = ask.options.order_by('text')
+        Answer.objects.create(user=self.user, ask=ask, option=deleted_option)
+        Answer.objects.create(user=self.user_not_create, ask=ask, option=kept_option)
+        rebuild_answer_stats(self.survey)
+        asks_data = self.build_asks_data([ask], 'edited')
+        asks_data[0]['options'] = [option for option in asks_data[0]['options'] if option['id'] == str(kept_option.id)] + [{'text': 'Maybe'}]
+        response = self.client.put(f'{self.url}?delete_missing=true', {'asks': asks_data}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AskStats.objects.get(ask=ask).total_answers, 1)
+        self.assertEqual(OptionStats.objects.get(option=kept_option).answers_count, 1)
+        self.assertEqual(rebuild_answer_stats(self.survey, fix=False), {'asks': 0, 'options': 0, 'keywords': 0})
+
+
+    def test_update_survey_keeps_existing_options_when_adding_one(self):
+        """
+        Prueba de que las opciones actuales cuentan al validar una pregunta de opción múltiple.
+        """
+        ask = self.create_asks(1)[0]
+        response = self.client.put(self.url, {'asks': [{'id': str(ask.id), 'type': 'multiple', 'options': [{'text': 'Maybe'}]}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(ask.options.count(), 3)
+        response = self.client.put(f'{self.url}?delete_missing=true', {'asks': [{'id': str(ask.id), 'options': [{'text': 'Only'}]}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ask.options.count(), 3)
+
+
+    def test_update_survey_change_type_of_ask_with_options(self):
+        """
+        Prueba de que una pregunta solo deja de ser de opción múltiple si se eliminan sus opciones.
+        """
+        ask = self.create_asks(1)[0]
+        response = self.client.put(self.url, {'asks': [{'id': str(ask.id), 'type': 'short'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        ask.refresh_from_db()
+        self.assertEqual(ask.type, 'multiple')
+        response = self.client.put(f'{self.url}?delete_missing=true', {'asks': [{'id': str(ask.id), 'type': 'short', 'options': []}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ask.refresh_from_db()
+        self.assertEqual(ask.type, 'short')
+        self.assertFalse(ask.options.exists())
+
+
+    def test_update_survey_change_type_of_ask_with_answers(self):
+        """
+        Prueba de que no se puede cambiar el tipo de una pregunta que ya tiene respuestas.
+        """
+        ask = Ask.objects.create(survey=self.survey, text='Why?', type='short')
+        Answer.objects.create(user=self.user_not_create, ask=ask, content_answer='Because')
+        response = self.client.put(self.url, {'asks': [{'id': str(ask.id), 'type': 'boolean'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('errors' in response.data)
+        ask.refresh_from_db()
+        self.assertEqual(ask.type, 'short')
+
+
+    def test_update_survey_with_ask_from_another_survey(self):
+        """
+        Prueba de actualizar una encuesta con el ID de una pregunta de otra encuesta.
+        """
+        other_survey = Survey.objects.create(title='Other', end_date=timezone.now() + timedelta(days=1), user=self.user)
+        other_ask = Ask.objects.create(survey=other_survey, text='Other ask', type='short')
+        response = self.client.put(self.url, {'asks': [{'id': str(other_ask.id), 'text': 'Stolen'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue('errors' in response.data)
+        other_ask.refresh_from_db()
+        self.assertEqual(other_ask.text, 'Other ask')
+
+
+    def test_update_survey_constant_queries(self):
+        """
+        Prueba de que el número de consultas no depende del número de preguntas y opciones.
+        """
+        asks = self.create_asks(2)
+        asks_data = self.build_asks_data(asks, 'edited')
+        with CaptureQueriesContext(connection) as small_queries:
+            response = self.client.put(self.url, {'asks': asks_data}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        asks += self.create_asks(30)
+        asks_data = self.build_asks_data(asks, 'again')
+        with CaptureQueriesContext(connection) as large_queries:
+            response = self.client.put(self.url, {'asks': asks_data}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertEqual(Option.objects.filter(ask__survey=self.survey, text__endswith='again').count(), 64)
+
+
     def test_update_survey_without_token(self):
         """
         Prueba de actualizar encuesta sin token.
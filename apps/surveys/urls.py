@@ -12,4 +12,6 @@ urlpatterns = [
     path('surveys/delete/<str:survey_id>', views.delete_survey, name='delete_survey'),
     path('surveys/<str:survey_id>/answer', views.answer_survey, name='answer_survey'),
     path('surveys/<str:survey_id>/invite', views.invite_answer_survey, name='invite_answer_survey'),
+    path('surveys/<str:survey_id>/export', views.export_survey, name='export_survey'),
+    path('surveys/import', views.import_survey, name='import_survey'),
 ]
\ No newline at end of file
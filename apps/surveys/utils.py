@@ -1,12 +1,191 @@
-from .models import Survey, Invitation
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection, transaction
+from django.db.models import Q, F, Func, Value, FloatField
+from django.db.models.functions import Greatest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+from .models import Survey, Ask, Option, Answer, Invitation
+from .serializers import SurveyValidationSerializer, SurveyResponseSerializer, AnswerImportSerializer
+from apps.core.utils import get_version
+from apps.analysis.utils import rebuild_answer_stats
+from hashlib import md5
+from uuid import UUID
+import gzip
+import json
+import re
+import zlib
+
+
+# Palabras de la búsqueda que se envían al índice de texto completo
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Modos de búsqueda disponibles en search_surveys
+SEARCH_MODES = ['fulltext', 'trigram', 'icontains']
+
+# Versión del formato de exportación de encuestas
+SURVEY_EXPORT_VERSION = 1
+
+# Número de registros por bloque al exportar e importar encuestas
+SURVEY_TRANSFER_BATCH_SIZE = 5000
+
+# Campos de la encuesta que se guardan en caché para las comprobaciones de permisos,
+# en el orden de los campos del modelo que espera Survey.from_db
+SURVEY_ACCESS_FIELDS = ['id', 'is_public', 'user_id']
+
+
+def get_surveys_queryset():
+    """
+    Función para obtener el queryset base de los listados de encuestas.
+
+    Carga el usuario creador y las preguntas con sus opciones, de modo que
+    serializar una página con SurveyResponseSerializer cuesta un número fijo de consultas.
+
+    Returns:
+        QuerySet: Encuestas ordenadas por ID con sus relaciones precargadas.
+    """
+    return Survey.objects.select_related('user').prefetch_related('asks__options').order_by('id')
+
+
+def search_surveys_queryset(query, mode=None):
+    """
+    Función para obtener las encuestas que coinciden con una búsqueda.
+
+    Modos de búsqueda (por defecto SURVEY_SEARCH_BACKEND):
+    - 'fulltext': usa el índice de texto completo del motor de base de datos
+      (columna search_vector con índice GIN en PostgreSQL, tabla FTS5 en SQLite)
+      y ordena por relevancia. Cada palabra coincide como prefijo en el título,
+      la descripción o el nombre del creador.
+    - 'trigram': coincidencia parcial en el título o el nombre del creador,
+      resuelta con los índices GIN de trigramas en PostgreSQL y ordenada por similitud.
+    - 'icontains': coincidencia parcial en el título, la descripción o el nombre
+      del creador, sin índice.
+
+    Con otros motores de base de datos, o si la búsqueda no tiene palabras, 'fulltext'
+    se comporta como 'icontains'. Con otros motores 'trigram' no ordena por similitud.
+
+    Args:
+        query (str): Texto de búsqueda.
+        mode (str): Modo de búsqueda, uno de SEARCH_MODES.
+
+    Returns:
+        QuerySet: Encuestas que coinciden con la búsqueda.
+    """
+    mode = mode or settings.SURVEY_SEARCH_BACKEND
+    surveys = get_surveys_queryset()
+    tokens = SEARCH_TOKEN_PATTERN.findall(query)
+
+    if mode == 'trigram':
+        # Une las coincidencias de cada índice en lugar de filtrar con un OR sobre la unión de tablas
+        matches = Survey.objects.filter(title__icontains=query).values('id').union(
+            Survey.objects.filter(user__in=User.objects.filter(username__icontains=query)).values('id')
+        )
+        surveys = surveys.filter(id__in=matches)
+        if connection.vendor == 'postgresql':
+            surveys = surveys.annotate(
+                similarity=Greatest(TrigramSimilarity('title', query), TrigramSimilarity('user__username', query))
+            ).order_by('-similarity', 'id')
+        return surveys
+
+    # Las búsquedas sin palabras no pasan por el índice de texto completo y se resuelven con icontains
+    if mode == 'fulltext' and tokens and connection.vendor == 'postgresql':
+        search_query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config='simple')
+        return (
+            surveys.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', 'id')
+        )
+
+    if mode == 'fulltext' and tokens and connection.vendor == 'sqlite':
+        match = ' '.join('"%s"*' % token for token in tokens)
+        return (
+            surveys.filter(search_index__document__match=match)
+            .annotate(rank=Func(
+                F('search_index__document'), Value(0.0), Value(10.0), Value(5.0), Value(1.0),
+                function='bm25', output_field=FloatField(),
+            ))
+            .order_by('rank', 'id')
+        )
+
+    return surveys.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(user__username__icontains=query)
+    )
+
+
+def get_survey_cache_key(survey_id):
+    """
+    Función para obtener la clave de caché de una encuesta.
+
+    Args:
+        survey_id (UUID|str): ID de la encuesta.
+
+    Returns:
+        str: Clave de caché de la encuesta, None si el ID no es un UUID válido.
+    """
+    try:
+        return f'survey:{UUID(str(survey_id))}'
+    except ValueError:
+        return None
+
+
+def invalidate_survey_cache(survey_id):
+    """
+    Función para eliminar una encuesta de la caché.
+
+    Args:
+        survey_id (UUID|str): ID de la encuesta.
+    """
+    cache.delete(get_survey_cache_key(survey_id))
+
+
+def get_survey_access(survey_id):
+    """
+    Función para obtener una encuesta con solo los datos de las comprobaciones de permisos.
+
+    El ID, el creador y la visibilidad de la encuesta se guardan en caché durante
+    SURVEY_CACHE_TTL segundos y se eliminan de ella al guardar o eliminar la encuesta
+    (ver signals.py), de modo que las comprobaciones de permisos no consultan la base
+    de datos. El resto de campos se cargan de la base de datos al usarlos; para
+    modificar la encuesta se debe usar get_survey_by_id.
+
+    Args:
+        survey_id (UUID): ID de la encuesta a obtener.
+
+    Returns:
+        Survey: Objeto Survey con los campos de SURVEY_ACCESS_FIELDS si se encuentra.
+        dict: Diccionario con el estado de error y el mensaje si no se encuentra.
+    """
+    # Obtiene los datos de acceso de la caché, o de la base de datos si el ID es válido
+    cache_key = get_survey_cache_key(survey_id)
+    access = cache.get(cache_key) if cache_key else None
+    if access is None and cache_key:
+        access = Survey.objects.filter(id=survey_id).values_list(*SURVEY_ACCESS_FIELDS).first()
+        if access is not None:
+            cache.set(cache_key, access, settings.SURVEY_CACHE_TTL)
+
+    if access is None:
+        # Respuesta erronea a no encontrar la encuesta
+        return {
+            'status': 'error',
+            'message': 'Survey not found.'
+        }
+
+    return Survey.from_db(None, SURVEY_ACCESS_FIELDS, access)
 
 
 def get_survey_by_id(survey_id):
     """
     Función para obtener una encuesta por su ID.
 
+    La encuesta se lee siempre de la base de datos, por lo que es la que deben usar
+    los endpoints que la modifican o que usan campos distintos de los de acceso.
+
     Args:
-        survey_id (int): ID de la encuesta a obtener.
+        survey_id (UUID): ID de la encuesta a obtener.
 
     Returns:
         Survey: Objeto Survey si se encuentra.
@@ -23,6 +202,72 @@ def get_survey_by_id(survey_id):
         }
 
 
+def get_survey_version_key(survey_id):
+    """
+    Función para obtener la clave de la versión de una encuesta.
+
+    Args:
+        survey_id (UUID): ID de la encuesta.
+
+    Returns:
+        str: Clave de la versión de la encuesta.
+    """
+    return f'survey_version:{survey_id}'
+
+
+def get_user_version_key(user_id):
+    """
+    Función para obtener la clave de la versión de los datos públicos de un usuario.
+
+    Args:
+        user_id (int): ID del usuario.
+
+    Returns:
+        str: Clave de la versión del usuario.
+    """
+    return f'user_version:{user_id}'
+
+
+def get_survey_etag(survey):
+    """
+    Función para obtener el ETag de la respuesta de una encuesta.
+
+    El ETag se calcula con las versiones de la encuesta (cambia al modificar la
+    encuesta, sus preguntas u opciones) y de su creador, sin consultar la base de datos.
+
+    Args:
+        survey (Survey): Encuesta.
+
+    Returns:
+        str: ETag de la respuesta de la encuesta.
+    """
+    survey_version = get_version(get_survey_version_key(survey.id))
+    user_version = get_version(get_user_version_key(survey.user_id))
+    return '"%s"' % md5(f'{survey.id}:{survey_version}:{user_version}'.encode()).hexdigest()
+
+
+def get_survey_payload(survey, etag):
+    """
+    Función para obtener la encuesta serializada con sus preguntas, opciones y creador.
+
+    El resultado se guarda en caché bajo el ETag de la encuesta, por lo que solo
+    se lee de la base de datos y se serializa de nuevo cuando cambia alguna de sus versiones.
+
+    Args:
+        survey (Survey): Encuesta a serializar; basta con que tenga cargado su ID.
+        etag (str): ETag de la respuesta de la encuesta.
+
+    Returns:
+        dict: Datos serializados de la encuesta.
+    """
+    cache_key = f'survey_payload:{etag}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = SurveyResponseSerializer(get_surveys_queryset().get(id=survey.id)).data
+        cache.set(cache_key, payload, settings.SURVEY_CACHE_TTL)
+    return payload
+
+
 def check_survey_is_public(survey):
     """
     Función para verificar si la encuesta es pública o privada.
@@ -36,10 +281,50 @@ def check_survey_is_public(survey):
     return survey.is_public
 
 
+def get_invitation_cache_key(survey_id, email):
+    """
+    Función para obtener la clave de caché de la invitación de un correo electrónico a una encuesta.
+
+    Args:
+        survey_id (UUID): ID de la encuesta.
+        email (str): Correo electrónico invitado.
+
+    Returns:
+        str: Clave de caché de la invitación.
+    """
+    return f'survey_invitation:{survey_id}:{email}'
+
+
+def cache_invitations(survey_id, emails):
+    """
+    Función para guardar en caché que los correos electrónicos están invitados a una encuesta.
+
+    Args:
+        survey_id (UUID): ID de la encuesta.
+        emails (list): Correos electrónicos invitados.
+    """
+    cache.set_many({get_invitation_cache_key(survey_id, email): True for email in emails}, settings.SURVEY_CACHE_TTL)
+
+
+def invalidate_invitation(survey_id, email):
+    """
+    Función para eliminar de la caché la invitación de un correo electrónico a una encuesta.
+
+    Args:
+        survey_id (UUID): ID de la encuesta.
+        email (str): Correo electrónico invitado.
+    """
+    cache.delete(get_invitation_cache_key(survey_id, email))
+
+
 def check_user_invited(survey, request_user_email):
     """
     Función para comprobar si un usuario está invitado a una encuesta.
 
+    El resultado se guarda en caché por encuesta y correo durante SURVEY_CACHE_TTL
+    segundos. Al invitar se guarda como invitado y al eliminar la invitación, también
+    al eliminar la encuesta, se elimina de la caché (ver signals.py).
+
     Args:
         survey (Survey): Objeto Survey a verificar.
         request_user_email (str): Correo electrónico del usuario a verificar.
@@ -48,11 +333,296 @@ def check_user_invited(survey, request_user_email):
         dict: Diccionario con el estado de error y el mensaje si el usuario no está invitado.
         None: Si el usuario está invitado.
     """
+    # Obtiene la invitación de la caché o mediante el índice único (survey, email)
+    cache_key = get_invitation_cache_key(survey.id, request_user_email)
+    invited = cache.get(cache_key)
+    if invited is None:
+        invited = Invitation.objects.filter(survey_id=survey.id, email=request_user_email).exists()
+        cache.set(cache_key, invited, settings.SURVEY_CACHE_TTL)
+
     # Verifica que el usuario este invitado a responder la encuesta
-    if not Invitation.objects.filter(survey=survey, email=request_user_email).first():
+    if not invited:
         # Respuesta erronea al usuario no tener permiso
         return {
             'status': 'error',
             'message': 'You do not have permission to interact with this survey.'
         }
     return None
+
+
+def get_survey_export_records(survey, include_answers=False):
+    """
+    Función para recorrer los registros de la exportación de una encuesta.
+
+    El primer registro es la encuesta y le siguen sus preguntas, sus opciones y,
+    opcionalmente, sus respuestas. Las respuestas se leen por bloques con un
+    cursor del servidor y referencian al usuario por su nombre de usuario.
+
+    Args:
+        survey (Survey): Encuesta a exportar.
+        include_answers (bool): Si es True se exportan también las respuestas.
+
+    Yields:
+        dict: Registro de la exportación.
+    """
+    yield {
+        'record': 'survey',
+        'version': SURVEY_EXPORT_VERSION,
+        'title': survey.title,
+        'description': survey.description,
+        'start_date': survey.start_date,
+        'end_date': survey.end_date,
+        'is_public': survey.is_public,
+    }
+
+    asks = Ask.objects.filter(survey=survey).order_by('id').values_list('id', 'text', 'type')
+    for ask_id, text, ask_type in asks.iterator(chunk_size=SURVEY_TRANSFER_BATCH_SIZE):
+        yield {'record': 'ask', 'id': ask_id, 'text': text, 'type': ask_type}
+
+    options = Option.objects.filter(ask__survey=survey).order_by('id').values_list('id', 'ask_id', 'text')
+    for option_id, ask_id, text in options.iterator(chunk_size=SURVEY_TRANSFER_BATCH_SIZE):
+        yield {'record': 'option', 'id': option_id, 'ask': ask_id, 'text': text}
+
+    if include_answers:
+        answers = (
+            Answer.objects.filter(ask__survey=survey)
+            .order_by()
+            .values_list('ask_id', 'option_id', 'user__username', 'content_answer')
+        )
+        for ask_id, option_id, username, content_answer in answers.iterator(chunk_size=SURVEY_TRANSFER_BATCH_SIZE):
+            yield {'record': 'answer', 'ask': ask_id, 'option': option_id, 'user': username, 'content_answer': content_answer}
+
+
+def stream_survey_export(survey, include_answers=False, compress=False):
+    """
+    Función para generar la exportación de una encuesta en formato NDJSON, registro por registro.
+
+    Args:
+        survey (Survey): Encuesta a exportar.
+        include_answers (bool): Si es True se exportan también las respuestas.
+        compress (bool): Si es True la salida se comprime con gzip.
+
+    Yields:
+        bytes: Fragmento de la exportación.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    for record in get_survey_export_records(survey, include_answers):
+        line = (json.dumps(record, cls=DjangoJSONEncoder) + '\n').encode()
+        if compressor is None:
+            yield line
+        else:
+            chunk = compressor.compress(line)
+            if chunk:
+                yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def read_survey_import(file):
+    """
+    Función para leer los registros de una exportación de encuesta, comprimida con gzip o no.
+
+    Args:
+        file (file): Archivo binario con la exportación.
+
+    Yields:
+        dict: Registro de la exportación.
+
+    Raises:
+        ValueError: Si el archivo comprimido está truncado o dañado.
+    """
+    # Detecta la compresión gzip por su número mágico
+    if file.read(2) == b'\x1f\x8b':
+        file.seek(0)
+        file = gzip.GzipFile(fileobj=file)
+    else:
+        file.seek(0)
+
+    try:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    except (zlib.error, gzip.BadGzipFile, EOFError) as e:
+        # Los errores de descompresión se tratan como datos de importación inválidos
+        raise ValueError(f'Invalid compressed file: {e}') from e
+
+
+def import_survey_records(records, user, include_answers=True):
+    """
+    Función para crear una encuesta a partir de los registros de una exportación.
+
+    La encuesta pertenece al usuario que la importa y todos sus elementos reciben
+    IDs nuevos. La encuesta, sus preguntas y sus opciones se validan con
+    SurveyValidationSerializer y las respuestas con AnswerImportSerializer, y se
+    insertan por bloques de SURVEY_TRANSFER_BATCH_SIZE con inserciones masivas
+    dentro de una transacción. Las respuestas de usuarios que no existen se omiten.
+
+    Args:
+        records (iterable): Registros de la exportación.
+        user (User): Usuario propietario de la encuesta importada.
+        include_answers (bool): Si es False se omiten las respuestas de la exportación.
+
+    Returns:
+        dict: Encuesta creada y número de elementos importados y de respuestas omitidas.
+
+    Raises:
+        ValueError: Si los registros no tienen el formato esperado o no son válidos.
+        KeyError: Si a un registro le falta un campo.
+    """
+    records = iter(records)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get('record') != 'survey' or header.get('version') != SURVEY_EXPORT_VERSION:
+        raise ValueError('The file must start with a survey record of a supported version.')
+
+    asks_data = {}
+    option_ids = {}
+    asks = {}
+    options = {}
+    users = {}
+    pending_answers = []
+    result = {'asks': 0, 'options': 0, 'answers': 0, 'skipped_answers': 0}
+    context = {}
+
+    def create_survey():
+        # Valida la encuesta con sus preguntas y opciones antes de crearlas
+        survey_data = {'title': header['title'], 'is_public': header.get('is_public', False), 'asks': list(asks_data.values())}
+        if header.get('description') is not None:
+            survey_data['description'] = header['description']
+        validated_data = validate_import(SurveyValidationSerializer(data=survey_data, partial=True))
+        start_date = parse_datetime(header['start_date'])
+        end_date = parse_datetime(header['end_date'])
+        if start_date is None or end_date is None or end_date <= start_date:
+            raise ValueError('The end date must be greater than the start date.')
+
+        survey = Survey.objects.create(
+            user=user,
+            title=validated_data['title'],
+            description=validated_data.get('description'),
+            start_date=start_date,
+            end_date=end_date,
+            is_public=validated_data.get('is_public', False),
+        )
+
+        # Construye las preguntas y opciones en el orden de la exportación
+        for exported_id, ask_data in zip(asks_data, validated_data.get('asks', [])):
+            ask = Ask(survey=survey, text=ask_data['text'], type=ask_data['type'])
+            asks[exported_id] = ask
+            for option_id, option_data in zip(option_ids[exported_id], ask_data.get('options', [])):
+                options[option_id] = Option(ask=ask, text=option_data['text'])
+        Ask.objects.bulk_create(asks.values(), batch_size=SURVEY_TRANSFER_BATCH_SIZE)
+        Option.objects.bulk_create(options.values(), batch_size=SURVEY_TRANSFER_BATCH_SIZE)
+        result['asks'] = len(asks)
+        result['options'] = len(options)
+
+        # Preguntas con sus opciones precargadas para validar las respuestas
+        context['survey'] = survey
+        context['asks'] = {ask.id: ask for ask in Ask.objects.filter(survey=survey).prefetch_related('options')}
+        context['answered'] = set()
+        return survey
+
+    def flush_answers():
+        # Obtiene los usuarios de las respuestas pendientes que aún no se conocen
+        usernames = {record['user'] for record in pending_answers} - users.keys()
+        users.update(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        answers_data = []
+        user_ids = []
+        for record in pending_answers:
+            user_id = users.get(record['user'])
+            if user_id is None:
+                result['skipped_answers'] += 1
+                continue
+            answers_data.append({
+                'ask': get_imported(asks, record['ask']).id,
+                'option': get_imported(options, record['option']).id if record.get('option') else None,
+                'content_answer': record.get('content_answer'),
+            })
+            user_ids.append(user_id)
+        pending_answers.clear()
+
+        # Valida las respuestas e inserta las válidas
+        if answers_data:
+            validated_data = validate_import(AnswerImportSerializer(data=answers_data, many=True, context=context))
+            Answer.objects.bulk_create(
+                [Answer(user_id=user_id, **answer_data) for user_id, answer_data in zip(user_ids, validated_data)],
+                batch_size=SURVEY_TRANSFER_BATCH_SIZE,
+            )
+            result['answers'] += len(validated_data)
+
+    with transaction.atomic():
+        survey = None
+        for record in records:
+            kind = record.get('record') if isinstance(record, dict) else None
+            if kind in ('ask', 'option') and survey is not None:
+                raise ValueError('Asks and options must come before the answers.')
+            if kind == 'ask':
+                asks_data[record['id']] = {'text': record['text'], 'type': record['type'], 'options': []}
+                option_ids[record['id']] = []
+            elif kind == 'option':
+                get_imported(asks_data, record['ask'])['options'].append({'text': record['text']})
+                option_ids[record['ask']].append(record['id'])
+            elif kind == 'answer':
+                # Crea la encuesta al llegar a la primera respuesta
+                if survey is None:
+                    survey = create_survey()
+                if not include_answers:
+                    result['skipped_answers'] += 1
+                    continue
+                pending_answers.append(record)
+
+                # Inserta por bloques para no acumular todas las respuestas en memoria
+                if len(pending_answers) >= SURVEY_TRANSFER_BATCH_SIZE:
+                    flush_answers()
+            else:
+                raise ValueError(f'Unknown record: {kind}.')
+
+        if survey is None:
+            survey = create_survey()
+        flush_answers()
+
+        # Calcula los contadores de respuestas de la encuesta importada
+        rebuild_answer_stats(survey)
+
+    result['survey'] = survey
+    return result
+
+
+def validate_import(serializer):
+    """
+    Función para validar con un serializador los datos de una importación.
+
+    Args:
+        serializer (Serializer): Serializador con los datos a validar.
+
+    Returns:
+        dict|list: Datos validados.
+
+    Raises:
+        ValueError: Si los datos no son válidos.
+    """
+    if not serializer.is_valid():
+        errors = serializer.errors
+        if isinstance(errors, list):
+            errors = [error for error in errors if error]
+        raise ValueError(errors)
+    return serializer.validated_data
+
+
+def get_imported(imported, exported_id):
+    """
+    Función para obtener el elemento importado que corresponde a un ID de la exportación.
+
+    Args:
+        imported (dict): Elementos importados por ID de la exportación.
+        exported_id (str): ID del elemento en la exportación.
+
+    Returns:
+        Model: Elemento importado.
+
+    Raises:
+        ValueError: Si el ID no corresponde a ningún elemento importado.
+    """
+    try:
+        return imported[exported_id]
+    except KeyError:
+        raise ValueError(f'Unknown reference: {exported_id}.')
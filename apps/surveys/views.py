@@ -1,21 +1,23 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-from django.db.models import Q
+from django.db import transaction, IntegrityError, DataError
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
 from .serializers import SurveyValidationSerializer, SurveyResponseSerializer, AnswerValidationSerializer, AnswerResponseSerializer
-from .models import Survey, Invitation
-from .utils import get_survey_by_id, check_survey_is_public, check_user_invited
-from apps.notification.utils import EmailNotification
-from apps.core.utils import CustomPageNumberPagination, validate_serializer, verify_user_is_creator
-from config.settings.base import REST_FRAMEWORK
+from .models import Survey, Ask, Answer, Invitation
+from .utils import SEARCH_MODES, get_surveys_queryset, stream_survey_export, read_survey_import, import_survey_records, search_surveys_queryset, get_survey_access, get_survey_by_id, get_survey_etag, get_survey_payload, check_survey_is_public, check_user_invited, cache_invitations, get_survey_version_key
+from apps.notification.utils import EmailNotification, enqueue_notifications
+from apps.analysis.utils import update_answer_stats
+from apps.core.utils import get_paginator, get_page_info, validate_serializer, verify_user_is_creator, bump_version, insert_ignore_conflicts
+from apps.users.authentication import CachedTokenAuthentication
 
 
 # Endpoint para crear una encuesta
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def create_survey(request):
     # Serilaiza los datos
@@ -32,6 +34,9 @@ def create_survey(request):
     # Guarda la encuesta
     survey = survey_validation_serializer.save()
 
+    # Obtiene la encuesta creada con sus preguntas y opciones precargadas
+    survey = get_surveys_queryset().get(id=survey.id)
+
     # Crea la url para ver la encuesta
     url = f'{settings.FRONTEND_URL}/api/surveys/get/{survey.id}'
 
@@ -40,9 +45,9 @@ def create_survey(request):
     message = f'Hello {request.user.username},\n\nYour survey, "{survey.title}", has been created successfully. Access it here: {url}'
     recipient_list = [request.user.email]
 
-    # Envia el mensaje al correo electrónico del usuario
+    # Agrega el mensaje a la cola de correos del usuario
     email_notification = EmailNotification(subject, message, recipient_list)
-    email_notification.send()
+    email_notification.enqueue()
     
     # Serializa los datos de respuesta de la encuesta
     survey_response_serializer = SurveyResponseSerializer(survey)
@@ -59,11 +64,11 @@ def create_survey(request):
 
 # Endpoint para obtener una encuesta por ID
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_survey_id(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -78,32 +83,35 @@ def get_survey_id(request, survey_id):
             # Respuesta erronea al usuario no ser el creador
             return Response(verification_result, status=status.HTTP_403_FORBIDDEN)
     
-    # Serializa los datos de la encuesta
-    survey_response_serializer = SurveyResponseSerializer(survey)
+    # Obtiene el ETag de la versión actual de la encuesta
+    etag = get_survey_etag(survey)
+
+    # Verifica si el cliente ya tiene la versión actual de la encuesta
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        # Respuesta sin contenido al no haber cambios en la encuesta
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
 
     # Respuesta exitosa al obtener una encuesta
     return Response({
         'status': 'success',
         'message': 'Survey successfully obtained.',
         'data': {
-            'survey': survey_response_serializer.data
+            'survey': get_survey_payload(survey, etag)
         }
-    }, status=status.HTTP_200_OK)
+    }, status=status.HTTP_200_OK, headers={'ETag': etag})
 
 
 # Endpoint para obtener todas las encuestas
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_all_surveys(request):
     # Obtiene todas las encuestas
-    surveys = Survey.objects.all().order_by('id')
-    
-    # Serializa los datos de respuesta de la encusta
-    survey_response_serializer = SurveyResponseSerializer(surveys, many=True)
+    surveys = get_surveys_queryset()
 
     # Crea la paginación de los datos obtenidos
-    paginator = CustomPageNumberPagination()
+    paginator = get_paginator(request)
     paginated_queryset = paginator.paginate_queryset(surveys, request)
 
     # Serializa los datos de las encuestas
@@ -117,11 +125,7 @@ def get_all_surveys(request):
         'status': 'success',
         'message': 'Surveys successfully obtained.',
         'data': {
-            'page_info': {
-                'count': response_data.data['count'],
-                'page_size': int(request.query_params.get('page_size', REST_FRAMEWORK['PAGE_SIZE'])),
-                'links': response_data.data['links']
-            },
+            'page_info': get_page_info(request, response_data),
             'surveys': response_data.data['results']
         }
     }, status=status.HTTP_200_OK)
@@ -129,7 +133,7 @@ def get_all_surveys(request):
 
 # Endpoint para la buscar encuestas
 @api_view(['GET'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def search_surveys(request):
     # Obtiene el párametro de búsqueda
@@ -143,15 +147,22 @@ def search_surveys(request):
             'message': 'The search parameter "query" is required.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    # Obtiene el modo de búsqueda
+    mode = request.query_params.get('mode', settings.SURVEY_SEARCH_BACKEND)
+
+    # Verifica que el modo de búsqueda es válido
+    if mode not in SEARCH_MODES:
+        # Respuesta erronea a proporcionar un modo de búsqueda no válido
+        return Response({
+            'status': 'error',
+            'message': f'Invalid search mode. Available modes: {", ".join(SEARCH_MODES)}.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
     # Filtra las encuestas que coincidan con la búsqueda
-    surveys = Survey.objects.filter(
-        Q(title__icontains=query) |
-        Q(description__icontains=query) |
-        Q(user__username__icontains=query)
-    ).order_by('id')
+    surveys = search_surveys_queryset(query, mode)
 
     # Crea la paginación de los datos obtenidos
-    paginator = CustomPageNumberPagination()
+    paginator = get_paginator(request)
     paginated_queryset = paginator.paginate_queryset(surveys, request)
 
     # Serializa los datos de las encuestas
@@ -165,11 +176,7 @@ def search_surveys(request):
         'status': 'success',
         'message': 'Searching for surveys successfully.',
         'data': {
-            'page_info': {
-                'count': response_data.data['count'],
-                'page_size': int(request.query_params.get('page_size', REST_FRAMEWORK['PAGE_SIZE'])),
-                'links': response_data.data['links']
-            },
+            'page_info': get_page_info(request, response_data),
             'surveys': response_data.data['results']
         }
     }, status=status.HTTP_200_OK)
@@ -177,7 +184,7 @@ def search_surveys(request):
 
 # Endpoint para actualizar una encuesta
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def update_survey(request, survey_id):
     # Obtiene la respuesta
@@ -194,8 +201,11 @@ def update_survey(request, survey_id):
         # Respuesta erronea al usuario no ser el creador
         return Response(verification_result, status=status.HTTP_403_FORBIDDEN)
     
+    # Obtiene si se deben eliminar las preguntas y opciones que no se envíen
+    delete_missing = request.query_params.get('delete_missing', '').lower() in ['1', 'true']
+
     # Serializa los datos de la encueta
-    survey_validation_serializer = SurveyValidationSerializer(survey, data=request.data, partial=True)
+    survey_validation_serializer = SurveyValidationSerializer(survey, data=request.data, partial=True, context={'delete_missing': delete_missing})
 
     # Obtiene la validación del serializer
     validation_error = validate_serializer(survey_validation_serializer)
@@ -208,6 +218,12 @@ def update_survey(request, survey_id):
     # Actualiza la encuesta
     survey = survey_validation_serializer.save()
 
+    # Cambia la versión de la encuesta una vez confirmados los cambios masivos, que no emiten señales
+    bump_version(get_survey_version_key(survey.id))
+
+    # Obtiene la encuesta actualizada con sus preguntas y opciones precargadas
+    survey = get_surveys_queryset().get(id=survey.id)
+
     # Serializa la respuesta
     survey_response_serializer = SurveyResponseSerializer(survey)
 
@@ -223,7 +239,7 @@ def update_survey(request, survey_id):
 
 # Endpoint para eliminar una encuesta
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_survey(request, survey_id):
     # Obtiene la respuesta
@@ -248,9 +264,9 @@ def delete_survey(request, survey_id):
     message = f'Hello {request.user.username},\n\nYour survey, "{survey.title}", has been deleted successfully.'
     recipient_list = [request.user.email]
 
-    # Envia el mensaje al correo electrónico del usuario
+    # Agrega el mensaje a la cola de correos del usuario
     email_notification = EmailNotification(subject, message, recipient_list)
-    email_notification.send()
+    email_notification.enqueue()
 
     # Respuesta exitosa al eliminar la encuesta
     return Response({
@@ -259,13 +275,97 @@ def delete_survey(request, survey_id):
     }, status=status.HTTP_200_OK)
 
 
+# Endpoint para exportar una encuesta
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def export_survey(request, survey_id):
+    # Obtiene la respuesta
+    survey = get_survey_by_id(survey_id)
+
+    # Comprueba si la función devolvió un diccionario de error
+    if isinstance(survey, dict) and survey.get('status') == 'error':
+        # Respuesta erronea al no encontrar la encuesta
+        return Response(survey, status=status.HTTP_404_NOT_FOUND)
+
+    # Verifica que el usuario sea el creador
+    verification_result = verify_user_is_creator(survey, request.user, message='The user is not the creator of the survey.')
+    if verification_result:
+        # Respuesta erronea al usuario no ser el creador
+        return Response(verification_result, status=status.HTTP_403_FORBIDDEN)
+
+    # Obtiene las opciones de la exportación
+    include_answers = request.query_params.get('answers', 'false').lower() == 'true'
+    compress = request.query_params.get('compress', None)
+
+    # Verifica que la compresión sea válida
+    if compress not in (None, 'gzip'):
+        # Respuesta erronea al proporcionar una compresión no válida
+        return Response({
+            'status': 'error',
+            'message': 'The compression must be gzip.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Respuesta en streaming con un registro por línea
+    stream = stream_survey_export(survey, include_answers=include_answers, compress=compress is not None)
+    if compress:
+        response = StreamingHttpResponse(stream, content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="survey_{survey.id}.ndjson.gz"'
+    else:
+        response = StreamingHttpResponse(stream, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="survey_{survey.id}.ndjson"'
+    return response
+
+
+# Endpoint para importar una encuesta
+@api_view(['POST'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def import_survey(request):
+    # Obtiene el archivo de la exportación
+    file = request.FILES.get('file', None)
+    if file is None:
+        # Respuesta erronea al no proporcionar el archivo
+        return Response({
+            'status': 'error',
+            'message': 'The file is required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Crea la encuesta con sus preguntas y opciones; las respuestas solo se importan con el comando import_survey
+    try:
+        result = import_survey_records(read_survey_import(file), request.user, include_answers=False)
+    except (ValueError, KeyError, TypeError, OSError, EOFError, IntegrityError, DataError) as e:
+        # Respuesta erronea al importar un archivo no válido
+        return Response({
+            'status': 'error',
+            'message': 'Invalid import file.',
+            'errors': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Obtiene la encuesta creada con sus preguntas y opciones precargadas
+    survey = get_surveys_queryset().get(id=result.pop('survey').id)
+
+    # Serializa los datos de respuesta de la encuesta
+    survey_response_serializer = SurveyResponseSerializer(survey)
+
+    # Respuesta exitosa al importar la encuesta
+    return Response({
+        'status': 'success',
+        'message': 'Survey imported successfully.',
+        'data': {
+            'survey': survey_response_serializer.data,
+            'imported': result
+        }
+    }, status=status.HTTP_201_CREATED)
+
+
 # Endpoit para responder una encuesta
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def answer_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -280,6 +380,15 @@ def answer_survey(request, survey_id):
             # Respuesta erronea al usuario no cumplir la verificación
             return Response(user_not_invited, status=status.HTTP_403_FORBIDDEN)
 
+    # Obtiene la encuesta completa con su creador, que usan la validación y la notificación
+    survey = Survey.objects.select_related('user').filter(id=survey.id).first()
+    if survey is None:
+        # Respuesta erronea a que la encuesta se eliminara después de comprobar el acceso
+        return Response({
+            'status': 'error',
+            'message': 'Survey not found.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
     # Obtiene los datos de la solicitud
     answers_data = request.data.get('answers', [])
 
@@ -291,35 +400,50 @@ def answer_survey(request, survey_id):
             'message': 'No answers provided.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    # Valida y crea las respuestas de la encuesta
-    answers = []
-    for answer_data in answers_data:
-        # Asigna el usuario autenticado a la respuesta
-        answer_data['user'] = request.user.id
+    # Obtiene las preguntas de la encuesta con sus opciones
+    asks = {ask.id: ask for ask in Ask.objects.filter(survey=survey).prefetch_related('options')}
 
-        # Serializa los datos de la respuesta
-        answer_validation_serializer = AnswerValidationSerializer(data=answer_data)
+    # Obtiene las preguntas que el usuario ya respondió
+    answered = set(Answer.objects.filter(user=request.user, ask__survey=survey).values_list('ask_id', flat=True))
 
-        # Obtiene la validación del serializer
-        validation_error = validate_serializer(answer_validation_serializer)
+    # Serializa los datos de las respuestas
+    answer_validation_serializer = AnswerValidationSerializer(
+        data=answers_data,
+        many=True,
+        context={'survey': survey, 'asks': asks, 'answered': answered}
+    )
 
-        # Verifica la validación del serializer
-        if validation_error:
-            # Respuesta de error en la validación del serializer
-            return Response(validation_error, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Guarda la respuesta validada
-        answer = answer_validation_serializer.save()
-        answers.append(answer)
+    # Obtiene la validación del serializer
+    validation_error = validate_serializer(answer_validation_serializer)
+
+    # Verifica la validación del serializer
+    if validation_error:
+        # Respuesta de error en la validación del serializer
+        return Response(validation_error, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Crea las respuestas junto con sus contadores en una sola transacción
+        with transaction.atomic():
+            answers = Answer.objects.bulk_create([
+                Answer(user=request.user, **answer_data)
+                for answer_data in answer_validation_serializer.validated_data
+            ])
+            update_answer_stats(answers)
+    except IntegrityError:
+        # Respuesta erronea al haber respondido el usuario alguna de las preguntas
+        return Response({
+            'status': 'error',
+            'message': 'The user has already answered this survey.'
+        }, status=status.HTTP_400_BAD_REQUEST)
 
     # Crea el mensaje de notificacion a responder la encuesta
     subject = f'New Answer to Your Survey: "{survey.title}"'
     message = f'Hello {survey.user.username},\n\nYour survey, "{survey.title}", has received new responses.'
     recipient_list = [survey.user.email]
     
-    # Envia el mensaje al correo electrónico del usuario
+    # Agrega el mensaje a la cola de correos del usuario
     email_notification = EmailNotification(subject, message, recipient_list)
-    email_notification.send()
+    email_notification.enqueue()
 
     # Serializa los datos para la respuesta
     answer_response_serializer = AnswerResponseSerializer(answers, many=True)
@@ -336,11 +460,11 @@ def answer_survey(request, survey_id):
 
 # Endpoint para invitar a responder una encuesta
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def invite_answer_survey(request, survey_id):
-    # Obtiene la respuesta
-    survey = get_survey_by_id(survey_id)
+    # Obtiene los datos de acceso de la encuesta, el título se carga al crear el mensaje
+    survey = get_survey_access(survey_id)
 
     # Comprueba si la función devolvió un diccionario de error
     if isinstance(survey, dict) and survey.get('status') == 'error':
@@ -372,23 +496,38 @@ def invite_answer_survey(request, survey_id):
                 'message': 'All emails must be valid and not empty.'
             }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Crear invitaciones y enviar correos
-    for email in emails:
-        # Crea y guarda la invitación
-        invitation = Invitation(survey=survey, email=email)
-        invitation.save()
-
-        # Crea la URL para responder la encuesta
-        invite_url = f'{settings.FRONTEND_URL}/api/surveys/{survey_id}/answer'
-
-        # Crea el mensaje de notificación para invitar al usuario
-        subject = f'You are invited to participate in the survey: "{survey.title}"'
-        message = f'Hello,\n\nYou have been invited to participate in the survey "{survey.title}".\n\nPlease follow the link below to participate:\n\n{invite_url}'
-        recipient_list = [email]
-        
-        # Envia el mensaje al correo electrónico del usuario
-        email_notification = EmailNotification(subject, message, recipient_list)
-        email_notification.send()
+    # Elimina los correos electrónicos repetidos
+    emails = list(dict.fromkeys(emails))
+
+    # Crea la URL para responder la encuesta
+    invite_url = f'{settings.FRONTEND_URL}/api/surveys/{survey_id}/answer'
+
+    # Crea el mensaje de notificación para invitar al usuario
+    subject = f'You are invited to participate in the survey: "{survey.title}"'
+    message = f'Hello,\n\nYou have been invited to participate in the survey "{survey.title}".\n\nPlease follow the link below to participate:\n\n{invite_url}'
+
+    with transaction.atomic():
+        # Crea las invitaciones omitiendo los correos ya invitados, también por peticiones concurrentes
+        invitations = insert_ignore_conflicts(
+            Invitation,
+            [Invitation(survey=survey, email=email) for email in emails],
+            unique_fields=['survey', 'email'],
+            returning=['id', 'email'],
+        )
+
+        # Agrega a la cola solo los mensajes de las invitaciones creadas y enlaza cada invitación a su mensaje
+        queued_emails = enqueue_notifications([EmailNotification(subject, message, [email]) for _, email in invitations])
+        Invitation.objects.bulk_update(
+            [
+                Invitation(id=invitation_id, queued_email=queued_email)
+                for (invitation_id, _), queued_email in zip(invitations, queued_emails)
+            ],
+            ['queued_email'],
+            batch_size=settings.EMAIL_QUEUE_BATCH_SIZE
+        )
+
+        # Guarda en caché los correos invitados, tanto los insertados como los que ya lo estaban
+        transaction.on_commit(lambda: cache_invitations(survey.id, emails))
 
     # Respuesta exitosa al enviar las invitaciones
     return Response({
@@ -0,0 +1,131 @@
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def get_token_cache_key(key):
+    """
+    Obtiene la clave de caché de un token de autenticación.
+
+    Args:
+        key (str): Clave del token.
+
+    Returns:
+        str: Clave de caché del token.
+    """
+    return f'auth_token:{key}'
+
+
+def get_user_cache_key(user_id):
+    """
+    Obtiene la clave de caché de los datos de un usuario autenticado.
+
+    Args:
+        user_id (int): ID del usuario.
+
+    Returns:
+        str: Clave de caché del usuario.
+    """
+    return f'auth_user:{user_id}'
+
+
+# Campos del usuario que se guardan en caché, en el orden de los campos del modelo que
+# espera User.from_db. La contraseña se omite y se carga solo si se accede a ella
+USER_CACHE_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def evict_cached_token(key):
+    """
+    Elimina un token de autenticación de la caché.
+
+    Args:
+        key (str): Clave del token.
+    """
+    cache.delete(get_token_cache_key(key))
+
+
+def evict_cached_user(user_id):
+    """
+    Elimina los datos de un usuario autenticado de la caché.
+
+    Args:
+        user_id (int): ID del usuario.
+    """
+    cache.delete(get_user_cache_key(user_id))
+
+
+def get_token_expiration(token):
+    """
+    Obtiene la fecha de expiración de un token de autenticación.
+
+    Args:
+        token (Token): Token de autenticación.
+
+    Returns:
+        datetime: Fecha a partir de la cual el token deja de ser válido.
+    """
+    return token.created + settings.TOKEN_EXPIRATION
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Autenticación por token que guarda en caché el token y su usuario y rechaza los tokens expirados.
+
+    El ID del usuario y la fecha de creación del token, y los campos del usuario salvo
+    la contraseña, se guardan en caché durante TOKEN_CACHE_TTL segundos, por lo que
+    las peticiones autenticadas no consultan la base de datos. Las señales de users
+    eliminan el token de la caché al eliminarlo y el usuario al guardarlo o eliminarlo,
+    de modo que los cambios de is_active o de permisos se aplican de inmediato.
+    """
+    def authenticate_credentials(self, key):
+        """
+        Obtiene el usuario y el token a partir de la clave del token.
+
+        Args:
+            key (str): Clave del token.
+
+        Returns:
+            tuple: Usuario y token autenticados.
+
+        Raises:
+            AuthenticationFailed: Si el token no existe, ha expirado o el usuario no está activo.
+        """
+        model = self.get_model()
+
+        # Obtiene el usuario y la fecha de creación del token de la caché o de la base de datos
+        cache_key = get_token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is None:
+            cached = model.objects.filter(key=key).values_list('user_id', 'created').first()
+            if cached is None:
+                raise AuthenticationFailed('Invalid token.')
+            cache.set(cache_key, cached, settings.TOKEN_CACHE_TTL)
+        user_id, created = cached
+        token = model(key=key, user_id=user_id, created=created)
+
+        # Verifica que el token no haya expirado
+        if get_token_expiration(token) <= timezone.now():
+            model.objects.filter(key=key).delete()
+            raise AuthenticationFailed('Token has expired.')
+
+        # Obtiene los campos del usuario de la caché o de la base de datos
+        user_cache_key = get_user_cache_key(user_id)
+        values = cache.get(user_cache_key)
+        if values is None:
+            values = User.objects.filter(id=user_id).values_list(*USER_CACHE_FIELDS).first()
+            if values is None:
+                raise AuthenticationFailed('User inactive or deleted.')
+            cache.set(user_cache_key, values, settings.TOKEN_CACHE_TTL)
+        user = User.from_db('default', USER_CACHE_FIELDS, values)
+
+        # Verifica que el usuario esté activo
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+
+        # Enlaza el token y el usuario en ambos sentidos sin consultar la base de datos
+        user.auth_token = token
+
+        return (user, token)
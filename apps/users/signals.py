@@ -0,0 +1,27 @@
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import evict_cached_token, evict_cached_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    Elimina el usuario de la caché de autenticación al guardarlo o eliminarlo, después del commit.
+    """
+    # Guarda el ID antes del commit, ya que al eliminar el usuario Django lo pone a None
+    user_id = instance.id
+    transaction.on_commit(lambda: evict_cached_user(user_id))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """
+    Elimina el token de la caché de autenticación al eliminarlo, después del commit.
+    """
+    # Guarda la clave antes del commit, ya que al eliminar el token Django la pone a None
+    key = instance.key
+    transaction.on_commit(lambda: evict_cached_token(key))
@@ -4,6 +4,11 @@ from rest_framework.authtoken.models import Token
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.utils import timezone
+from apps.surveys.models import Survey, Ask, Option
+from apps.analysis.models import AskStats, OptionStats, KeywordStats
+from apps.analysis.utils import rebuild_answer_stats
+from datetime import timedelta
 
 
 # Tests para la eliminación de usuario
@@ -31,6 +36,34 @@ class DeleteUserTestCase(TestCase):
         self.assertTrue('message' in response.data)
 
 
+    def test_delete_user_removes_answer_stats(self):
+        """
+        Prueba de que eliminar el usuario resta sus respuestas de los contadores de las encuestas de otros usuarios.
+        """
+        owner = User.objects.create(username='SurveyOwner', email='owner@email.com')
+        survey = Survey.objects.create(title='Survey', end_date=timezone.now() + timedelta(days=1), is_public=True, user=owner)
+        ask_multiple = Ask.objects.create(survey=survey, text='Language', type='multiple')
+        option = Option.objects.create(ask=ask_multiple, text='Python')
+        Option.objects.create(ask=ask_multiple, text='Java')
+        ask_boolean = Ask.objects.create(survey=survey, text='Django', type='boolean')
+        ask_short = Ask.objects.create(survey=survey, text='Why', type='short')
+        response = self.client.post(reverse('answer_survey', args=[survey.id]), {
+            'answers': [
+                {'ask': str(ask_multiple.id), 'option': str(option.id)},
+                {'ask': str(ask_boolean.id), 'content_answer': 'True'},
+                {'ask': str(ask_short.id), 'content_answer': 'Simple and fast'},
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AskStats.objects.get(ask=ask_boolean).true_count, 0)
+        self.assertEqual(AskStats.objects.get(ask=ask_multiple).total_answers, 0)
+        self.assertEqual(OptionStats.objects.get(option=option).answers_count, 0)
+        self.assertFalse(KeywordStats.objects.filter(ask=ask_short).exists())
+        self.assertEqual(rebuild_answer_stats(survey, fix=False), {'asks': 0, 'options': 0, 'keywords': 0})
+
+
     def test_delete_user_without_token(self):
         """
         Prueba de eliminación de usuario sin token.
@@ -0,0 +1,121 @@
+from rest_framework.test import APIClient
+from rest_framework.authentication import TokenAuthentication
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.utils import timezone
+from apps.users.authentication import CachedTokenAuthentication
+from apps.surveys import views
+from unittest.mock import patch
+from datetime import timedelta
+
+
+# Tests para la autenticación por token con caché y expiración
+class TokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('get_all_surveys')
+        self.user = User.objects.create(
+            username='TestUsername',
+            email='test@email.com'
+        )
+        self.user.set_password('TestPassword')
+        self.user.save()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+
+    def test_token_authentication_cached(self):
+        """
+        Prueba de que el token se obtiene de la caché después de la primera petición.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('"authtoken_token"' in query['sql'] for query in queries.captured_queries))
+        self.assertFalse(any('"auth_user"' in query['sql'] for query in queries.captured_queries))
+
+
+    def test_token_authentication_fewer_queries_than_token_authentication(self):
+        """
+        Prueba de que una petición con el token y el usuario en caché hace menos consultas que con TokenAuthentication.
+        """
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as cached_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        view = views.get_all_surveys.cls
+        with patch.object(view, 'authentication_classes', [TokenAuthentication]):
+            with CaptureQueriesContext(connection) as token_queries:
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(view.authentication_classes, [CachedTokenAuthentication])
+        self.assertLess(len(cached_queries), len(token_queries))
+
+
+    def test_token_authentication_user_changes_apply_immediately(self):
+        """
+        Prueba de que desactivar el usuario fuera de la API invalida el token aunque esté en caché.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    def test_token_authentication_expired(self):
+        """
+        Prueba de que un token expirado se rechaza y se elimina.
+        """
+        Token.objects.filter(key=self.token.key).update(created=timezone.now() - timedelta(days=4))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+
+
+    def test_token_authentication_after_sign_out(self):
+        """
+        Prueba de que después de cerrar sesión el token en caché deja de ser válido.
+        """
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('sign_out'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    def test_token_authentication_after_delete_user(self):
+        """
+        Prueba de que después de eliminar el usuario el token en caché deja de ser válido.
+        """
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('delete_user'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    def test_sign_in_replaces_expired_token(self):
+        """
+        Prueba de que iniciar sesión con un token expirado devuelve un token nuevo.
+        """
+        Token.objects.filter(key=self.token.key).update(created=timezone.now() - timedelta(days=4))
+        self.client.credentials()
+        response = self.client.post(reverse('sign_in'), {'email': 'test@email.com', 'password': 'TestPassword'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = response.data['data']['token']
+        self.assertNotEqual(token['token_key'], self.token.key)
+        self.assertGreater(timezone.datetime.fromisoformat(token['token_expiration']), timezone.now() + timedelta(days=2))
@@ -1,18 +1,21 @@
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
 from .serializers import UserValidationSerializer, UserResponseSerializer, UserUpdateSerializer
 from .utils import confirm_verification_token, generate_verification_token
 from .models import VerifyAccount
+from .authentication import CachedTokenAuthentication, get_token_expiration
 from apps.notification.utils import EmailNotification
 from apps.core.utils import validate_serializer
-from datetime import timedelta
+from apps.feedback.utils import remove_user_ratings
+from apps.analysis.utils import remove_answer_stats
+from apps.surveys.models import Answer
 
 
 # Endpoint para el registro de usuario
@@ -50,9 +53,9 @@ def sign_up(request):
     message = f'Hello {user.username},\n\nPlease click the link to verify your account: {verification_url}'
     recipient_list = [user.email]
 
-    # Envia el mensaje al correo electrónico del usuario
+    # Agrega el mensaje a la cola de correos del usuario
     email_notification = EmailNotification(subject, message, recipient_list)
-    email_notification.send()
+    email_notification.enqueue()
 
     # Crea un token de autenticación para el usuario
     token = Token.objects.create(user=user)
@@ -114,9 +117,9 @@ def verify_email(request, token_email):
         message = f'Hello {user.username},\n\nThank you for registering with our service.'
         recipient_list = [user.email]
 
-        # Envia el mensaje al correo electrónico del usuario
+        # Agrega el mensaje a la cola de correos del usuario
         email_notification = EmailNotification(subject, message, recipient_list)
-        email_notification.send()
+        email_notification.enqueue()
         
         # Respuesta de verificación del correo electrónico exitosa
         return Response({
@@ -187,8 +190,13 @@ def sign_in(request):
     # Crea o actualiza el token del usuario
     token, created = Token.objects.get_or_create(user=user)
 
-    # Configura el tiempo de expiración del token
-    token_expiration = timezone.now() + timedelta(days=3)
+    # Reemplaza el token si ha expirado
+    if get_token_expiration(token) <= timezone.now():
+        token.delete()
+        token = Token.objects.create(user=user)
+
+    # Obtiene el tiempo de expiración del token
+    token_expiration = get_token_expiration(token)
 
     # Serializa los datos del usuario
     user_response_serializer = UserResponseSerializer(user)
@@ -209,10 +217,10 @@ def sign_in(request):
 
 # Endpoint para el cierre de sesión de usuario
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def sign_out(request):
-    # Elimina el token del usuario autenticado
+    # Elimina el token del usuario autenticado, las señales lo eliminan de la caché
     request.user.auth_token.delete()
     
     # Respuesta de cierre de sesión exitoso
@@ -224,7 +232,7 @@ def sign_out(request):
 
 # Endpoint para actualizar el usuario
 @api_view(['PUT'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def update_user(request):
     # Obtiene el usuario autenticado
@@ -266,18 +274,18 @@ def update_user(request):
     message = f'Hello {user.username},\n\nPlease click the link to verify your account: {verification_url}'
     recipient_list = [user.email]
 
-    # Envia el mensaje al correo electrónico del usuario
+    # Agrega el mensaje a la cola de correos del usuario
     email_notification = EmailNotification(subject, message, recipient_list)
-    email_notification.send()
+    email_notification.enqueue()
 
-    # Elimina el token del usuario autenticado
+    # Elimina el token del usuario autenticado, las señales lo eliminan de la caché
     request.user.auth_token.delete()
     
     # Crea o actualiza el token del usuario
     token, created = Token.objects.get_or_create(user=user)
 
-    # Configura el tiempo de expiración del token
-    token_expiration = timezone.now() + timedelta(days=3)
+    # Obtiene el tiempo de expiración del token
+    token_expiration = get_token_expiration(token)
 
     # Serializa los datos del usuario
     user_response_serializer = UserResponseSerializer(user)
@@ -298,15 +306,18 @@ def update_user(request):
 
 # Endpoint para eliminar el usuario
 @api_view(['DELETE'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
 def delete_user(request):
     try:
-        # Elimina el token del usuario autenticado
+        # Elimina el token del usuario autenticado, las señales lo eliminan de la caché
         request.user.auth_token.delete()
 
-        # Elimina el usuario autenticado
-        request.user.delete()
+        # Elimina el usuario autenticado y resta sus calificaciones y respuestas de los resúmenes de las encuestas
+        with transaction.atomic():
+            remove_user_ratings(request.user)
+            remove_answer_stats(Answer.objects.filter(user=request.user).exclude(ask__survey__user=request.user))
+            request.user.delete()
 
         # Respuesta de eliminación exitoso
         return Response({
@@ -1,5 +1,6 @@
 from pathlib import Path
 from dotenv import load_dotenv
+from datetime import timedelta
 import os
 
 
@@ -14,13 +15,20 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL')
 
 # Configuración para los correos de la  API
 DEFAULT_AUTO_FIELD = os.environ.get('EMAIL')
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', Path.joinpath(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = DEFAULT_AUTO_FIELD
 EMAIL_HOST_PASSWORD = os.environ.get('PASSWORD')
 
+# Configuración de la cola de correos electrónicos
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60 # Segundos antes del primer reintento, se duplica en cada intento
+EMAIL_QUEUE_LEASE_SECONDS = 300 # Segundos antes de volver a enviar un correo reservado sin resultado
+EMAIL_QUEUE_BATCH_SIZE = 500 # Correos insertados por sentencia al encolar varios mensajes
+
 
 # Application definition
 
@@ -93,6 +101,38 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Configuración de los tokens de autenticación
+TOKEN_EXPIRATION = timedelta(days=3) # Tiempo de validez de un token desde su creación
+TOKEN_CACHE_TTL = 300 # Segundos que se guarda un token en caché
+
+
+# Configuración de la caché
+# Usa Redis si se define REDIS_URL, en otro caso una caché en memoria por proceso
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Segundos que se guarda una encuesta en caché
+SURVEY_CACHE_TTL = 300
+
+# Configuración del conteo de registros de los endpoints paginados
+COUNT_CACHE_MODE = 'cached' # 'exact', 'cached' o 'estimate'
+COUNT_CACHE_TTL = 60 # Segundos que se guarda un conteo en caché
+COUNT_ESTIMATE_THRESHOLD = 100000 # Registros a partir de los cuales se usa la estimación de PostgreSQL
+
+# Modo de búsqueda de encuestas por defecto: 'fulltext', 'trigram' o 'icontains'
+SURVEY_SEARCH_BACKEND = 'fulltext'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -1,5 +1,6 @@
 from config.logging import *
 from config.settings.base import *
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import os
 
@@ -30,6 +31,23 @@ DATABASES = {
 }
 
 
+# Caché en Redis compartida por todos los procesos, necesaria para que la
+# eliminación de encuestas y tokens de la caché llegue a todos los workers
+if not os.environ.get('REDIS_URL'):
+    raise ImproperlyConfigured('REDIS_URL must be set in production.')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    }
+}
+
+
+# Usa la estimación del planificador para contar las tablas grandes sin filtros
+COUNT_CACHE_MODE = os.environ.get('COUNT_CACHE_MODE', 'estimate')
+
+
 STATIC_ROOT = Path.joinpath(BASE_DIR, 'staticfiles')
 
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'